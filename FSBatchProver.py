@@ -0,0 +1,54 @@
+from typing import List, Optional, Sequence, Tuple, Union
+
+from field import Field, PrimeField, Table
+from FSBatchVerifier import BatchProof, BatchTheorem, BatchVerifier, MAX_SOUNDNESS_ERROR_ALLOWED, asPMF
+from IPPMFProver import InteractivePMFProver
+from PMF import PMF
+from polynomial import MVLinear
+
+
+def generateTheoremAndProof(polys: Sequence[Union[PMF, MVLinear]],
+                            maxAllowedSoundnessError: float = MAX_SOUNDNESS_ERROR_ALLOWED,
+                            field: Optional[Field] = None) -> Tuple[BatchTheorem, BatchProof, BatchVerifier]:
+    """
+    Generate the theorem (the polynomials and their asserted sums) and one proof for all of them.
+    :param polys: the polynomials, with the same number of variables and field size
+    :param maxAllowedSoundnessError:
+    :param field: arithmetic backend of the bookkeeping tables. Defaults to python integers.
+    :return: theorem, proof, and the (hopefully) convinced pseudorandom verifier
+    """
+    pmfs = [asPMF(poly) for poly in polys]
+    p = pmfs[0].p
+    field = field if field is not None else PrimeField(p)
+    tables: List[List[Table]] = []
+    sums: List[int] = []
+    for poly in pmfs:
+        As, s = InteractivePMFProver(poly, field).calculateAllBookKeepingTables()
+        tables.append(As)
+        sums.append(s)
+
+    v = BatchVerifier(pmfs, sums, maxAllowedSoundnessError)
+    num_points = v.degree + 1
+    msgs: List[List[int]] = []
+    for _ in range(v.num_variables):
+        combined = [0] * num_points
+        for a, As in zip(v.coefficients, tables):
+            for t, s in enumerate(field.product_round_sums(As, num_points)):
+                combined[t] += a * s
+        combined = [s % p for s in combined]
+        msgs.append(combined)
+        result, r = v.talk(combined)
+        assert result
+        for As in tables:
+            for j in range(len(As)):
+                As[j] = field.fold(As[j], r)
+
+    finals: List[int] = []
+    for As in tables:
+        e = 1
+        for A in As:
+            e = e * field.get(A, 0) % p
+        finals.append(e)
+    v.finalize(finals)
+
+    return BatchTheorem(pmfs, sums), BatchProof(msgs, finals), v
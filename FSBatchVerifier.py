@@ -0,0 +1,162 @@
+"""
+Offline batched sum-check: k claims over the same number of variables are proved with one sum-check over the random
+linear combination sum_i alpha_i * P_i.
+"""
+from copy import copy
+from typing import List, Optional, Sequence, Tuple, Union
+
+from IPPMFVerifier import InteractivePMFVerifier, RandomGen
+from PMF import PMF, DummyPMF
+from polynomial import MVLinear, digestOf
+from transcript import Transcript
+
+MAX_SOUNDNESS_ERROR_ALLOWED = 2e-64
+
+
+def asPMF(poly: Union[PMF, MVLinear]) -> PMF:
+    """
+    :return: the polynomial as a PMF. A multilinear polynomial is a PMF with a single multiplicand.
+    """
+    return poly if isinstance(poly, PMF) else PMF([poly])
+
+
+class BatchTheorem:
+    """
+    A data structure representing offline theorem of several sums.
+    """
+
+    def __init__(self, polys: Sequence[Union[PMF, MVLinear]], assertedSums: Sequence[int]):
+        if len(polys) != len(assertedSums):
+            raise ValueError("Each polynomial should have exactly one asserted sum.")
+        self.polys: List[PMF] = [copy(asPMF(poly)) for poly in polys]
+        self.asserted_sums: List[int] = list(assertedSums)
+
+
+class BatchProof:
+    """
+    A data structure representing proof of a batch theorem.
+    """
+
+    def __init__(self, proverMessage: List[List[int]], finalEvaluations: List[int]):
+        """
+        :param proverMessage: messages [P(0), P(1), ..., P(d)] of the combined polynomial, one per round
+        :param finalEvaluations: P_i(r) for each input polynomial, where r are the challenges of all rounds
+        """
+        self.prover_message = [msg.copy() for msg in proverMessage]
+        self.final_evaluations = list(finalEvaluations)
+
+
+class BatchRandomGen(RandomGen):
+    """
+    Fiat-Shamir randomness of a batch. The statement binds all polynomials and their asserted sums, then the
+    combination coefficients are squeezed. Messages appended to self.message are absorbed into the transcript the next
+    time a random element is requested.
+    """
+
+    def __init__(self, polys: Sequence[PMF], assertedSums: Sequence[int]):
+        p = polys[0].p
+        self.message: List[List[int]] = []
+        self.transcript: Transcript = Transcript(digestOf(*(poly.digest() for poly in polys)), p)
+        self.transcript.absorb_message(assertedSums)
+        self.coefficients: List[int] = [self.transcript.squeeze() for _ in range(len(polys))]
+        self._num_absorbed: int = 0
+
+    def getRandomElement(self) -> int:
+        while self._num_absorbed < len(self.message):
+            self.transcript.absorb_message(self.message[self._num_absorbed])
+            self._num_absorbed += 1
+        return self.transcript.squeeze()
+
+
+class BatchVerifier:
+    """
+    Verifies k sums with n rounds in total. Each round checks the message of the combined polynomial
+    sum_i alpha_i * P_i. At the end, the prover reports P_i(r) for each input polynomial, and the verifier checks that
+    they combine to the expected value of the last round.
+    """
+
+    def __init__(self, polys: Sequence[Union[PMF, MVLinear]], asserted_sums: Sequence[int],
+                 maxAllowedSoundnessError: float = MAX_SOUNDNESS_ERROR_ALLOWED, checksum_only: bool = False):
+        """
+        :param polys: the polynomials, with the same number of variables (at least 2) and field size
+        :param asserted_sums: the asserted sum of each polynomial
+        :param maxAllowedSoundnessError: the maximum soundness error allowed
+        :param checksum_only: if on, the verifier does not evaluate the polynomials, and the caller checks
+        self.sub_claims() instead
+        """
+        if len(polys) == 0:
+            raise ValueError("No claims to verify.")
+        self.polys: List[PMF] = [asPMF(poly) for poly in polys]
+        self.p = self.polys[0].p
+        self.num_variables = self.polys[0].num_variables
+        for poly in self.polys:
+            if poly.p != self.p or poly.num_variables != self.num_variables:
+                raise ValueError("All polynomials should have the same field size and number of variables.")
+        if self.num_variables < 2:
+            raise ValueError("Batched sum-check needs at least 2 variables.")
+        self.checksum_only = checksum_only
+        self.asserted_sums = [s % self.p for s in asserted_sums]
+        self.gen = BatchRandomGen(self.polys, self.asserted_sums)
+        self.coefficients: List[int] = self.gen.coefficients
+        self.degree: int = max(poly.num_multiplicands() for poly in self.polys)
+        combined_sum = sum(a * s for a, s in zip(self.coefficients, self.asserted_sums)) % self.p
+        # the verifier of the combined polynomial only checks the messages: it never evaluates the polynomial
+        self.verifier = InteractivePMFVerifier(DummyPMF(self.degree, self.num_variables, self.p), combined_sum,
+                                               maxAllowedSoundnessError=maxAllowedSoundnessError, checksum_only=True,
+                                               randomGen=self.gen)
+        self.final_evaluations: Optional[List[int]] = None
+        self.convinced: bool = False
+
+    @property
+    def active(self) -> bool:
+        return self.verifier.active
+
+    def talk(self, msgs: List[int]) -> Tuple[bool, int]:
+        """
+        Send this verifier the message of the combined polynomial for the current round.
+        :param msgs: [P(0), P(1), ..., P(d)] where d is the largest number of multiplicands
+        :return: accepted, r
+        """
+        self.gen.message.append(msgs)
+        return self.verifier.talk(msgs)
+
+    def finalize(self, final_evaluations: List[int]) -> bool:
+        """
+        Check the evaluations of each polynomial at the challenges of all rounds.
+        :param final_evaluations: P_i(r) for each input polynomial
+        :return: whether the verifier is convinced of all sums
+        """
+        if not self.verifier.convinced or len(final_evaluations) != len(self.polys):
+            return False
+        points, expect = self.verifier.sub_claim()
+        p = self.p
+        if sum(a * v for a, v in zip(self.coefficients, final_evaluations)) % p != expect:
+            return False
+        if not self.checksum_only and any(poly.eval(points) != v % p
+                                          for poly, v in zip(self.polys, final_evaluations)):
+            return False
+        self.final_evaluations = [v % p for v in final_evaluations]
+        self.convinced = True
+        return True
+
+    def sub_claims(self) -> List[Tuple[List[int], int]]:
+        """
+        The sub claim of each input polynomial: P_i evaluates to the reported value at the challenges of all rounds.
+        :return: [(point, expected evaluation of P_i)]
+        """
+        if not self.convinced:
+            raise ArithmeticError("The verifier is not convinced, and cannot make a sub claim.")
+        points = self.verifier.sub_claim()[0]
+        return [(points, v) for v in self.final_evaluations]
+
+
+def verifyProof(theorem: BatchTheorem, proof: BatchProof,
+                maxAllowedSoundnessError: float = MAX_SOUNDNESS_ERROR_ALLOWED) -> bool:
+    v = BatchVerifier(theorem.polys, theorem.asserted_sums, maxAllowedSoundnessError)
+    for msg in proof.prover_message:
+        if not v.active:
+            return False
+        result, _ = v.talk(msg)
+        if not result:
+            return False
+    return v.finalize(proof.final_evaluations)
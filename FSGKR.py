@@ -1,8 +1,6 @@
 """
 Trivial Fiat Shemir GKR Protocol.
 """
-import hashlib
-import pickle
 from copy import copy
 from typing import List, Tuple
 
@@ -10,6 +8,8 @@ from GKR import GKR
 from GKRProver import GKRProver
 from GKRVerifier import GKRVerifier, GKRVerifierState
 from IPPMFVerifier import RandomGen
+from multilinear_extension import eqCacheScope
+from transcript import Transcript
 
 
 
@@ -27,32 +27,26 @@ class Proof:
         self.phase2Msg = phase2Msg.copy()
 
 def getGKRHash(gkr: GKR) -> bytes:
-    hash_size = 64
-    sha = hashlib.blake2b(pickle.dumps(gkr), digest_size=hash_size)
-    return sha.digest()
+    """
+    Canonical digest of the GKR function. It is cached by the GKR instance, so it can be precomputed.
+    """
+    return gkr.digest()
 
 def randomElement(gkrHash: bytes, phase1Msg: List[List[int]], phase2Msg: List[List[int]], p: int):
-    hash_size = (p.bit_length() + 7) // 8
-    byteLength = hash_size
-    sha = hashlib.blake2b(gkrHash, digest_size=hash_size)
-
+    """
+    Replay the transcript from scratch and return the last challenge. PseudoRandomGen samples challenges on the fly
+    instead.
+    """
+    gen = PseudoRandomGen(gkrHash, p)
+    result = 0
     for msg in phase1Msg:
-        for point in msg:
-            sha.update(b'N')
-            sha.update(point.to_bytes(byteLength, 'little'))
-        sha.update(b'X')
-
+        gen.phase1MsgRecorder.append(msg)
+        result = gen.getRandomElement()
     for msg in phase2Msg:
-        for point in msg:
-            sha.update(b'N')
-            sha.update(point.to_bytes(byteLength, 'little'))
-        sha.update(b'X')
-
-    result = int.from_bytes(sha.digest(), 'little')
-    while result >= p:
-        sha.update(b'\xFF')  # rejection sampling
-        result = int.from_bytes(sha.digest(), 'little')
-
+        gen.phase2MsgRecorder.append(msg)
+        result = gen.getRandomElement()
+    if len(phase1Msg) + len(phase2Msg) == 0:
+        result = gen.getRandomElement()
     return result
 
 
@@ -62,9 +56,19 @@ class PseudoRandomGen(RandomGen):
         self.phase1MsgRecorder: List[List[int]] = []  # mutable on fly
         self.phase2MsgRecorder: List[List[int]] = []  # mutable on fly
         self.p = p
+        self.transcript: Transcript = Transcript(gkrHash, p)
+        self._num_absorbed_phase1: int = 0
+        self._num_absorbed_phase2: int = 0
 
     def getRandomElement(self):
-        return randomElement(self.gkrHash, self.phase1MsgRecorder, self.phase2MsgRecorder, self.p)
+        # all phase 1 messages arrive before any phase 2 message, so absorbing in this order follows arrival order
+        while self._num_absorbed_phase1 < len(self.phase1MsgRecorder):
+            self.transcript.absorb_message(self.phase1MsgRecorder[self._num_absorbed_phase1])
+            self._num_absorbed_phase1 += 1
+        while self._num_absorbed_phase2 < len(self.phase2MsgRecorder):
+            self.transcript.absorb_message(self.phase2MsgRecorder[self._num_absorbed_phase2])
+            self._num_absorbed_phase2 += 1
+        return self.transcript.squeeze()
 
 def verifyProof(thm: Theorem, pf: Proof)->bool:
     gen = PseudoRandomGen(getGKRHash(thm.gkr), thm.gkr.p)
@@ -83,12 +87,13 @@ def verifyProof(thm: Theorem, pf: Proof)->bool:
 
 def generateTheoremAndProof(gkr: GKR, g: List[int]) -> Tuple[Theorem, Proof]:
     pv = GKRProver(gkr)
-    A_hg, G, s = pv.initializeAndGetSum(g)
+    with eqCacheScope():  # share eq(g, z) of the prover with the verifier
+        A_hg, G, s = pv.initializeAndGetSum(g)
 
-    thm = Theorem(gkr, g, s)
-    gen = PseudoRandomGen(getGKRHash(gkr), gkr.p)
-    v = GKRVerifier(gkr, g, s, gen)
-    pv.proveToVerifier(A_hg, G, s, v, gen.phase1MsgRecorder, gen.phase2MsgRecorder)
+        thm = Theorem(gkr, g, s)
+        gen = PseudoRandomGen(getGKRHash(gkr), gkr.p)
+        v = GKRVerifier(gkr, g, s, gen)
+        pv.proveToVerifier(A_hg, G, s, v, gen.phase1MsgRecorder, gen.phase2MsgRecorder)
 
     assert v.state == GKRVerifierState.ACCEPT
     pf = Proof(gen.phase1MsgRecorder, gen.phase2MsgRecorder)
@@ -0,0 +1,275 @@
+"""
+Fiat-Shamir GKR protocol for a whole layered circuit.
+
+The verifier starts from a random point r of the output layer and the claim V_0(r), and walks down the circuit. At
+layer i, the claims sum_j c_j * V_i(r_j) = s are proved with the two-phase sum-check of
+
+    sum over x, y of  add_i(G,x,y) * (V_(i+1)(x) + V_(i+1)(y)) + mult_i(G,x,y) * V_(i+1)(x) * V_(i+1)(y)
+
+where add_i(G,x,y) = sum over z of G(z) * add_i(z,x,y) and G(z) = sum_j c_j * eq(r_j, z). Phase one sums over x and
+ends at u, phase two sums over y and ends at v. z has the L_i variables of layer i, while x, y have the L_(i+1)
+variables of layer i + 1, so a narrow layer does not pay for the width of the widest one. The prover then reports
+V_(i+1)(u) and V_(i+1)(v), which the verifier checks against the last claim of phase two with one pass over the
+wiring of the layer. The two new claims are combined with random coefficients alpha and beta into the claim of the
+next layer. At the input layer, the verifier evaluates the inputs at u and v itself.
+"""
+from enum import Enum
+from typing import List, Optional, Sequence, Tuple
+
+from circuit import LayeredCircuit
+from field import Field, PrimeField, Table
+from IPPMFVerifier import InteractivePMFVerifier, RandomGen, MAX_ALLOWED_SOUNDNESS_ERROR
+from multilinear_extension import cachedEqTable, combinedEqTable, eqCacheScope, evaluate
+from PMF import DummyPMF
+from polynomial import denseTableBytes, digestOf
+from transcript import Transcript
+
+TERMS: List[Tuple[int, List[int]]] = [(1, [0, 1]), (1, [2])]
+"""
+Each phase proves sum of A_0 * A_1 + A_2 over the hypercube, where A_1 is the table of V_(i+1).
+"""
+
+
+class LayeredGKRState(Enum):
+    PHASE_ONE_LISTENING = 1  # verify on x (L_(i+1) variables)
+    PHASE_TWO_LISTENING = 2  # verify on y (L_(i+1) variables)
+    EVALUATION_LISTENING = 3  # waiting for V_(i+1)(u) and V_(i+1)(v)
+    ACCEPT = 4
+    REJECT = 0
+
+
+class Theorem:
+    def __init__(self, circuit: LayeredCircuit, inputs: Sequence[int], outputs: Sequence[int]):
+        """
+        :param circuit: the circuit
+        :param inputs: the inputs of the circuit
+        :param outputs: the asserted values of the gates of the output layer
+        """
+        self.circuit = circuit
+        self.inputs: List[int] = list(inputs)
+        self.outputs: List[int] = list(outputs)
+
+
+class Proof:
+    def __init__(self, phase1Msgs: List[List[List[int]]], phase2Msgs: List[List[List[int]]],
+                 evaluations: List[Tuple[int, int]]):
+        """
+        :param phase1Msgs: messages of phase one of each layer
+        :param phase2Msgs: messages of phase two of each layer
+        :param evaluations: V_(i+1)(u), V_(i+1)(v) of each layer i
+        """
+        self.phase1Msgs = [[msg.copy() for msg in msgs] for msgs in phase1Msgs]
+        self.phase2Msgs = [[msg.copy() for msg in msgs] for msgs in phase2Msgs]
+        self.evaluations = [tuple(e) for e in evaluations]
+
+
+class PseudoRandomGen(RandomGen):
+    """
+    Fiat-Shamir randomness of the whole proof. The statement binds the circuit, its inputs and its outputs. Messages
+    appended to self.message are absorbed into the transcript the next time a random element is requested.
+    """
+
+    def __init__(self, circuit: LayeredCircuit, inputs: Sequence[int], outputs: Sequence[int]):
+        p = circuit.p
+        self.message: List[List[int]] = []
+        self.transcript: Transcript = Transcript(digestOf(circuit.digest(), denseTableBytes(list(inputs), p),
+                                                          denseTableBytes(list(outputs), p)), p)
+        self._num_absorbed: int = 0
+
+    def getRandomElement(self) -> int:
+        while self._num_absorbed < len(self.message):
+            self.transcript.absorb_message(self.message[self._num_absorbed])
+            self._num_absorbed += 1
+        return self.transcript.squeeze()
+
+
+class LayeredGKRVerifier:
+    """
+    Verifies that a layered circuit maps the inputs to the asserted outputs. Its work is linear to the size of the
+    wiring, the inputs and the outputs, and it never evaluates the gates.
+    """
+
+    def __init__(self, circuit: LayeredCircuit, inputs: Sequence[int], outputs: Sequence[int],
+                 maxAllowedSoundnessError: float = MAX_ALLOWED_SOUNDNESS_ERROR):
+        """
+        :param circuit: the circuit
+        :param inputs: the inputs of the circuit
+        :param outputs: the asserted values of the gates of the output layer
+        :param maxAllowedSoundnessError: the maximum soundness error allowed for the sum-check of each phase
+        """
+        if len(inputs) != circuit.num_inputs or len(outputs) != len(circuit.layers[0]):
+            raise ValueError("Number of inputs or outputs does not match the circuit.")
+        self.circuit = circuit
+        self.p = p = circuit.p
+        Ls = circuit.Ls
+        self.inputs = [x % p for x in inputs] + [0] * ((1 << Ls[-1]) - len(inputs))
+        self.maxAllowedSoundnessError = maxAllowedSoundnessError
+        self.gen = PseudoRandomGen(circuit, inputs, outputs)
+
+        self.layer: int = 0
+        r = [self.gen.getRandomElement() for _ in range(Ls[0])]
+        self.claims: List[Tuple[int, List[int]]] = [(1, r)]
+        """
+        (c_j, r_j) of the claims of the current layer: sum_j c_j * V_i(r_j) is asserted_sum
+        """
+        self.asserted_sum: int = evaluate(list(outputs) + [0] * ((1 << Ls[0]) - len(outputs)), r, p)
+        self.state: LayeredGKRState = LayeredGKRState.PHASE_ONE_LISTENING
+        self.phase1_verifier: InteractivePMFVerifier = self._sumcheckVerifier(self.asserted_sum)
+        self.phase2_verifier: Optional[InteractivePMFVerifier] = None
+
+    def _sumcheckVerifier(self, asserted_sum: int) -> InteractivePMFVerifier:
+        # the phase verifiers only check the sums: the last claim is checked by talk_evaluations
+        return InteractivePMFVerifier(DummyPMF(num_multiplicands=2, num_variables=self.circuit.Ls[self.layer + 1],
+                                               p=self.p),
+                                      asserted_sum=asserted_sum, checksum_only=True, randomGen=self.gen,
+                                      maxAllowedSoundnessError=self.maxAllowedSoundnessError)
+
+    def _talk(self, verifier: InteractivePMFVerifier, msgs: List[int]) -> Tuple[bool, int]:
+        self.gen.message.append(msgs)
+        result, r = verifier.talk(msgs)
+        if not result:
+            self.state = LayeredGKRState.REJECT
+        return result, r
+
+    def talk_phase1(self, msgs: List[int]) -> Tuple[bool, int]:
+        if self.state != LayeredGKRState.PHASE_ONE_LISTENING:
+            raise RuntimeError("Verifier is not in phase 1.")
+        result, r = self._talk(self.phase1_verifier, msgs)
+        if result and self.phase1_verifier.convinced:
+            self.phase2_verifier = self._sumcheckVerifier(self.phase1_verifier.sub_claim()[1])
+            self.state = LayeredGKRState.PHASE_TWO_LISTENING
+        return result, r
+
+    def talk_phase2(self, msgs: List[int]) -> Tuple[bool, int]:
+        if self.state != LayeredGKRState.PHASE_TWO_LISTENING:
+            raise RuntimeError("Verifier is not in phase 2.")
+        result, r = self._talk(self.phase2_verifier, msgs)
+        if result and self.phase2_verifier.convinced:
+            self.state = LayeredGKRState.EVALUATION_LISTENING
+        return result, r
+
+    def talk_evaluations(self, Vu: int, Vv: int) -> bool:
+        """
+        Check the claimed V_(i+1)(u) and V_(i+1)(v) against the last claim of phase two, and move to the next layer.
+        :return: accepted
+        """
+        if self.state != LayeredGKRState.EVALUATION_LISTENING:
+            raise RuntimeError("Verifier is not waiting for evaluations.")
+        p = self.p
+        Vu, Vv = Vu % p, Vv % p
+        u = self.phase1_verifier.sub_claim()[0]
+        v, expected = self.phase2_verifier.sub_claim()
+        triples = [(r, u, v) for _, r in self.claims]
+        add_wiring, mult_wiring = self.circuit.add_wiring[self.layer], self.circuit.mult_wiring[self.layer]
+        add = sum(c * e for (c, _), e in zip(self.claims, add_wiring.evaluateMany(triples, p)))
+        mult = sum(c * e for (c, _), e in zip(self.claims, mult_wiring.evaluateMany(triples, p)))
+        if (add * (Vu + Vv) + mult * Vu * Vv - expected) % p != 0:
+            self.state = LayeredGKRState.REJECT
+            return False
+
+        self.layer += 1
+        if self.layer == self.circuit.depth:
+            if evaluate(self.inputs, u, p) != Vu or evaluate(self.inputs, v, p) != Vv:
+                self.state = LayeredGKRState.REJECT
+                return False
+            self.state = LayeredGKRState.ACCEPT
+            return True
+
+        self.gen.message.append([Vu, Vv])
+        alpha = self.gen.getRandomElement()
+        beta = self.gen.getRandomElement()
+        self.claims = [(alpha, u), (beta, v)]
+        self.asserted_sum = (alpha * Vu + beta * Vv) % p
+        self.phase1_verifier = self._sumcheckVerifier(self.asserted_sum)
+        self.phase2_verifier = None
+        self.state = LayeredGKRState.PHASE_ONE_LISTENING
+        return True
+
+
+def _sumcheck(As: List[Table], L: int, talker, msgs: List[List[int]], field: Field) -> List[Table]:
+    """
+    Run L rounds of the sum-check of sum A_0 * A_1 + A_2.
+    :return: the folded tables
+    """
+    for _ in range(L):
+        msg = field.sum_of_products_round_sums(As, TERMS, 3)
+        msgs.append(msg)
+        result, r = talker(msg)
+        assert result
+        As = [field.fold(A, r) for A in As]
+    return As
+
+
+def generateTheoremAndProof(circuit: LayeredCircuit, inputs: Sequence[int],
+                            maxAllowedSoundnessError: float = MAX_ALLOWED_SOUNDNESS_ERROR,
+                            field: Optional[Field] = None) -> Tuple[Theorem, Proof]:
+    """
+    Evaluate the circuit and prove its outputs.
+    :param circuit: the circuit
+    :param inputs: the inputs of the circuit
+    :param maxAllowedSoundnessError: the maximum soundness error allowed for the sum-check of each phase
+    :param field: arithmetic backend of the bookkeeping tables. Defaults to python integers.
+    :return: the theorem and the proof
+    """
+    p = circuit.p
+    Ls = circuit.Ls
+    field = field if field is not None else PrimeField(p)
+    values = circuit.evaluate(inputs)
+    outputs = values[0][:len(circuit.layers[0])]
+    v = LayeredGKRVerifier(circuit, inputs, outputs, maxAllowedSoundnessError)
+
+    phase1Msgs: List[List[List[int]]] = []
+    phase2Msgs: List[List[List[int]]] = []
+    evaluations: List[Tuple[int, int]] = []
+    # the prover and the verifier expand the eq tables of the same points
+    with eqCacheScope():
+        for i in range(circuit.depth):
+            L = Ls[i + 1]
+            V = values[i + 1]
+            add, mult = circuit.add_wiring[i], circuit.mult_wiring[i]
+            G = combinedEqTable([r for _, r in v.claims], [c for c, _ in v.claims], p)
+
+            # phase one: sum over x of (mult(G,x,.) * V + add(G,x,.)) (x) * V(x) + (add(G,x,.) * V) (x)
+            A_mult = mult.phaseOne(G, V, p)
+            A_add, A_addV = add.phaseOneWithOnes(G, V, p)
+            As = [field.table([(a + b) % p for a, b in zip(A_mult, A_add)]), field.table(V.copy()), field.table(A_addV)]
+            msgs: List[List[int]] = []
+            As = _sumcheck(As, L, v.talk_phase1, msgs, field)
+            phase1Msgs.append(msgs)
+            Vu = field.get(As[1], 0)
+
+            # phase two: sum over y of (Vu * mult(G,u,y) + add(G,u,y)) * V(y) + Vu * add(G,u,y)
+            U = cachedEqTable(v.phase1_verifier.sub_claim()[0], p)
+            F_mult = mult.phaseTwo(G, U, p)
+            F_add = add.phaseTwo(G, U, p)
+            As = [field.table([(Vu * m + a) % p for m, a in zip(F_mult, F_add)]), field.table(V.copy()),
+                  field.table([Vu * a % p for a in F_add])]
+            msgs = []
+            As = _sumcheck(As, L, v.talk_phase2, msgs, field)
+            phase2Msgs.append(msgs)
+            Vv = field.get(As[1], 0)
+
+            evaluations.append((Vu, Vv))
+            assert v.talk_evaluations(Vu, Vv)
+
+    assert v.state == LayeredGKRState.ACCEPT
+    return Theorem(circuit, inputs, outputs), Proof(phase1Msgs, phase2Msgs, evaluations)
+
+
+def verifyProof(thm: Theorem, pf: Proof, maxAllowedSoundnessError: float = MAX_ALLOWED_SOUNDNESS_ERROR) -> bool:
+    circuit = thm.circuit
+    if not (len(pf.phase1Msgs) == len(pf.phase2Msgs) == len(pf.evaluations) == circuit.depth):
+        return False
+    v = LayeredGKRVerifier(circuit, thm.inputs, thm.outputs, maxAllowedSoundnessError)
+    for L, phase1, phase2, (Vu, Vv) in zip(circuit.Ls[1:], pf.phase1Msgs, pf.phase2Msgs, pf.evaluations):
+        if len(phase1) != L or len(phase2) != L:
+            return False
+        for msg in phase1:
+            if not v.talk_phase1(msg)[0]:
+                return False
+        for msg in phase2:
+            if not v.talk_phase2(msg)[0]:
+                return False
+        if not v.talk_evaluations(Vu, Vv):
+            return False
+    return v.state == LayeredGKRState.ACCEPT
@@ -1,26 +1,31 @@
-from typing import Tuple
+from typing import Optional, Tuple, Union
 
+from extension import ExtensionField
 from IPPMFVerifier import InteractivePMFVerifier
-from PMF import PMF
+from PMF import PMF, SumOfPMF
 from IPPMFProver import InteractivePMFProver
+from IPSumOfPMFProver import InteractiveSumOfPMFProver
 from FSPMFVerifier import Theorem, Proof
 from FSPMFVerifier import PseudoRandomGen
 MAX_SOUNDNESS_ERROR_ALLOWED = 2e-64
 
 
-def generateTheoremAndProof(poly: PMF, maxAllowedSoundnessError=MAX_SOUNDNESS_ERROR_ALLOWED)\
+def generateTheoremAndProof(poly: Union[PMF, SumOfPMF], maxAllowedSoundnessError=MAX_SOUNDNESS_ERROR_ALLOWED,
+                            extension: Optional[ExtensionField] = None)\
         -> Tuple[Theorem, Proof, InteractivePMFVerifier]:
     """
     Generate the theorem (poly itself and the asserted sum) and its proof.
     :param maxAllowedSoundnessError:
-    :param poly: The PMF polynomial
+    :param poly: The PMF polynomial, or a sum of PMFs
+    :param extension: draw the challenges from this extension field. The proof should be verified with the same one.
     :return: theorem, proof, and the (hopefully) convinced pseudorandom verifier
     """
-    pv = InteractivePMFProver(poly)
+    pv = InteractiveSumOfPMFProver(poly) if isinstance(poly, SumOfPMF) else InteractivePMFProver(poly)
     As, s = pv.calculateAllBookKeepingTables()
 
-    gen = PseudoRandomGen(poly)
-    v = InteractivePMFVerifier(poly, s, maxAllowedSoundnessError=maxAllowedSoundnessError, randomGen=gen)
+    gen = PseudoRandomGen(poly, extension)
+    v = InteractivePMFVerifier(poly, s, maxAllowedSoundnessError=maxAllowedSoundnessError, randomGen=gen,
+                               extension=extension)
     msgs = pv.attemptProve(As, v, gen=gen)
 
     theorem = Theorem(poly, s)
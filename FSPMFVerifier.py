@@ -1,11 +1,11 @@
-import hashlib
-import pickle
-import time
 from copy import copy
-from typing import List
+from typing import List, Optional, Union
 
+from extension import ExtensionField
 from IPPMFVerifier import InteractivePMFVerifier, RandomGen
-from PMF import PMF
+from PMF import PMF, SumOfPMF
+from polynomial import digestOf
+from transcript import Transcript
 
 MAX_SOUNDNESS_ERROR_ALLOWED = 2e-64
 
@@ -13,28 +13,19 @@ MAX_SOUNDNESS_ERROR_ALLOWED = 2e-64
 def randomElement(poly: PMF, proverMessage: List[List[int]]) -> int:
     """
     Sample a random element in the field using hash function which takes the polynomial and prover message as input.
+    The transcript is replayed from scratch, so this takes linear time to the proof length. PseudoRandomGen samples
+    challenges on the fly instead.
     :param poly: The polynomial
     :param proverMessage: List of messages [P(0), P(1), P(2), ..., P(m)]
     :return:
     """
-    hash_size = (poly.p.bit_length() + 7) // 8
-    byteLength = hash_size
-    sha = hashlib.blake2b(pickle.dumps(poly), digest_size=hash_size)
-
-    # append input: polynomial
-    sha.update(pickle.dumps(poly))
-
+    gen = PseudoRandomGen(poly)
+    result = 0
     for msg in proverMessage:
-        for point in msg:
-            sha.update(b'N')
-            sha.update(point.to_bytes(byteLength, 'little'))
-        sha.update(b'X')
-
-    result = int.from_bytes(sha.digest(), 'little')
-    while result >= poly.p:
-        sha.update(b'\xFF')  # rejection sampling
-        result = int.from_bytes(sha.digest(), 'little')
-
+        gen.message.append(msg)
+        result = gen.getRandomElement()
+    if len(proverMessage) == 0:
+        result = gen.getRandomElement()
     return result
 
 
@@ -43,7 +34,7 @@ class Theorem:
     A data structure representing offline theorem of PMF sum.
     """
 
-    def __init__(self, poly: PMF, assertedSum: int):
+    def __init__(self, poly: Union[PMF, SumOfPMF], assertedSum: int):
         self.poly = copy(poly)
         self.asserted_sum = assertedSum
 
@@ -58,18 +49,33 @@ class Proof:
 
 
 class PseudoRandomGen(RandomGen):
-    def __init__(self, poly: PMF):
+    """
+    Fiat-Shamir randomness. Messages appended to self.message are absorbed into the transcript the next time a
+    random element is requested.
+    """
+    def __init__(self, poly: Union[PMF, SumOfPMF], extension: Optional[ExtensionField] = None):
+        """
+        :param poly: the PMF, or a sum of PMFs
+        :param extension: the extension field of the challenges, if any. It is bound into the statement.
+        """
         self.poly = poly
         self.message: List[List[int]] = []
+        statement = poly.digest() if extension is None else digestOf(poly.digest(), extension.digest())
+        self.transcript: Transcript = Transcript(statement, poly.p)
+        self._num_absorbed: int = 0
 
     def getRandomElement(self) -> int:
-        return randomElement(self.poly, self.message)
+        while self._num_absorbed < len(self.message):
+            self.transcript.absorb_message(self.message[self._num_absorbed])
+            self._num_absorbed += 1
+        return self.transcript.squeeze()
 
 
-def verifyProof(theorem: Theorem, proof: Proof, maxAllowedSoundnessError: float = MAX_SOUNDNESS_ERROR_ALLOWED) -> bool:
-    gen = PseudoRandomGen(theorem.poly)
+def verifyProof(theorem: Theorem, proof: Proof, maxAllowedSoundnessError: float = MAX_SOUNDNESS_ERROR_ALLOWED,
+                extension: Optional[ExtensionField] = None) -> bool:
+    gen = PseudoRandomGen(theorem.poly, extension)
     v = InteractivePMFVerifier(theorem.poly, theorem.asserted_sum, maxAllowedSoundnessError=maxAllowedSoundnessError,
-                               randomGen=gen)
+                               randomGen=gen, extension=extension)
     for msg in proof.prover_messge:
         gen.message.append(msg)
         v.talk(msg)
@@ -1,18 +1,24 @@
-from typing import Tuple
+from typing import Tuple, Union
 
 from FSVerifier import Theorem, PseudoRandomVerifier, Proof
 from IPProverLinear import InteractiveLinearProver
+from IPProverSparse import InteractiveSparseProver
+from multilinear_extension import SparseMLE
 from polynomial import MVLinear
 
 
-def generateTheoremAndProof(poly: MVLinear, maximumAllowedSoundnessError: float = 2**(-32)) -> Tuple[Theorem, Proof]:
+def generateTheoremAndProof(poly: Union[MVLinear, SparseMLE], maximumAllowedSoundnessError: float = 2**(-32)) \
+        -> Tuple[Theorem, Proof]:
     """
     Generate an offline proof of the multilinear polynomial sum.
-    :param poly: The multilinear poly to be looked at.
+    :param poly: The multilinear poly to be looked at. A SparseMLE is proved by the sparse prover.
     :param maximumAllowedSoundnessError: maximum soundness error
     :return: The offline proof.
     """
-    prover = InteractiveLinearProver(poly)  # run verifier by itself
+    if isinstance(poly, SparseMLE):
+        prover = InteractiveSparseProver(poly)
+    else:
+        prover = InteractiveLinearProver(poly)  # run verifier by itself
     A, s = prover.calculateTable()
     v = PseudoRandomVerifier(poly, s, maximumAllowedSoundnessError)
     prover.attemptProve(A, v)
@@ -1,11 +1,11 @@
 from copy import copy
 from enum import Enum
-from typing import List, Tuple
+from typing import List, Tuple, Union
 
+from multilinear_extension import SparseMLE
 from polynomial import MVLinear
-import pickle
-import hashlib
 from IPVerifier import InteractiveVerifier
+from transcript import Transcript
 
 MAX_ALLOWED_SOUNDNESS_ERROR = 2**(-32)
 
@@ -14,8 +14,8 @@ class Theorem:
     A data structure representing offline theorem of multilinear sum.
     """
 
-    def __init__(self, poly: MVLinear, assertedSum: int):
-        self.poly: MVLinear = copy(poly)
+    def __init__(self, poly: Union[MVLinear, SparseMLE], assertedSum: int):
+        self.poly: Union[MVLinear, SparseMLE] = copy(poly)
         self.asserted_sum = assertedSum
 
 
@@ -28,34 +28,22 @@ class Proof:
         self.prover_message = proverMessage
 
 
-def randomElement(poly: MVLinear, proverMessage: List[Tuple[int, int]]) -> int:
+def randomElement(poly: Union[MVLinear, SparseMLE], proverMessage: List[Tuple[int, int]]) -> int:
     """
     Sample a random element in the field using hash function which takes the polynomial and prover message as input.
+    The transcript is replayed from scratch, so this takes linear time to the proof length. Use Transcript directly
+    to sample challenges on the fly.
     :param poly: The polynomial
     :param proverMessage: List of Tuple of P(0), P(1)
     :return:
     """
-    hash_size = (poly.p.bit_length() + 7) // 8
-    byteLength = hash_size
-    sha = hashlib.blake2b(pickle.dumps(poly), digest_size=hash_size)
-
-    # append input: polynomial
-    sha.update(pickle.dumps(poly))
-
+    transcript = Transcript(poly.digest(), poly.p)
+    result = 0
     for msg_pair in proverMessage:
-        p0 = msg_pair[0] % poly.p
-        p1 = msg_pair[1] % poly.p
-
-        sha.update(b'N')
-        sha.update(p0.to_bytes(byteLength, 'little'))
-        sha.update(b'X')
-        sha.update(p1.to_bytes(byteLength, 'little'))
-
-    result = int.from_bytes(sha.digest(), 'little')
-    while result >= poly.p:
-        sha.update(b'\xFF')  # rejection sampling
-        result = int.from_bytes(sha.digest(), 'little')
-
+        transcript.absorb_message(msg_pair)
+        result = transcript.squeeze()
+    if len(proverMessage) == 0:
+        result = transcript.squeeze()
     return result
 
 
@@ -71,20 +59,21 @@ def verifyProof(theorem: Theorem, proof: Proof,
 
 
 class PseudoRandomVerifier(InteractiveVerifier):
-    def __init__(self,  polynomial: MVLinear, asserted_sum: int, maximumAllowedSoundnessError: float):
+    def __init__(self,  polynomial: Union[MVLinear, SparseMLE], asserted_sum: int,
+                 maximumAllowedSoundnessError: float):
+        self.transcript: Transcript = Transcript(polynomial.digest(), polynomial.p)
         super().__init__(0, polynomial, asserted_sum,
                          maxAllowedSoundnessError=maximumAllowedSoundnessError / polynomial.num_variables)  # #rounds
         self.proverMessages: List[Tuple[int, int]] = []
 
     def talk(self, p0: int, p1: int) -> Tuple[bool, int]:
         self.proverMessages.append((p0, p1))
+        self.transcript.absorb_message((p0, p1))
         return super(PseudoRandomVerifier, self).talk(p0, p1)
 
     def randomR(self) -> int:
-        return randomElement(self.poly, self.proverMessages)
+        return self.transcript.squeeze()
 
 
 # todo: next step
 # todo: product of multilinear (start with 2 product)
-# todo: case of sparse polynomial (2*n variables -> 2^(2n) monomials) (in this case, 2^n sparse monomials):
-#  different algorithm
@@ -1,7 +1,120 @@
 from copy import copy
-from typing import List, Dict
+from operator import itemgetter, mul
+from typing import List, Dict, Optional, Sequence, Tuple
 
-from PMF import PMF
+from multilinear_extension import cachedEqTable
+from polynomial import TrackedDict, TrackedList, digestOf, sparseTableBytes, denseTableBytes
+
+
+class WiringIndex:
+    """
+    Compact form of the sparse wiring f1(z,x,y), built once per circuit: the nonzero entries as parallel arrays of z, x,
+    y and values, so that each proof gathers the tables it needs with itemgetter instead of splitting every argument
+    again.
+    """
+
+    def __init__(self, f1: Dict[int, int], L: int, sort_by: Optional[str] = None, L_xy: Optional[int] = None):
+        """
+        :param f1: the sparse wiring. Argument is little endian binary form of (z, x, y).
+        :param L: number of variables of z
+        :param sort_by: 'z', 'x' or 'y' to sort the entries by that part, so that the writes to the table indexed by
+        it are sequential. None keeps the order of f1.
+        :param L_xy: number of variables of each of x and y. Defaults to L.
+        """
+        if sort_by not in (None, 'z', 'x', 'y'):
+            raise ValueError(f"Cannot sort by {sort_by}.")
+        L_xy = L if L_xy is None else L_xy
+        mask_z = (1 << L) - 1
+        mask_xy = (1 << L_xy) - 1
+        entries = [(arg & mask_z, (arg >> L) & mask_xy, arg >> (L + L_xy), ev) for arg, ev in f1.items()]
+        if sort_by is not None:
+            entries.sort(key=itemgetter('zxy'.index(sort_by)))
+        self.L = L
+        self.L_xy = L_xy
+        self.sort_by = sort_by
+        self.z: List[int] = [e[0] for e in entries]
+        self.x: List[int] = [e[1] for e in entries]
+        self.y: List[int] = [e[2] for e in entries]
+        self.values: List[int] = [e[3] for e in entries]
+        # itemgetter of a single index returns the element instead of a tuple
+        self._getters = {name: itemgetter(*indices) if len(indices) > 1 else None
+                         for name, indices in (('z', self.z), ('x', self.x), ('y', self.y))}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def gather(self, name: str, table: Sequence[int]) -> Sequence[int]:
+        """
+        :param name: 'z', 'x' or 'y'
+        :param table: table indexed by that part of the argument
+        :return: table[index] for the index of each entry
+        """
+        getter = self._getters[name]
+        if getter is None:
+            return [table[i] for i in getattr(self, name)]
+        return getter(table)
+
+    def phaseOne(self, G: Sequence[int], A_f3: Sequence[int], p: int) -> List[int]:
+        """
+        :return: table over x of sum over z, y: G[z] * f1(z,x,y) * A_f3[y]
+        """
+        A: List[int] = [0] * (1 << self.L_xy)
+        for x, t in zip(self.x, map(mul, map(mul, self.gather('z', G), self.values), self.gather('y', A_f3))):
+            A[x] += t
+        return [a % p for a in A]
+
+    def phaseOneWithOnes(self, G: Sequence[int], A_f3: Sequence[int], p: int) -> Tuple[List[int], List[int]]:
+        """
+        :return: phaseOne(G, [1, ..., 1], p) and phaseOne(G, A_f3, p), in one pass over the entries
+        """
+        A: List[int] = [0] * (1 << self.L_xy)
+        AV: List[int] = [0] * (1 << self.L_xy)
+        for x, w, a in zip(self.x, map(mul, self.gather('z', G), self.values), self.gather('y', A_f3)):
+            A[x] += w
+            AV[x] += w * a
+        return [a % p for a in A], [a % p for a in AV]
+
+    def phaseTwo(self, G: Sequence[int], U: Sequence[int], p: int) -> List[int]:
+        """
+        :return: table over y of sum over z, x: G[z] * U[x] * f1(z,x,y)
+        """
+        A: List[int] = [0] * (1 << self.L_xy)
+        for y, t in zip(self.y, map(mul, map(mul, self.gather('z', G), self.gather('x', U)), self.values)):
+            A[y] += t
+        return [a % p for a in A]
+
+    def evaluate(self, g: List[int], u: List[int], v: List[int], p: int) -> int:
+        """
+        :return: the multilinear extension of f1 at (g, u, v), i.e. the sum of f1(z,x,y) * eq(g,z) * eq(u,x) * eq(v,y)
+        over the nonzero entries. The eq tables have 2^L and 2^L_xy entries, instead of folding f1 over L + 2 L_xy
+        variables.
+        """
+        return self.evaluateMany([(g, u, v)], p)[0]
+
+    def evaluateMany(self, points: Sequence[Tuple[List[int], List[int], List[int]]], p: int) -> List[int]:
+        """
+        Batched evaluate. Each distinct point of each part is expanded and gathered once, and the products
+        f1(z,x,y) * eq(g,z) are shared by the triples with the same g.
+        :param points: triples (g, u, v)
+        :param p: field size
+        :return: the evaluation at each triple
+        """
+        gathered: Dict[Tuple[str, Tuple[int, ...]], Sequence[int]] = {}
+        weighted: Dict[Tuple[int, ...], List[int]] = {}
+
+        def at(name: str, point: List[int]) -> Sequence[int]:
+            key = (name, tuple(point))
+            if key not in gathered:
+                gathered[key] = self.gather(name, cachedEqTable(point, p))
+            return gathered[key]
+
+        results: List[int] = []
+        for g, u, v in points:
+            key = tuple(g)
+            if key not in weighted:
+                weighted[key] = list(map(mul, self.values, at('z', g)))
+            results.append(sum(map(mul, map(mul, weighted[key], at('x', u)), at('y', v))) % p)
+        return results
 
 
 class GKR:
@@ -21,13 +134,60 @@ class GKR:
             if k >= (1 << (3*L)):
                 raise ArithmeticError(f"f1 has invalid term {bin(k)} cannot be represented by {3*L} variables. ")
 
-        self.f1 = f1.copy()
-        self.f2 = f2.copy()
-        self.f3 = f3.copy()
+        self.f1: Dict[int, int] = TrackedDict(f1)
+        self.f2: List[int] = TrackedList(f2)
+        self.f3: List[int] = TrackedList(f3)
 
         self.L = L   # means "l" in paper
         self.p = p
 
+    def wiring(self, sort_by: Optional[str] = None) -> WiringIndex:
+        """
+        Index of f1. It is built once and cached until f1 is modified, so it can be precomputed.
+        :param sort_by: see WiringIndex
+        :return: the index
+        """
+        if not isinstance(self.f1, TrackedDict):
+            self.f1 = TrackedDict(self.f1)
+        cache = self.f1.index_cache
+        if cache is None or cache[0] != (self.L, sort_by):
+            cache = ((self.L, sort_by), WiringIndex(self.f1, self.L, sort_by))
+            self.f1.index_cache = cache
+        return cache[1]
+
+    def digest(self) -> bytes:
+        """
+        Canonical digest of the GKR function: L, the field size, the nonzero entries of f1 sorted by argument, and the
+        fixed-width tables f2 and f3. The encoding of each table is cached until that table is modified.
+        :return: the digest
+        """
+        for name in ('f1', 'f2', 'f3'):
+            table = getattr(self, name)
+            if not isinstance(table, (TrackedDict, TrackedList)):
+                setattr(self, name, TrackedDict(table) if isinstance(table, dict) else TrackedList(table))
+
+        key_width = max(1, (3 * self.L + 7) // 8)
+        parts = []
+        for table in (self.f1, self.f2, self.f3):
+            cache = table.digest_cache
+            if cache is None or cache[0] != self.p:
+                if isinstance(table, dict):
+                    encoded = sparseTableBytes(table, key_width, self.p)
+                else:
+                    encoded = denseTableBytes(table, self.p)
+                cache = (self.p, digestOf(encoded))
+                table.digest_cache = cache
+            parts.append(cache[1])
+        return digestOf(b'GKR', self.L.to_bytes(4, 'little'),
+                        self.p.to_bytes((self.p.bit_length() + 7) // 8, 'little'), *parts)
+
 
     def __copy__(self) -> 'GKR':
-        return GKR(self.f1, self.f2, self.f3, self.p, self.L)
+        ans = GKR(self.f1, self.f2, self.f3, self.p, self.L)
+        for name in ('f1', 'f2', 'f3'):
+            table = getattr(self, name)
+            if isinstance(table, (TrackedDict, TrackedList)):
+                getattr(ans, name).digest_cache = table.digest_cache
+        if isinstance(self.f1, TrackedDict):
+            ans.f1.index_cache = self.f1.index_cache
+        return ans
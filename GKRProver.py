@@ -1,7 +1,9 @@
-from typing import List, Tuple, Dict, Callable, Optional
+from typing import List, Tuple, Dict, Callable, Optional, Union
 
-from GKR import GKR
+from field import Field, PrimeField, Table
+from GKR import GKR, WiringIndex
 from GKRVerifier import GKRVerifier, GKRVerifierState
+from multilinear_extension import cachedEqTable, combinedEqTable, eqCacheScope
 
 
 def binaryToList(b: int, numVariables: int) -> List[int]:
@@ -21,59 +23,40 @@ def binaryToList(b: int, numVariables: int) -> List[int]:
     return lst
 
 
-def precompute(g: List[int], p: int)->List[int]:
-    L = len(g)
-    G = [0] * (1 << L)
-    # handle first case
-    G[0] = (1-g[0])
-    G[1] = g[0]
-    for i in range(1, L):
-        oldG = G[:]
-        for b in range(1 << i):
-            G[b] = oldG[b] * (1 - g[i]) % p
-            G[b + (1 << i)] = oldG[b]*g[i] % p
-    return G
-
-def _three_split(arg: int, L: int) -> Tuple[int, int, int]:
+def precompute(g: List[int], p: int) -> List[int]:
     """
-    :param arg: argument of length 3L
-    :param L: L
-    :return: z (first L bits), x (second L bits), y (last L bits) little endian
+    :return: the table of eq(g, z) over z. It is a copy, so the caller may modify it.
     """
-    z = arg & ((1 << L) - 1)  # get first L argument: this is z
-    x = (arg & (((1 << L) - 1) << L)) >> L
-    y = (arg & (((1 << L) - 1) << (2 * L))) >> (2 * L)
-    return z, x, y
+    return list(cachedEqTable(g, p))
 
-def initialize_PhaseOne(f1: Dict[int, int], L: int, p: int, A_f3: List[int], g: List[int])-> Tuple[List[int], List[int]]:
+def initialize_PhaseOne(f1: Union[Dict[int, int], WiringIndex], L: int, p: int, A_f3: List[int], g: List,
+                        alphas: Optional[List[int]] = None) -> Tuple[List[int], List[int]]:
     """
     (Paper P16) phase one
 
-    :param f1: f1(z,x,y) Sparse MVLinear represented by Dict[argument in little endian binary form, evaluation]
+    :param f1: f1(z,x,y) Sparse MVLinear represented by Dict[argument in little endian binary form, evaluation], or
+    its WiringIndex (see GKR.wiring), which saves splitting the arguments again
     :param L: number of variables of f3
     :param p: field size
     :param A_f3: Bookkeeping table of f3  (where f3 is the multilinear extension of that)
-    :param g: fixed parameter g of f1
+    :param g: fixed parameter g of f1. If alphas is given, the list of points g_1, ..., g_k instead.
+    :param alphas: coefficients of the points g_1, ..., g_k. The table is then sum_i alpha_i * h_(g_i), which is
+    computed in the same single pass over f1 with G = sum_i alpha_i * eq(g_i, z).
     :return: Bookkeeping table of h_g = sum over y: f1(g,x,y)*f3(y). It has size 2**L. It also returns G,
     which is precompute(g,p), that is useful for phase two.
     """
-    # sanity check        z = term & ((1 << L) - 1)   # get first L argument: this is z
-    #         x = (term & (((1 << L) - 1) << L)) >> L
-    #         y = (term & (((1 << L) - 1) << (2 * L))) >> (2 * L)
     assert len(A_f3) == 2**L
-    assert len(g) == L
 
-    A_hg = [0] * (1 << L)
-
-    G = precompute(g, p)
+    index = f1 if isinstance(f1, WiringIndex) else WiringIndex(f1, L)
+    if alphas is None:
+        assert len(g) == L
+        G = precompute(g, p)
+    else:
+        assert len(alphas) == len(g) > 0 and all(len(gi) == L for gi in g)
+        G = combinedEqTable(g, alphas, p)
 
     # rely on sparsity
-    for arg, ev in f1.items():
-        # assert (arg < 1 << (3*L))  # make sure f1 has no more than 3*L variables # should be checked in GKR
-        z, x, y = _three_split(arg, L)
-
-        A_hg[x] = (A_hg[x] + G[z]*ev*A_f3[y]) % p
-    return A_hg, G
+    return index.phaseOne(G, A_f3, p), G
 
 
 def sumOfGKR(A_hg: List[int], f2: List[int], p: int) -> int:
@@ -92,57 +75,50 @@ def sumOfGKR(A_hg: List[int], f2: List[int], p: int) -> int:
         s = (s + A_hg[i] * f2[i]) % p
     return s
 
-def initialize_PhaseTwo(f1: Dict[int, int], G: List[int], u: List[int], p: int) -> List[int]:
+def initialize_PhaseTwo(f1: Union[Dict[int, int], WiringIndex], G: List[int], u: List[int], p: int) -> List[int]:
     """
     (paper p16) phase two
 
-    :param f1: f1(z,x,y) Sparse MVLinear represented by Dict[argument in little endian binary form, evaluation]
-    :param G: precompute(g, p), which is outputted in phase one. It has size 2**L.
+    :param f1: f1(z,x,y) Sparse MVLinear represented by Dict[argument in little endian binary form, evaluation], or
+    its WiringIndex
+    :param G: precompute(g, p) (or the combination of eq tables of several points), which is outputted in phase one.
+    It has size 2**L.
     :param u: randomness of previous phase sum check protocol. It has size L (#variables in f2, f3).
     :param p: field size
     :return: A_f1: the bookkeeping table f1(g, u, y) over y. It has size 2**L.
     """
 
     L = len(u)
-    U = precompute(u, p)
+    U = cachedEqTable(u, p)
     assert len(U) == len(G), "len(U) != len(G)"
-    A_f1: List[int] = [0] * (1 << L)
-    for arg, ev in f1.items():
-        z, x, y = _three_split(arg, L)
-        A_f1[y] = (A_f1[y] + G[z]*U[x]*ev) % p
-    return A_f1
+    index = f1 if isinstance(f1, WiringIndex) else WiringIndex(f1, L)
+    return index.phaseTwo(G, U, p)
 
 
-def _talk_process(As: Tuple[List[int], List[int]], L: int, p: int, talker: Callable[[List[int]], Tuple[bool, int]],
-                  msgRecorder: Optional[List[List[int]]] = None):
+def _talk_process(As: List[Table], L: int, p: int, talker: Callable[[List[int]], Tuple[bool, int]],
+                  msgRecorder: Optional[List[List[int]]] = None, field: Optional[Field] = None):
+    field = field if field is not None else PrimeField(p)
     num_multiplicands = 2
     for i in range(1, L+1):
-        product_sum: List[int] = [0] * (num_multiplicands + 1)
-        for b in range(1 << (L - i)):
-            for t in range(num_multiplicands + 1):
-                product = 1
-                for j in range(num_multiplicands):
-                    A = As[j]
-                    product = product * (
-                            ((A[b << 1] * ((1 - t) % p)) + (A[(b << 1) + 1] * t) % p) % p) % p
-                product_sum[t] = (product_sum[t] + product) % p
+        product_sum: List[int] = field.product_round_sums(As, num_multiplicands + 1)
         if msgRecorder is not None:
             msgRecorder.append(product_sum)
         result, r = talker(product_sum)
 
         assert result
         for j in range(num_multiplicands):
-            for b in range(1 << (L-i)):
-                As[j][b] = (As[j][b << 1] * (1 - r) + As[j][(b << 1) + 1] * r) % p
+            As[j] = field.fold(As[j], r)
 
 def talkToVerifierPhase1(A_hg: List[int], gkr: GKR, verifier: GKRVerifier,
-                         msgRecorder: Optional[List[List[int]]] = None) -> Tuple[List[int], int]:
+                         msgRecorder: Optional[List[List[int]]] = None,
+                         field: Optional[Field] = None) -> Tuple[List[int], int]:
     """
     Attempt to prove to GKR verifier.
 
     :param randomGen: add randomness
     :param A_hg: Bookkeeping table of hg. A_hg will be modified in-place. Do not reuse it!
     :param gkr: The GKR function
+    :param field: arithmetic backend of the bookkeeping tables. Defaults to python integers.
     :return: randomness, f2(u)
     """
     # sanity check
@@ -151,28 +127,35 @@ def talkToVerifierPhase1(A_hg: List[int], gkr: GKR, verifier: GKRVerifier,
     assert verifier.state == GKRVerifierState.PHASE_ONE_LISTENING, "Verifier is not in phase one. "
     assert len(A_hg) == (1 << L), "Mismatch A_hg size and L"
 
-    As: Tuple[List[int], List[int]] = (A_hg, gkr.f2.copy())
-    _talk_process(As, L, p, verifier.talk_phase1, msgRecorder)
+    field = field if field is not None else PrimeField(p)
+    As: List[Table] = [field.table(A_hg), field.table(gkr.f2.copy())]
+    _talk_process(As, L, p, verifier.talk_phase1, msgRecorder, field)
 
-    return verifier.get_randomness_u(), As[1][0]
+    return verifier.get_randomness_u(), field.get(As[1], 0)
 
 
 def talk_to_verifier_phase2(A_f1: List[int], gkr: GKR, f2u: int, verifier: GKRVerifier,
-                            msgRecorder: Optional[List[List[int]]] = None) -> None:
+                            msgRecorder: Optional[List[List[int]]] = None, field: Optional[Field] = None) -> None:
     L = gkr.L
     p = gkr.p
-    A_f3_f2u = [(x * f2u) % p for x in gkr.f3]
+    field = field if field is not None else PrimeField(p)
+    A_f3_f2u = field.scale(field.table(gkr.f3.copy()), f2u)
 
     assert verifier.state == GKRVerifierState.PHASE_TWO_LISTENING, "Verifier is not in phase two. "
     assert len(A_f1) == (1 << L), "Mismatch A_f1 size and L"
 
-    As: Tuple[List[int], List[int]] = (A_f1, A_f3_f2u)
-    _talk_process(As, L, p, verifier.talk_phase2, msgRecorder)
+    As: List[Table] = [field.table(A_f1), A_f3_f2u]
+    _talk_process(As, L, p, verifier.talk_phase2, msgRecorder, field)
 
 
 class GKRProver:
-    def __init__(self, gkr: GKR):
+    def __init__(self, gkr: GKR, field: Optional[Field] = None):
+        """
+        :param gkr: the GKR function
+        :param field: arithmetic backend of the sum-check bookkeeping tables. Defaults to python integers.
+        """
         self.gkr = gkr
+        self.field: Optional[Field] = field
 
     def initializeAndGetSum(self, g: List[int]) -> Tuple[List[int], List[int], int]:
         """
@@ -180,7 +163,19 @@ class GKRProver:
         :return: Bookkeeping table h_g, G: precompute cache, sum
         """
         assert len(g) == self.gkr.L, "Size of g is incorrect"
-        A_hg, G = initialize_PhaseOne(self.gkr.f1, self.gkr.L, self.gkr.p, self.gkr.f3, g)
+        A_hg, G = initialize_PhaseOne(self.gkr.wiring(), self.gkr.L, self.gkr.p, self.gkr.f3, g)
+        s = sumOfGKR(A_hg, self.gkr.f2, self.gkr.p)
+        return A_hg, G, s
+
+    def initializeAndGetCombinedSum(self, gs: List[List[int]], alphas: List[int]) -> Tuple[List[int], List[int], int]:
+        """
+        Prove the claims at several points g_i with one proof. Give the resulting sum to GKRVerifier.forClaims.
+        :param gs: the points g_i
+        :param alphas: coefficients chosen by the verifier (see GKRVerifier.forClaims)
+        :return: Bookkeeping table sum_i alpha_i * h_(g_i), G = sum_i alpha_i * eq(g_i, z), and sum_i alpha_i * s_i
+        where s_i is the sum at g_i
+        """
+        A_hg, G = initialize_PhaseOne(self.gkr.wiring(), self.gkr.L, self.gkr.p, self.gkr.f3, gs, alphas)
         s = sumOfGKR(A_hg, self.gkr.f2, self.gkr.p)
         return A_hg, G, s
 
@@ -189,18 +184,19 @@ class GKRProver:
                         msgRecorderPhase2: Optional[List[List[int]]] = None) -> None:
         """
 
-        :param A_hg: bookkeeping table h_g
+        :param A_hg: bookkeeping table h_g (or the combination of several)
         :param G: precompute cache
-        :param s: sum
+        :param s: sum (or the combined sum)
         :param verifier: GKR verifier
         """
 
         assert verifier.asserted_sum == s, "Asserted sum mismatch"
 
-        u, f2u = talkToVerifierPhase1(A_hg, self.gkr, verifier, msgRecorderPhase1)
-        assert verifier.state == GKRVerifierState.PHASE_TWO_LISTENING, "Verifier does not accept phase 1 proof"
+        with eqCacheScope():  # the verifier expands eq(u, x) again to check the last claim
+            u, f2u = talkToVerifierPhase1(A_hg, self.gkr, verifier, msgRecorderPhase1, self.field)
+            assert verifier.state == GKRVerifierState.PHASE_TWO_LISTENING, "Verifier does not accept phase 1 proof"
 
-        A_f1 = initialize_PhaseTwo(self.gkr.f1, G, u, self.gkr.p)
-        talk_to_verifier_phase2(A_f1, self.gkr, f2u, verifier, msgRecorderPhase2)
+            A_f1 = initialize_PhaseTwo(self.gkr.wiring(), G, u, self.gkr.p)
+            talk_to_verifier_phase2(A_f1, self.gkr, f2u, verifier, msgRecorderPhase2, self.field)
 
 
@@ -1,10 +1,11 @@
 from enum import Enum
-from typing import List, Optional, Tuple
+from random import Random
+from typing import List, Optional, Sequence, Tuple
 
 from GKR import GKR
-from IPPMFVerifier import InteractivePMFVerifier, RandomGen
+from IPPMFVerifier import InteractivePMFVerifier, RandomGen, TrueRandomGen, MAX_ALLOWED_SOUNDNESS_ERROR
 from PMF import DummyPMF, MVLinear
-from multilinear_extension import evaluate, evaluate_sparse
+from multilinear_extension import evaluate
 
 
 class GKRVerifierState(Enum):
@@ -19,26 +20,32 @@ class GKRVerifier:
     An interactive verifier verifying the sum of GKR protocol.
     """
 
-    def __init__(self, gkr: GKR, g: List[int], asserted_sum: int, randomGen: Optional[RandomGen] = None):
+    def __init__(self, gkr: GKR, g: List[int], asserted_sum: int, randomGen: Optional[RandomGen] = None,
+                 maxAllowedSoundnessError: float = MAX_ALLOWED_SOUNDNESS_ERROR):
         self.state: GKRVerifierState = GKRVerifierState.PHASE_ONE_LISTENING
         self.randomGen = randomGen
         assert len(g) == gkr.L, "g should have same size as number of variables in f2 or f3"
         self.f1 = gkr.f1
+        self.wiring = gkr.wiring()
         self.f2 = gkr.f2
         self.f3 = gkr.f3
         self.g = g
+        self.gs: List[List[int]] = [g]
+        self.alphas: List[int] = [1]
+        """
+        the claims at points gs are combined with coefficients alphas (see forClaims)
+        """
         self.p = gkr.p
         L = gkr.L
         self.L = L
         self.asserted_sum = asserted_sum
+        self.maxAllowedSoundnessError = maxAllowedSoundnessError
         # Phase 1 verifier: product of h_g (no need for verifier to multiply) and f2 (no need to access)
         # we put dummy polynomial here because the subroutine verifier does not evaluate h_g and f2: it just check the
         # sum.
-        self.phase1_verifier: InteractivePMFVerifier = InteractivePMFVerifier(DummyPMF(num_multiplicands=2,
-                                                                                       num_variables=L, p=self.p),
-                                                                              asserted_sum=asserted_sum,
-                                                                              checksum_only=True,
-                                                                              randomGen=randomGen)
+        self.phase1_verifier: InteractivePMFVerifier = InteractivePMFVerifier(
+            DummyPMF(num_multiplicands=2, num_variables=L, p=self.p), asserted_sum=asserted_sum, checksum_only=True,
+            randomGen=randomGen, maxAllowedSoundnessError=maxAllowedSoundnessError)
         # phase 1 verifier generate sub claim u and its evaluation of product of h_g and f2 on x = u
 
         # phase 2 verifier: product of f1 at x = u and f3 times f2(u)
@@ -46,6 +53,31 @@ class GKRVerifier:
         # In current state, it is None, because the verifier not yet to know the sub claim.
         self.phase2_verifier: Optional[InteractivePMFVerifier] = None
 
+    @staticmethod
+    def forClaims(gkr: GKR, claims: Sequence[Tuple[List[int], int]], randomGen: Optional[RandomGen] = None,
+                  maxAllowedSoundnessError: float = MAX_ALLOWED_SOUNDNESS_ERROR) -> 'GKRVerifier':
+        """
+        Verify several claims sum over x, y of f1(g_i,x,y) * f2(x) * f3(y) = s_i with one proof. The verifier draws
+        alpha_i, and the two phases prove sum_i alpha_i * s_i, i.e. the same sum with G(z) = sum_i alpha_i * eq(g_i, z)
+        in place of eq(g, z). A Fiat-Shamir randomGen should have absorbed the claims before.
+        :param gkr: the GKR function
+        :param claims: (g_i, s_i) for each claim
+        :return: the verifier. Its asserted_sum is the combined sum.
+        """
+        if len(claims) == 0:
+            raise ValueError("No claims to verify.")
+        p = gkr.p
+        gen = randomGen if randomGen is not None else TrueRandomGen(Random().randint(0, 0xFFFFFFFF), p)
+        alphas = [gen.getRandomElement() for _ in claims]
+        combined = sum(a * s for a, (_, s) in zip(alphas, claims)) % p
+        verifier = GKRVerifier(gkr, claims[0][0], combined, randomGen=gen,
+                               maxAllowedSoundnessError=maxAllowedSoundnessError)
+        verifier.gs = [g for g, _ in claims]
+        verifier.alphas = alphas
+        for g in verifier.gs:
+            assert len(g) == gkr.L, "g should have same size as number of variables in f2 or f3"
+        return verifier
+
     def talk_phase1(self, msgs: List[int]) -> Tuple[bool, int]:
         if self.state != GKRVerifierState.PHASE_ONE_LISTENING:
             raise RuntimeError("Verifier is not in phase 1.")
@@ -57,7 +89,8 @@ class GKRVerifier:
                                                                    num_variables=L, p=self.p),  # dummy
                                                           asserted_sum=self.phase1_verifier.sub_claim()[1],
                                                           checksum_only=True,
-                                                          randomGen=self.randomGen)
+                                                          randomGen=self.randomGen,
+                                                          maxAllowedSoundnessError=self.maxAllowedSoundnessError)
             self.state = GKRVerifierState.PHASE_TWO_LISTENING
             return True, r
         if (not self.phase1_verifier.active) and (not self.phase1_verifier.convinced):
@@ -90,7 +123,8 @@ class GKRVerifier:
         v = self.phase2_verifier.sub_claim()[0]  # y
 
         # verify phase 2 verifier's claim
-        m1 = evaluate_sparse(self.f1, self.g + u + v, self.p)  # self.f1.eval(u+v)
+        # self.f1.eval(g+u+v), combined over the claims
+        m1 = sum(a * e for a, e in zip(self.alphas, self.wiring.evaluateMany([(g, u, v) for g in self.gs], self.p)))
         m2 = evaluate(self.f3, v, self.p) * evaluate(self.f2, u, self.p) % self.p
         # self.f3.eval(v) * self.f2.eval(u) % self.p
 
@@ -1,8 +1,12 @@
-from typing import List, Tuple, Optional
+from collections import Counter
+from multiprocessing.pool import Pool
+from typing import Callable, Dict, List, Tuple, Optional
 
+from field import Field, PrimeField, Table
 from IPPMFVerifier import InteractivePMFVerifier
 from FSPMFVerifier import PseudoRandomGen
 from PMF import PMF
+from polynomial import MVLinear
 
 def binaryToList(b: int, numVariables: int) -> List[int]:
     """
@@ -20,52 +24,92 @@ def binaryToList(b: int, numVariables: int) -> List[int]:
     return lst
 
 
+def multiplicandTable(args: Tuple[int, MVLinear, int]) -> Tuple[int, List[int]]:
+    """
+    Bookkeeping table of one multiplicand, computed in a pool worker.
+    """
+    index, multiplicand, num_variables = args
+    return index, multiplicand.to_evaluations(num_variables)
+
+
+def proveRounds(tables: List[Table], roundSums: Callable[[Field, List[Table]], List[int]], num_variables: int,
+                field: Field, verifier: InteractivePMFVerifier, gen: Optional[PseudoRandomGen] = None) \
+        -> Tuple[List[Table], List[List[int]]]:
+    """
+    The rounds of the sum-check protocol shared by the provers: send the round sums, and fold every table with the
+    challenge of the verifier.
+    :param tables: the bookkeeping tables
+    :param roundSums: computes the message of a round from the backend and the tables
+    :param num_variables: number of rounds
+    :param field: arithmetic backend of the tables
+    :param verifier: the active interactive PMF verifier instance
+    :param gen: in FS mode, the messages are appended to gen.message
+    :return: the folded tables; the prover messages
+    """
+    msgs: List[List[int]] = []
+    for _ in range(num_variables):
+        products_sum: List[int] = roundSums(field, tables)
+        if gen:
+            gen.message.append(products_sum)
+        else:
+            msgs.append(products_sum)
+        result, r = verifier.talk(products_sum)
+
+        assert result
+        if not isinstance(r, int) and not isinstance(field, PrimeField):
+            # the challenge is from an extension field: the folded tables leave the base field, and only the
+            # python integer kernels handle extension elements
+            tables = [field.to_list(A) for A in tables]
+            field = PrimeField(field.p)
+        tables = [field.fold(A, r) for A in tables]
+    return tables, gen.message if gen else msgs
+
+
 class InteractivePMFProver:
     """
     A linear honest prover of sum-check protocol for product of multilinear polynomials using dynamic programming.
     """
 
-    def __init__(self, polynomial: PMF):
+    def __init__(self, polynomial: PMF, field: Optional[Field] = None):
+        """
+        :param polynomial: the PMF
+        :param field: arithmetic backend of the bookkeeping tables. Defaults to python integers.
+        """
         self.poly: PMF = polynomial
         self.p = self.poly.p  # field size
+        self.field: Field = field if field is not None else PrimeField(self.p)
 
-    def attemptProve(self, As: List[List[int]], verifier: InteractivePMFVerifier, gen: Optional[PseudoRandomGen] = None) \
+    def attemptProve(self, As: List[Table], verifier: InteractivePMFVerifier, gen: Optional[PseudoRandomGen] = None) \
             -> List[List[int]]:
         """
         Attempt to prove the sum.
-        :param As: The bookkeeping table for each MVLinear in the PMF
+        :param As: The bookkeeping table for each MVLinear in the PMF. They are folded in place. Do not reuse them!
+        Entries that are the same object are treated as one table with a multiplicity.
         :param verifier: the active interactive PMF verifier instance
         :param gen: in FS mode, attemptProve will provide source of randomness for pseudorandom generator
         :return: the prover message
         """
-        l = self.poly.num_variables
-        msgs: List[List[int]] = []
-        # vT: float = 0
-        for i in range(1, l + 1):  # round
-            products_sum: List[int] = [0] * (self.poly.num_multiplicands() + 1)
-            for b in range(2 ** (l - i)):  # assignment
-                for t in range(self.poly.num_multiplicands() + 1):  # point evaluation
-                    product = 1
-                    for j in range(self.poly.num_multiplicands()):  # iterate over multiplicands to multiply
-                        A = As[j]
-                        product = product * (
-                                ((A[b << 1] * ((1 - t) % self.p)) + (A[(b << 1) + 1] * t) % self.p) % self.p) % self.p
-                    products_sum[t] = (products_sum[t] + product) % self.p
-            if gen:
-                gen.message.append(products_sum)
-            else:
-                msgs.append(products_sum)
-            result, r = verifier.talk(products_sum)
-
-            assert result
-            for j in range(self.poly.num_multiplicands()):
-                for b in range(2**(l-i)):
-                    As[j][b] = (As[j][b << 1] * (1 - r) + As[j][(b << 1) + 1] * r) % self.p
-
-        if gen:
-            return gen.message
-        else:
-            return msgs
+        # identical multiplicands share one table (see calculateAllBookKeepingTables): it is folded once, and its line
+        # is raised to its multiplicity
+        tables: List[Table] = []
+        multiplicities: List[int] = []
+        position: Dict[int, int] = {}
+        where: List[int] = []
+        for A in As:
+            if id(A) not in position:
+                position[id(A)] = len(tables)
+                tables.append(A)
+                multiplicities.append(0)
+            multiplicities[position[id(A)]] += 1
+            where.append(position[id(A)])
+        num_points = self.poly.num_multiplicands() + 1
+
+        def roundSums(field: Field, tables: List[Table]) -> List[int]:
+            return field.product_round_sums(tables, num_points, multiplicities)
+
+        tables, msgs = proveRounds(tables, roundSums, self.poly.num_variables, self.field, verifier, gen)
+        As[:] = [tables[j] for j in where]
+        return msgs
 
     def calculateSingleTable(self, index: int) -> List[int]:
         """
@@ -79,32 +123,35 @@ class InteractivePMFProver:
         if index >= self.poly.num_multiplicands():
             raise IndexError(f"PMF has only {self.poly.num_multiplicands()} multiplicands. index = {index}")
 
-        A: List[int] = [0] * (2 ** self.poly.num_variables)
-        for p in range(2 ** self.poly.num_variables):
-            A[p] = self.poly.multiplicands[index].eval(binaryToList(p, self.poly.num_variables))
-
-        return A
+        return self.poly.multiplicands[index].to_evaluations(self.poly.num_variables)
 
-    def calculateAllBookKeepingTables(self) -> Tuple[List[List[int]], int]:
+    def calculateAllBookKeepingTables(self, pool: Optional[Pool] = None) -> Tuple[List[Table], int]:
         """
         For all multiplicands of the PMF, calculate its bookkeeping table.The function all calculates the sum.
+        Identical multiplicands (by digest) share the same table object, and attemptProve folds it once.
+        :param pool: if given, the tables of the distinct multiplicands are computed concurrently in this process pool.
+        Each table is multiplied into the running product as soon as it arrives, in any order.
         :return: All bookkeeping table. The sum of the PMF.
         """
-
-        S: List[int] = [1] * (2 ** self.poly.num_variables)
-        As: List[List[int]] = []
-        for i in range(self.poly.num_multiplicands()):
-            A = self.calculateSingleTable(i)
-            # todo: might use vectorization here
-            for j in range(2 ** self.poly.num_variables):
-                S[j] = (S[j] * A[j]) % self.p
-
-            As.append(A)
-
-        s = 0
-        for x in S:
-            s = (s + x) % self.p
-
-        return As, s
-
-
+        n = self.poly.num_variables
+        keys = [multiplicand.digest() for multiplicand in self.poly.multiplicands]
+        multiplicity = Counter(keys)
+        first: Dict[bytes, int] = {}
+        for i, key in enumerate(keys):
+            first.setdefault(key, i)
+        if pool is None:
+            results = ((i, self.calculateSingleTable(i)) for i in first.values())
+        else:
+            jobs = [(i, self.poly.multiplicands[i], n) for i in first.values()]
+            results = pool.imap_unordered(multiplicandTable, jobs)
+
+        S = None
+        built: Dict[bytes, Table] = {}
+        for i, values in results:
+            A = self.field.table(values)
+            built[keys[i]] = A
+            for _ in range(multiplicity[keys[i]]):
+                S = A if S is None else self.field.mul(S, A)
+        As: List[Table] = [built[key] for key in keys]
+
+        return As, self.field.sum(S)
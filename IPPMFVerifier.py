@@ -1,8 +1,10 @@
 import math
+from functools import lru_cache
 from random import Random
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Union
 
-from PMF import PMF
+from extension import ExtensionField
+from PMF import PMF, SumOfPMF
 
 MAX_ALLOWED_SOUNDNESS_ERROR = 2e-64
 
@@ -24,14 +26,22 @@ class TrueRandomGen(RandomGen):
 
 class InteractivePMFVerifier:
     """
-    An interactive verifier that verifies the sum of the polynomial which is the product of multilinear functions
+    An interactive verifier that verifies the sum of the polynomial which is the product of multilinear functions,
+    or a sum of such products
     """
 
-    def __init__(self, poly: PMF, asserted_sum: int,
+    def __init__(self, poly: Union[PMF, SumOfPMF], asserted_sum: int,
                  maxAllowedSoundnessError: float = MAX_ALLOWED_SOUNDNESS_ERROR, checksum_only: bool = False,
-                 randomGen: Optional[RandomGen] = None):
+                 randomGen: Optional[RandomGen] = None, extension: Optional[ExtensionField] = None):
+        """
+        :param extension: if given, the challenges are drawn from this extension of the base field, and the prover
+        messages after the first round are elements of it. The soundness error shrinks to that of the extension field.
+        """
         self.checksum_only: bool = checksum_only
         self.p = poly.p
+        if extension is not None and extension.p != self.p:
+            raise ValueError("The extension field is not over the field of the polynomial.")
+        self.extension: Optional[ExtensionField] = extension
         self.poly = poly
         self.asserted_sum = asserted_sum % self.p
         self.randomGen = randomGen if randomGen is not None else TrueRandomGen(Random().randint(0, 0xFFFFFFFF), self.p)
@@ -82,23 +92,33 @@ class InteractivePMFVerifier:
         """
 
     def randomR(self) -> int:
-        return self.randomGen.getRandomElement()
+        if self.extension is None:
+            return self.randomGen.getRandomElement()
+        return self.extension([self.randomGen.getRandomElement() for _ in range(self.extension.k)])
+
+    def fieldSize(self) -> int:
+        """
+        :return: size of the field the challenges are drawn from
+        """
+        return self.p if self.extension is None else self.extension.size()
 
     def soundnessError(self) -> float:
         poly = self.poly
         deg = poly.num_variables * poly.num_multiplicands()
 
-        return (self.poly.num_variables * deg) / self.p
+        return (self.poly.num_variables * deg) / self.fieldSize()
 
     def requiredFieldLengthBit(self, e: float) -> int:
         """
         :param e: the maximum allowed soundness error
-        :return: The minimum size of prime required to meet the soundness error constraint.
+        :return: The minimum size of prime required to meet the soundness error constraint. With an extension field
+        of degree k, this is the size of the base prime, since the challenges are drawn from a field of size p^k.
         """
         poly = self.poly
         deg = poly.num_variables * poly.num_multiplicands()
         minP = (self.poly.num_variables * deg) / e
-        return math.ceil(math.log(minP, 2))
+        k = 1 if self.extension is None else self.extension.k
+        return math.ceil(math.log(minP, 2) / k)
 
     def talk(self, msgs: List[int]) -> Tuple[bool, int]:
         """
@@ -218,27 +238,83 @@ def modInverse(a: int, m: int):
     return x
 
 
+def batchInverse(values: List[int], p: int) -> List[int]:
+    """
+    Invert all values with a single modular inversion (Montgomery's trick).
+    :param values: nonzero field elements
+    :param p: prime
+    :return: [v^-1 mod p for v in values]
+    """
+    prefix: List[int] = [1] * (len(values) + 1)
+    for i, v in enumerate(values):
+        prefix[i + 1] = prefix[i] * v % p
+    inv = modInverse(prefix[-1], p)
+    result: List[int] = [0] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        result[i] = inv * prefix[i] % p
+        inv = inv * values[i] % p
+    return result
+
+
+class BarycentricInterpolator:
+    """
+    Evaluate the polynomial of degree < num_points through (0, P_0), (1, P_1), ..., using the barycentric form.
+    The weights only depend on the number of points and the field size, so they are computed once. Use
+    getInterpolator to share the instances.
+    """
+
+    def __init__(self, num_points: int, p: int):
+        self.num_points = num_points
+        self.p = p
+        # w_i = 1 / prod_{j != i} (i - j) = 1 / ((-1)^(d-i) * i! * (d-i)!) where d = num_points - 1
+        d = num_points - 1
+        fact: List[int] = [1] * num_points
+        for i in range(1, num_points):
+            fact[i] = fact[i - 1] * i % p
+        denominators = [fact[i] * fact[d - i] * (-1 if (d - i) & 1 else 1) % p for i in range(num_points)]
+        self.weights: List[int] = batchInverse(denominators, p)
+
+    def evaluate(self, points: List[int], r: int) -> int:
+        """
+        :param points: P_0, P_1, ..., P_(num_points - 1)
+        :param r: The point we want to evaluate at. It can also be an element of an extension field.
+        :return: P_r
+        """
+        p = self.p
+        n = self.num_points
+        r %= p
+        if isinstance(r, int) and r < n:
+            return points[r] % p
+        # P(r) = sum_i w_i * P_i * prod_{j != i} (r - j), using prefix and suffix products instead of inversions
+        diffs = [r - j for j in range(n)]
+        suffix: List[int] = [1] * (n + 1)
+        for j in range(n - 1, -1, -1):
+            suffix[j] = suffix[j + 1] * diffs[j] % p
+        result = 0
+        prefix = 1
+        for i in range(n):
+            result += self.weights[i] * points[i] % p * (prefix * suffix[i + 1] % p)
+            prefix = prefix * diffs[i] % p
+        return result % p
+
+
+@lru_cache(maxsize=128)
+def getInterpolator(num_points: int, p: int) -> BarycentricInterpolator:
+    """
+    :return: the shared interpolator for this number of points and field size
+    """
+    return BarycentricInterpolator(num_points, p)
+
+
 def interpolate(points: List[int], r: int, p: int):
     """
-    Interpolate and evaluate a PMF.
-    Adapted from https://www.geeksforgeeks.org/lagranges-interpolation/
+    Interpolate and evaluate a PMF. Takes O(m) multiplications using cached barycentric weights.
     :param points: P_0, P_1, P_2, ..., P_m where P is the product of m multilinear polynomials
     :param r: The point we want to evaluate at. In this scenario, the verifier wants to evaluate p_r.
     :param p: Field size.
     :return: P_r
     """
-
-    result = 0
-    for i in range(len(points)):
-
-        term = points[i] % p
-        for j in range(len(points)):
-            if j != i:
-                term = (term * ((r - j) % p) * modInverse((i - j) % p, p)) % p
-
-        result = (result + term) % p
-
-    return result
+    return getInterpolator(len(points), p).evaluate(points, r)
 
 class SoundnessErrorException(Exception):
     pass
\ No newline at end of file
@@ -1,5 +1,7 @@
-from typing import List, Tuple
+from typing import List, Tuple, Union, Optional
 
+from bookkeeping import BookkeepingTable
+from field import Field
 from polynomial import MVLinear
 from IPVerifier import InteractiveVerifier
 import time
@@ -26,26 +28,35 @@ class InteractiveLinearProver:
     A linear honest prover of sum-check protocol for multilinear polynomial using dynamic programming.
     """
 
-    def __init__(self, polynomial: MVLinear):
+    def __init__(self, polynomial: MVLinear, field: Optional[Field] = None):
+        """
+        :param polynomial: the multilinear polynomial
+        :param field: arithmetic backend of the bookkeeping table. Defaults to python integers.
+        """
         self.poly: MVLinear = polynomial
         self.p = self.poly.p  # field size
+        self.field: Optional[Field] = field
+
+    def _bookkeepingTable(self, A: Union[List[int], BookkeepingTable]) -> BookkeepingTable:
+        """
+        :return: the table that attemptProve folds, with round_sums and fold
+        """
+        return A if isinstance(A, BookkeepingTable) else BookkeepingTable(A, self.p, self.field)
 
-    def attemptProve(self, A: List[int], verifier: InteractiveVerifier, showDialog: bool = False) -> float:
+    def attemptProve(self, A: Union[List[int], BookkeepingTable], verifier: InteractiveVerifier,
+                     showDialog: bool = False) -> float:
         """
         Attempt to prove the sum.
-        :param A: The bookkeeping table
+        :param A: The bookkeeping table. It is folded in place. Do not reuse it!
         :param verifier:
         :param showDialog: whether show the dialog for test purpose
         :return: the running time of verifier
         """
         l = self.poly.num_variables
+        table = self._bookkeepingTable(A)
         vT: float = 0
         for i in range(1, l + 1):  # round
-            p0 = 0  # sum over P(fixed, 0, ...)
-            p1 = 0  # sum over P(fixed, 1, ...)
-            for b in range(2**(l-i)):
-                p0 = (p0 + A[b << 1]) % self.p
-                p1 = (p1 + A[(b << 1) + 1]) % self.p
+            p0, p1 = table.round_sums()  # sum over P(fixed, 0, ...) and P(fixed, 1, ...)
             if showDialog:
                 print(f"Round {i}: Prover Send P{i}(0) = {p0}, P{i}(1) = {p1}. "
                       f"P{i}(0) + P{i}(1) = {(p0 + p1) % self.p}")
@@ -56,8 +67,7 @@ class InteractiveLinearProver:
             vT += end - start   # timing
             if showDialog and verifier.active:
                 print(f"Verifier expects P{i+1}(0) + P{i+1}(1) to be P{i}({r}) = {verifier.expect}")
-            for b in range(2**(l-i)):
-                A[b] = (A[b << 1] * (1 - r) + A[(b << 1) + 1] * r) % self.p
+            table.fold(r)
 
         return vT
 
@@ -67,10 +77,9 @@ class InteractiveLinearProver:
         evaluated value; the sum
         """
 
-        A: List[int] = [0] * (2 ** self.poly.num_variables)
-        s = 0
-        for p in range(2 ** self.poly.num_variables):
-            A[p] = self.poly.eval(binaryToList(p, self.poly.num_variables))
-            s = (s + A[p]) % self.p
+        A: List[int] = self.poly.to_evaluations()
+        s = sum(A) % self.p
+        if self.field is not None:
+            return self.field.table(A), s
 
         return A, s
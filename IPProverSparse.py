@@ -0,0 +1,105 @@
+from typing import Dict, List, Tuple
+
+from bisect import bisect_left
+
+from IPProverLinear import InteractiveLinearProver
+from multilinear_extension import SparseMLE
+
+
+class SparseTable:
+    """
+    Sparse bookkeeping table: the nonzero entries as parallel arrays of indices (sorted) and values. Siblings 2c and
+    2c+1 are adjacent when both are present, so a fold is a single merge pass over the nonzero entries.
+    """
+
+    def __init__(self, keys: List[int], values: List[int], p: int):
+        """
+        :param keys: sorted indices of the nonzero entries
+        :param values: values of the nonzero entries
+        :param p: field size
+        """
+        self.keys = keys
+        self.values = values
+        self.p = p
+
+    @staticmethod
+    def fromDict(table: Dict[int, int], p: int) -> 'SparseTable':
+        keys = sorted(k for k, v in table.items() if v % p != 0)
+        return SparseTable(keys, [table[k] % p for k in keys], p)
+
+    def __len__(self) -> int:
+        """
+        :return: number of nonzero entries
+        """
+        return len(self.keys)
+
+    def __getitem__(self, index: int) -> int:
+        i = bisect_left(self.keys, index)
+        if i < len(self.keys) and self.keys[i] == index:
+            return self.values[i]
+        return 0
+
+    def round_sums(self) -> Tuple[int, int]:
+        """
+        :return: P(0), P(1) of the current round, i.e. the sums of the entries with even and odd index
+        """
+        p0 = p1 = 0
+        for k, v in zip(self.keys, self.values):
+            if k & 1:
+                p1 += v
+            else:
+                p0 += v
+        return p0 % self.p, p1 % self.p
+
+    def fold(self, r: int) -> None:
+        """
+        Fix the current variable to r: A[c] = (1 - r) * A[2c] + r * A[2c+1], merging sibling pairs. Entries that
+        become zero are dropped.
+        :param r: the challenge of the current round
+        """
+        p = self.p
+        s = 1 - r
+        keys, values = self.keys, self.values
+        N = len(keys)
+        new_keys: List[int] = []
+        new_values: List[int] = []
+        i = 0
+        while i < N:
+            k = keys[i]
+            if k & 1:
+                v = values[i] * r
+                i += 1
+            elif i + 1 < N and keys[i + 1] == k + 1:
+                v = values[i] * s + values[i + 1] * r
+                i += 2
+            else:
+                v = values[i] * s
+                i += 1
+            v %= p
+            if v:
+                new_keys.append(k >> 1)
+                new_values.append(v)
+        self.keys = new_keys
+        self.values = new_values
+
+
+class InteractiveSparseProver(InteractiveLinearProver):
+    """
+    An honest prover of sum-check protocol for the multilinear extension of a sparse table. Each round takes time
+    linear to the number of nonzero entries, instead of the size of the hypercube. The rounds are those of
+    InteractiveLinearProver, run on a SparseTable.
+    """
+
+    def __init__(self, polynomial: SparseMLE):
+        super().__init__(polynomial)
+        self.poly: SparseMLE = polynomial
+
+    def _bookkeepingTable(self, A: SparseTable) -> SparseTable:
+        return A
+
+    def calculateTable(self) -> Tuple[SparseTable, int]:
+        """
+        :return: the sparse bookkeeping table; the sum
+        """
+        A = SparseTable.fromDict(self.poly.evaluations, self.p)
+        return A, sum(A.values) % self.p
@@ -0,0 +1,176 @@
+"""
+Space-efficient sum-check prover. The multiplicands are given as streams of their evaluations over the boolean
+hypercube, and the prover never holds a full bookkeeping table: each round streams over all evaluations again and
+folds them on the fly with the eq weights of the challenges received so far.
+
+A memory budget trades time for space. While the remaining table is larger than the budget, rounds are streamed, which
+takes O(2^n) time per round and O(n + m) memory. Once the remaining table fits in the budget, it is materialized with
+one more pass, and the remaining rounds use the linear time bookkeeping kernels.
+"""
+from itertools import chain, islice
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Union
+
+from field import Field, PrimeField, Table
+from FSPMFVerifier import PseudoRandomGen
+from IPPMFVerifier import InteractivePMFVerifier
+from IPVerifier import InteractiveVerifier
+from multilinear_extension import eqWeights
+from PMF import PMF
+from polynomial import MVLinear
+
+Stream = Callable[[], Iterable[Sequence[int]]]
+"""
+Returns a fresh iterable of chunks. The chunks concatenate to the evaluations at b = 0, 1, ..., 2^n - 1, where bit i of
+b is the ith argument.
+"""
+
+
+def oracleStream(f: Callable[[int], int], num_variables: int, chunk_size: int = 1 << 12) -> Stream:
+    """
+    :param f: oracle returning the evaluation at the binary form b of the argument
+    :param num_variables: number of variables
+    :param chunk_size: number of evaluations in each chunk
+    :return: stream of the evaluations of the oracle
+    """
+    def chunks() -> Iterator[List[int]]:
+        N = 1 << num_variables
+        for start in range(0, N, chunk_size):
+            yield [f(b) for b in range(start, min(start + chunk_size, N))]
+    return chunks
+
+
+class StreamingPMFProver:
+    """
+    An honest prover of sum-check protocol for product of multilinear polynomials, given as streams of evaluations.
+    It talks to InteractivePMFVerifier, or to InteractiveVerifier when there is a single multiplicand.
+    """
+
+    def __init__(self, streams: Sequence[Stream], num_variables: int, p: int, budget: int = 1,
+                 field: Optional[Field] = None):
+        """
+        :param streams: one stream of evaluations for each multiplicand
+        :param num_variables: number of variables
+        :param p: field size
+        :param budget: largest number of entries per table to keep in memory. Rounds are streamed until the remaining
+        tables fit, then the prover switches to the bookkeeping tables. 1 streams every round.
+        :param field: arithmetic backend of the materialized tables. Defaults to python integers.
+        """
+        self.streams = list(streams)
+        self.num_variables = num_variables
+        self.p = p
+        self.budget = budget
+        self.field: Field = field if field is not None else PrimeField(p)
+
+    @staticmethod
+    def fromPMF(poly: Union[PMF, MVLinear], budget: int = 1, chunk_size: int = 1 << 12,
+                field: Optional[Field] = None) -> 'StreamingPMFProver':
+        """
+        Stream the multiplicands of a PMF (or a single multilinear polynomial) by evaluating them point by point.
+        """
+        multiplicands = poly.multiplicands if isinstance(poly, PMF) else [poly]
+        n = poly.num_variables
+        return StreamingPMFProver([oracleStream(m.eval_bin, n, chunk_size) for m in multiplicands], n, poly.p,
+                                  budget, field)
+
+    def _folded(self, r: List[int]) -> Iterator[List[int]]:
+        """
+        Stream the entries of the bookkeeping tables after fixing the first len(r) variables to r. Each entry is the
+        eq weighted sum of a block of 2^len(r) consecutive evaluations.
+        :return: iterator of [A_1[c], ..., A_m[c]] for c = 0, 1, ..., 2^(n - len(r)) - 1
+        """
+        p = self.p
+        m = len(self.streams)
+        evaluations = zip(*(chain.from_iterable(stream()) for stream in self.streams))
+        if not r:
+            for values in evaluations:
+                yield list(values)
+            return
+        block = 1 << len(r)
+        for _ in range(1 << (self.num_variables - len(r))):
+            acc = [0] * m
+            for w, values in zip(eqWeights(r, p), islice(evaluations, block)):
+                for j in range(m):
+                    acc[j] += w * values[j]
+            yield [x % p for x in acc]
+
+    def calculateSum(self) -> int:
+        """
+        :return: the sum of the product over the boolean hypercube, with one pass over the streams
+        """
+        p = self.p
+        s = 0
+        for values in self._folded([]):
+            prod = 1
+            for v in values:
+                prod = prod * v % p
+            s += prod
+        return s % p
+
+    def _streamRound(self, r: List[int]) -> List[int]:
+        """
+        :return: the message [P(0), ..., P(m)] of the round after fixing the first len(r) variables to r
+        """
+        p = self.p
+        num_points = len(self.streams) + 1
+        sums = [0] * num_points
+        entries = self._folded(r)
+        for even in entries:
+            odd = next(entries)
+            for t in range(num_points):
+                prod = 1
+                for a, b in zip(even, odd):
+                    prod = prod * (a + t * (b - a)) % p
+                sums[t] += prod
+        return [s % p for s in sums]
+
+    def _materialize(self, r: List[int]) -> List[Table]:
+        """
+        :return: the bookkeeping tables after fixing the first len(r) variables to r
+        """
+        tables: List[List[int]] = [[] for _ in self.streams]
+        for values in self._folded(r):
+            for A, v in zip(tables, values):
+                A.append(v)
+        return [self.field.table(A) for A in tables]
+
+    def attemptProve(self, verifier: Union[InteractivePMFVerifier, InteractiveVerifier],
+                     gen: Optional[PseudoRandomGen] = None) -> List[List[int]]:
+        """
+        Attempt to prove the sum.
+        :param verifier: the active interactive verifier instance
+        :param gen: in FS mode, attemptProve will provide source of randomness for pseudorandom generator
+        :return: the prover message
+        """
+        n = self.num_variables
+        field = self.field
+        msgs: List[List[int]] = []
+        r: List[int] = []
+        As: Optional[List[Table]] = None
+        for i in range(n):  # round
+            if As is None and (1 << (n - i)) <= self.budget:
+                As = self._materialize(r)
+            if As is None:
+                products_sum = self._streamRound(r)
+            else:
+                products_sum = field.product_round_sums(As, len(self.streams) + 1)
+            if gen:
+                gen.message.append(products_sum)
+            else:
+                msgs.append(products_sum)
+            if isinstance(verifier, InteractiveVerifier):
+                result, x = verifier.talk(products_sum[0], products_sum[1])
+            else:
+                result, x = verifier.talk(products_sum)
+            assert result
+            r.append(x)
+            if As is not None:
+                if not isinstance(x, int) and not isinstance(field, PrimeField):
+                    # the challenge is from an extension field (see InteractivePMFProver)
+                    As = [field.to_list(A) for A in As]
+                    field = PrimeField(self.p)
+                As = [field.fold(A, x) for A in As]
+
+        if gen:
+            return gen.message
+        else:
+            return msgs
@@ -0,0 +1,66 @@
+from multiprocessing.pool import Pool
+from typing import List, Tuple, Optional
+
+from field import Field, PrimeField, Table
+from IPPMFVerifier import InteractivePMFVerifier
+from FSPMFVerifier import PseudoRandomGen
+from IPPMFProver import multiplicandTable, proveRounds
+from PMF import SumOfPMF
+
+
+class InteractiveSumOfPMFProver:
+    """
+    A linear honest prover of sum-check protocol for a sum of products of multilinear polynomials. Each distinct
+    multiplicand has one bookkeeping table, which is folded once per round and shared by all terms that use it.
+    The messages are checked by InteractivePMFVerifier.
+    """
+
+    def __init__(self, polynomial: SumOfPMF, field: Optional[Field] = None):
+        """
+        :param polynomial: the sum of PMFs
+        :param field: arithmetic backend of the bookkeeping tables. Defaults to python integers.
+        """
+        self.poly: SumOfPMF = polynomial
+        self.p = self.poly.p  # field size
+        self.field: Field = field if field is not None else PrimeField(self.p)
+
+    def attemptProve(self, As: List[Table], verifier: InteractivePMFVerifier, gen: Optional[PseudoRandomGen] = None) \
+            -> List[List[int]]:
+        """
+        Attempt to prove the sum.
+        :param As: The bookkeeping table for each distinct multiplicand. They are folded in place. Do not reuse them!
+        :param verifier: the active interactive PMF verifier instance
+        :param gen: in FS mode, attemptProve will provide source of randomness for pseudorandom generator
+        :return: the prover message
+        """
+        num_points = self.poly.num_multiplicands() + 1
+
+        def roundSums(field: Field, tables: List[Table]) -> List[int]:
+            return field.sum_of_products_round_sums(tables, self.poly.terms, num_points)
+
+        tables, msgs = proveRounds(As, roundSums, self.poly.num_variables, self.field, verifier, gen)
+        As[:] = tables
+        return msgs
+
+    def calculateAllBookKeepingTables(self, pool: Optional[Pool] = None) -> Tuple[List[Table], int]:
+        """
+        Calculate the bookkeeping table of each distinct multiplicand once. The function also calculates the sum.
+        :param pool: if given, the tables are computed concurrently in this process pool
+        :return: All bookkeeping tables (indexed like self.poly.multiplicands). The sum of the polynomial.
+        """
+        n = self.poly.num_variables
+        field = self.field
+        if pool is None:
+            As: List[Table] = [field.table(poly.to_evaluations(n)) for poly in self.poly.multiplicands]
+        else:
+            As = [None] * len(self.poly.multiplicands)
+            jobs = [(i, poly, n) for i, poly in enumerate(self.poly.multiplicands)]
+            for i, values in pool.imap_unordered(multiplicandTable, jobs):
+                As[i] = field.table(values)
+        s = 0
+        for c, indices in self.poly.terms:
+            S = As[indices[0]]
+            for i in indices[1:]:
+                S = field.mul(S, As[i])
+            s += c * field.sum(S)
+        return As, s % self.p
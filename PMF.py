@@ -1,7 +1,7 @@
 from copy import copy
-from typing import List
+from typing import Dict, List, Sequence, Tuple, Union
 
-from polynomial import MVLinear
+from polynomial import MVLinear, digestOf
 
 
 class PMF:
@@ -20,6 +20,7 @@ class PMF:
                 raise ValueError("Field size mismatch.")
 
         self.multiplicands: List[MVLinear] = [copy(poly) for poly in multiplicands]
+        self._digest_cache = None
 
     def num_multiplicands(self) -> int:
         return len(self.multiplicands)
@@ -31,6 +32,20 @@ class PMF:
 
         return result
 
+    def digest(self) -> bytes:
+        """
+        Canonical digest of the product. Multiplicands are bound by their own cached digests in sorted order, since
+        the product does not depend on their order.
+        :return: the digest
+        """
+        parts = sorted(poly.digest() for poly in self.multiplicands)
+        key = (self.num_variables, self.p, tuple(parts))
+        if self._digest_cache is not None and self._digest_cache[0] == key:
+            return self._digest_cache[1]
+        d = digestOf(b'PMF', self.num_variables.to_bytes(4, 'little'), *parts)
+        self._digest_cache = (key, d)
+        return d
+
     # change field size
     @property
     def p(self):
@@ -57,6 +72,98 @@ class PMF:
         return f"Product[{','.join([poly.__repr__() for poly in self.multiplicands])}]"
 
 
+class SumOfPMF:
+    """
+    Sum of products of multilinear functions: sum_k c_k * prod_j f_(k,j). A multiplicand shared by several terms is
+    stored once, and each term refers to it by index.
+    """
+
+    def __init__(self, terms: Sequence[Tuple[int, Union[PMF, List[MVLinear]]]]):
+        """
+        :param terms: (c_k, multiplicands of term k) for each term. Multiplicands can be given as a PMF or a list.
+        """
+        if len(terms) == 0:
+            raise ValueError("Terms are empty.")
+        self.multiplicands: List[MVLinear] = []
+        self.terms: List[Tuple[int, List[int]]] = []
+        """
+        (coefficient, indices of the multiplicands in self.multiplicands) of each term
+        """
+        index: Dict[bytes, int] = {}
+        for c, factors in terms:
+            if isinstance(factors, PMF):
+                factors = factors.multiplicands
+            if len(factors) == 0:
+                raise ValueError("Multiplicands are empty.")
+            indices: List[int] = []
+            for poly in factors:
+                key = poly.digest()
+                if key not in index:
+                    index[key] = len(self.multiplicands)
+                    self.multiplicands.append(copy(poly))
+                indices.append(index[key])
+            self.terms.append((c, indices))
+        self._p = self.multiplicands[0].p
+        self.num_variables = max(poly.num_variables for poly in self.multiplicands)
+        for poly in self.multiplicands:
+            if poly.p != self._p:
+                raise ValueError("Field size mismatch.")
+        self.terms = [(c % self._p, indices) for c, indices in self.terms]
+        self._digest_cache = None
+
+    def num_multiplicands(self) -> int:
+        """
+        :return: the largest number of multiplicands in a term, i.e. the degree of each variable. The verifier of PMF
+        expects this many points plus one in each message.
+        """
+        return max(len(indices) for _, indices in self.terms)
+
+    def num_terms(self) -> int:
+        return len(self.terms)
+
+    def eval(self, at: List[int]) -> int:
+        p = self.p
+        evaluations = [poly.eval(at) for poly in self.multiplicands]
+        result = 0
+        for c, indices in self.terms:
+            prod = c
+            for i in indices:
+                prod = prod * evaluations[i] % p
+            result += prod
+        return result % p
+
+    def digest(self) -> bytes:
+        """
+        Canonical digest of the sum. Each term is bound by its coefficient and the sorted digests of its multiplicands,
+        and the terms are sorted, since the sum does not depend on their order.
+        :return: the digest
+        """
+        width = (self.p.bit_length() + 7) // 8
+        parts = [poly.digest() for poly in self.multiplicands]
+        key = (self.num_variables, self.p, tuple(parts), tuple((c, tuple(indices)) for c, indices in self.terms))
+        if self._digest_cache is not None and self._digest_cache[0] == key:
+            return self._digest_cache[1]
+        terms = sorted(digestOf(c.to_bytes(width, 'little'), *sorted(parts[i] for i in indices))
+                       for c, indices in self.terms)
+        d = digestOf(b'SumOfPMF', self.num_variables.to_bytes(4, 'little'), *terms)
+        self._digest_cache = (key, d)
+        return d
+
+    @property
+    def p(self):
+        return self._p
+
+    def __call__(self, *args, **kwargs):
+        return self.eval(list(args))
+
+    def __copy__(self):
+        return SumOfPMF([(c, [self.multiplicands[i] for i in indices]) for c, indices in self.terms])
+
+    def __repr__(self):
+        return " + ".join(f"{c}*Product[{','.join(self.multiplicands[i].__repr__() for i in indices)}]"
+                          for c, indices in self.terms)
+
+
 class DummyPMF(PMF):
     def __init__(self, num_multiplicands: int, num_variables: int, p: int):
         super(DummyPMF, self).__init__([MVLinear(num_variables, dict(), p)])
@@ -0,0 +1,175 @@
+"""
+Bookkeeping tables for the linear time sum-check provers.
+"""
+from typing import Any, List, Optional, Sequence, Tuple
+
+
+def fold(A: List[int], r: int, p: int) -> None:
+    """
+    Fix the first variable of the bookkeeping table to r in place: A[b] = A[2b] + r * (A[2b+1] - A[2b]). The table
+    shrinks to half of its size.
+    :param A: the bookkeeping table
+    :param r: the challenge
+    :param p: field size
+    """
+    half = len(A) >> 1
+    A[:half] = [(a + r * (b - a)) % p for a, b in zip(A[0::2], A[1::2])]
+    del A[half:]
+
+
+def eqTable(point: Sequence[int], p: int) -> List[int]:
+    """
+    Bookkeeping table of eq(point, b) = prod_i (point_i if b_i else 1 - point_i), where bit i of b pairs with point[i].
+    The table is expanded one variable at a time in a list of the final size: the lower half holds the table of the
+    variables so far, and each entry x splits into x - x * point_i and x * point_i. One multiplication per entry; each
+    variable builds the two new halves as temporary lists before writing them back.
+    :param point: the point
+    :param p: field size
+    :return: the table of size 2^len(point)
+    """
+    G: List[int] = [0] * (1 << len(point))
+    G[0] = 1
+    half = 1
+    exact = True  # all entries are reduced integers, so the subtraction only needs a conditional correction
+    for r in point:
+        exact = exact and isinstance(r, int)
+        lo = G[:half]
+        hi = [x * r % p for x in lo]
+        G[half:half << 1] = hi
+        if exact:
+            G[:half] = [x - y if x >= y else x - y + p for x, y in zip(lo, hi)]
+        else:
+            G[:half] = [(x - y) % p for x, y in zip(lo, hi)]
+        half <<= 1
+    return G
+
+
+ROUND_CHUNK = 1 << 12
+"""
+Number of pairs (A[2b], A[2b+1]) that productRoundSums and sumOfProductsRoundSums process at a time.
+"""
+
+
+def productRoundSums(tables: Sequence[List[int]], num_points: int, p: int,
+                     multiplicities: Optional[Sequence[int]] = None) -> List[int]:
+    """
+    Round message of the sum-check protocol for a product of multilinear polynomials.
+    Entry t of the result is the sum over b of prod_j ((1 - t) * A_j[2b] + t * A_j[2b+1]).
+    The line of each table is stepped incrementally (A_j[2b] + (t+1) * d = A_j[2b] + t * d + d, where
+    d = A_j[2b+1] - A_j[2b]), so each entry takes O(1) additions per point. The line values are not reduced, and the
+    sums are reduced once at the end. The entries are processed ROUND_CHUNK pairs at a time into running sums per
+    point, so the memory beyond the tables does not grow with their size.
+    :param tables: bookkeeping tables of the multiplicands, with the same size
+    :param num_points: number of evaluation points, i.e. degree + 1
+    :param p: field size
+    :param multiplicities: how many times each table appears in the product. A table with multiplicity e contributes
+    the eth power of its line, so repeated multiplicands are stepped once.
+    :return: [P(0), P(1), ..., P(num_points - 1)]
+    """
+    sums: List[int] = [0] * num_points
+    size = len(tables[0])
+    for lo in range(0, size, 2 * ROUND_CHUNK):
+        hi = min(lo + 2 * ROUND_CHUNK, size)
+        products: List[Optional[List[int]]] = [None] * num_points
+        for j, A in enumerate(tables):
+            e = 1 if multiplicities is None else multiplicities[j]
+            line = A[lo:hi:2]
+            d = [b - a for a, b in zip(line, A[lo + 1:hi:2])]
+            for t in range(num_points):
+                if t > 0:
+                    line = [x + y for x, y in zip(line, d)]
+                if e == 1:
+                    factor = line
+                elif isinstance(line[0], int):
+                    factor = [pow(x, e, p) for x in line]
+                else:  # elements of an extension field: their power takes no modulus
+                    factor = [x ** e % p for x in line]
+                if products[t] is None:
+                    products[t] = factor
+                else:
+                    products[t] = [x * y % p for x, y in zip(products[t], factor)]
+        for t in range(num_points):
+            sums[t] += sum(products[t])
+    return [s % p for s in sums]
+
+
+def sumOfProductsRoundSums(tables: Sequence[List[int]], terms: Sequence[Tuple[int, List[int]]], num_points: int,
+                           p: int) -> List[int]:
+    """
+    Round message of the sum-check protocol for a sum of products sum_k c_k * prod_j A_(k,j). The line of each
+    distinct table is stepped once per point and shared by all terms that use it. Like productRoundSums, the entries
+    are processed ROUND_CHUNK pairs at a time.
+    :param tables: bookkeeping tables of the distinct multiplicands, with the same size
+    :param terms: (c_k, indices of the tables of term k) for each term
+    :param num_points: number of evaluation points, i.e. largest degree + 1
+    :param p: field size
+    :return: [P(0), P(1), ..., P(num_points - 1)]
+    """
+    result: List[int] = [0] * num_points
+    size = len(tables[0])
+    for lo in range(0, size, 2 * ROUND_CHUNK):
+        hi = min(lo + 2 * ROUND_CHUNK, size)
+        lines = [A[lo:hi:2] for A in tables]
+        ds = [[b - a for a, b in zip(line, A[lo + 1:hi:2])] for line, A in zip(lines, tables)]
+        for t in range(num_points):
+            if t > 0:
+                lines = [[x + y for x, y in zip(line, d)] for line, d in zip(lines, ds)]
+            s = 0
+            for c, indices in terms:
+                prod = lines[indices[0]]
+                for i in indices[1:]:
+                    prod = [x * y % p for x, y in zip(prod, lines[i])]
+                s += c * sum(prod)
+            result[t] += s
+    return [s % p for s in result]
+
+
+class BookkeepingTable:
+    """
+    Bookkeeping table of a multilinear polynomial. Entry b is the evaluation of the polynomial at
+    (r_1, ..., r_i, binary form of b), where r_1, ..., r_i are the challenges received so far.
+    """
+
+    def __init__(self, A: List[int], p: int, field: Optional[Any] = None):
+        """
+        :param A: the table of size 2^l. It is folded in place and shrinks after each round. Do not reuse it!
+        :param p: field size
+        :param field: arithmetic backend (see field.py). If given, A is a table of that backend.
+        """
+        self.A = A
+        self.p: int = p
+        self.field = field
+        self._sums: Optional[Tuple[int, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.A)
+
+    def __getitem__(self, item: int) -> int:
+        return self.A[item] if self.field is None else self.field.get(self.A, item)
+
+    def round_sums(self) -> Tuple[int, int]:
+        """
+        :return: P(0), P(1) of the current round, i.e. the sums of the even and odd entries
+        """
+        if self._sums is None and self.field is not None:
+            self._sums = self.field.round_sums(self.A)
+        if self._sums is None:
+            A = self.A
+            # entries are already reduced, so sum first and reduce once
+            self._sums = (sum(A[0::2]) % self.p, sum(A[1::2]) % self.p)
+        return self._sums
+
+    def fold(self, r: int) -> None:
+        """
+        Fix the current variable to r: A[b] = A[2b] + r * (A[2b+1] - A[2b]). The storage shrinks to the new size, and
+        the sums of the next round are taken from the freshly folded half.
+        :param r: the challenge of the current round
+        """
+        if self.field is not None:
+            self.A = self.field.fold(self.A, r)
+            self._sums = self.field.round_sums(self.A) if len(self.A) > 1 else None
+            return
+        A = self.A
+        p = self.p
+        fold(A, r, p)
+        self._sums = (sum(A[0::2]) % p, sum(A[1::2]) % p) if len(A) > 1 else None
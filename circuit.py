@@ -0,0 +1,112 @@
+"""
+Layered arithmetic circuits for the GKR protocol.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from GKR import WiringIndex
+from polynomial import digestOf, sparseTableBytes
+
+ADD = 'add'
+MULT = 'mult'
+
+Gate = Tuple[str, int, int]
+"""
+(ADD or MULT, index of the left input, index of the right input). The inputs are gates of the next layer.
+"""
+
+
+class LayeredCircuit:
+    """
+    A layered arithmetic circuit over a prime field. Layer 0 is the output layer, and gate z of layer i reads gates x and
+    y of layer i + 1. The layer after the last one holds the inputs of the circuit. Layer i has 2^L_i slots, where L_i
+    fits its own gates, and the slots without a gate (or an input) have value zero.
+
+    The wiring of layer i is given by the predicates add_i(z,x,y) and mult_i(z,x,y), which are 1 if gate z is an add
+    (or mult) gate with inputs x and y, so that V_i(z) = sum over x, y of add_i(z,x,y) * (V_(i+1)(x) + V_(i+1)(y)) +
+    mult_i(z,x,y) * V_(i+1)(x) * V_(i+1)(y).
+    """
+
+    def __init__(self, layers: Sequence[Sequence[Gate]], num_inputs: int, p: int):
+        """
+        :param layers: the gates of each layer, from the output layer to the layer above the inputs
+        :param num_inputs: number of inputs
+        :param p: field size
+        """
+        if len(layers) == 0:
+            raise ValueError("The circuit should have at least one layer.")
+        sizes = [len(layer) for layer in layers] + [num_inputs]
+        if min(sizes) < 1:
+            raise ValueError("Every layer should have at least one gate.")
+        # the sum-check of a layer needs at least 2 variables
+        self.Ls: List[int] = [max(2, (s - 1).bit_length()) for s in sizes]
+        """
+        L_i of each layer, and of the inputs (layer self.depth)
+        """
+        Ls = self.Ls
+        self.p = p
+        self.num_inputs = num_inputs
+        self.layers: List[List[Gate]] = [list(layer) for layer in layers]
+        self.add: List[Dict[int, int]] = []
+        self.mult: List[Dict[int, int]] = []
+        for i, layer in enumerate(self.layers):
+            add: Dict[int, int] = dict()
+            mult: Dict[int, int] = dict()
+            for z, (kind, x, y) in enumerate(layer):
+                if not (0 <= x < sizes[i + 1] and 0 <= y < sizes[i + 1]):
+                    raise ValueError(f"Gate {z} of layer {i} reads ({x}, {y}), which are not in the next layer.")
+                arg = z | (x << Ls[i]) | (y << (Ls[i] + Ls[i + 1]))
+                if kind == ADD:
+                    add[arg] = 1
+                elif kind == MULT:
+                    mult[arg] = 1
+                else:
+                    raise ValueError(f"Unknown gate type {kind}.")
+            self.add.append(add)
+            self.mult.append(mult)
+        self.add_wiring: List[WiringIndex] = [WiringIndex(add, Ls[i], L_xy=Ls[i + 1]) for i, add in enumerate(self.add)]
+        self.mult_wiring: List[WiringIndex] = [WiringIndex(mult, Ls[i], L_xy=Ls[i + 1])
+                                               for i, mult in enumerate(self.mult)]
+        self._digest: Optional[bytes] = None
+
+    @property
+    def depth(self) -> int:
+        """
+        :return: number of layers of gates
+        """
+        return len(self.layers)
+
+    def evaluate(self, inputs: Sequence[int]) -> List[List[int]]:
+        """
+        :param inputs: the inputs of the circuit
+        :return: values of all 2^L_i slots of each layer, from the output layer to the inputs (layer self.depth)
+        """
+        if len(inputs) != self.num_inputs:
+            raise ValueError(f"Expect {self.num_inputs} inputs, but got {len(inputs)}.")
+        p = self.p
+        V = [x % p for x in inputs] + [0] * ((1 << self.Ls[-1]) - self.num_inputs)
+        values = [V]
+        for i in reversed(range(self.depth)):
+            layer = self.layers[i]
+            W = [0] * (1 << self.Ls[i])
+            for z, (kind, x, y) in enumerate(layer):
+                W[z] = (V[x] + V[y]) % p if kind == ADD else V[x] * V[y] % p
+            values.append(W)
+            V = W
+        values.reverse()
+        return values
+
+    def digest(self) -> bytes:
+        """
+        Canonical digest of the circuit: L_i of each layer, the field size, and the nonzero entries of each wiring
+        predicate. It is computed once, since the circuit is not modified.
+        """
+        if self._digest is None:
+            Ls = self.Ls
+            parts = []
+            for i, (add, mult) in enumerate(zip(self.add, self.mult)):
+                key_width = max(1, (Ls[i] + 2 * Ls[i + 1] + 7) // 8)
+                parts.append(digestOf(sparseTableBytes(add, key_width, self.p), sparseTableBytes(mult, key_width, self.p)))
+            self._digest = digestOf(b'LayeredCircuit', self.depth.to_bytes(4, 'little'),
+                                    self.p.to_bytes((self.p.bit_length() + 7) // 8, 'little'),
+                                    *(L.to_bytes(4, 'little') for L in Ls), *parts)
+        return self._digest
@@ -0,0 +1,222 @@
+"""
+Extension fields GF(p^k) = F_p[X] / (f(X)), used to sample the sum-check challenges over a small base field.
+
+Elements support +, -, * with each other and with base field integers, and `x % p` returns x itself (elements are
+always reduced), so the python integer kernels (bookkeeping.py, interpolate, MVLinear.eval) work on them unchanged.
+"""
+from typing import List, Optional, Sequence, Tuple, Union
+
+from polynomial import digestOf
+
+
+def _polyTrim(a: List[int]) -> List[int]:
+    while a and a[-1] == 0:
+        a.pop()
+    return a
+
+
+def _polyMod(a: List[int], f: List[int], p: int) -> List[int]:
+    """
+    :return: a mod f, where polynomials are little endian coefficient lists and f is nonzero
+    """
+    a = _polyTrim([x % p for x in a])
+    inv = pow(f[-1], p - 2, p)
+    df = len(f) - 1
+    while len(a) - 1 >= df:
+        c = a[-1] * inv % p
+        shift = len(a) - 1 - df
+        for i in range(df + 1):
+            a[shift + i] = (a[shift + i] - c * f[i]) % p
+        _polyTrim(a)
+    return a
+
+
+def _polyGcd(a: List[int], b: List[int], p: int) -> List[int]:
+    a = _polyTrim([x % p for x in a])
+    b = _polyTrim([x % p for x in b])
+    while b:
+        a, b = b, _polyMod(a, b, p)
+    return a
+
+
+class ExtensionField:
+    """
+    The field GF(p^k), represented as polynomials of degree < k over F_p modulo a monic irreducible polynomial f of
+    degree k.
+    """
+
+    def __init__(self, p: int, k: int, modulus: Optional[Sequence[int]] = None):
+        """
+        :param p: the base field size (prime)
+        :param k: extension degree
+        :param modulus: c_0, ..., c_(k-1) where f(X) = X^k + c_(k-1) X^(k-1) + ... + c_0. By default, the first
+        irreducible f = X^k + X + c is used.
+        """
+        if k < 1:
+            raise ValueError("Extension degree should be at least 1.")
+        self.p = p
+        self.k = k
+        if modulus is None:
+            modulus = self._defaultModulus()
+        elif len(modulus) != k:
+            raise ValueError(f"Modulus should have {k} coefficients.")
+        self.modulus: Tuple[int, ...] = tuple(c % p for c in modulus)
+        if not self.isIrreducible():
+            raise ValueError("Modulus is not irreducible.")
+
+    def _defaultModulus(self) -> Tuple[int, ...]:
+        if self.k == 1:
+            return 0,
+        for c in range(1, self.p):
+            self.modulus = (c, 1) + (0,) * (self.k - 2)
+            if self.isIrreducible():
+                return self.modulus
+        raise ValueError(f"No irreducible polynomial X^{self.k} + X + c over F_{self.p}.")
+
+    def isIrreducible(self) -> bool:
+        """
+        Ben-Or test: f of degree k is irreducible iff gcd(X^(p^i) - X, f) = 1 for every i <= k / 2.
+        """
+        f = list(self.modulus) + [1]
+        X = self([0, 1]) if self.k > 1 else None
+        h = X
+        for _ in range(self.k // 2):
+            h = h ** self.p
+            g = _polyGcd(list((h - X).coefficients), f, self.p)
+            if len(g) > 1:
+                return False
+        return True
+
+    def size(self) -> int:
+        """
+        :return: number of elements, p^k
+        """
+        return self.p ** self.k
+
+    def digest(self) -> bytes:
+        """
+        :return: canonical digest of the field, to bind it into a transcript
+        """
+        width = (self.p.bit_length() + 7) // 8
+        return digestOf(self.k.to_bytes(8, 'little'), self.p.to_bytes(width, 'little'),
+                        *(c.to_bytes(width, 'little') for c in self.modulus))
+
+    def __call__(self, coefficients: Union[int, Sequence[int]]) -> 'ExtElement':
+        """
+        :param coefficients: a base field element, or the k coefficients (little endian) of the element
+        """
+        if isinstance(coefficients, int):
+            coefficients = [coefficients]
+        if len(coefficients) > self.k:
+            raise ValueError(f"Expect at most {self.k} coefficients.")
+        p = self.p
+        return ExtElement(self, tuple(c % p for c in coefficients) + (0,) * (self.k - len(coefficients)))
+
+    def __eq__(self, other):
+        return isinstance(other, ExtensionField) and (self.p, self.modulus) == (other.p, other.modulus)
+
+    def __hash__(self):
+        return hash((self.p, self.modulus))
+
+    def __repr__(self):
+        return f"ExtensionField(p={self.p}, k={self.k})"
+
+
+class ExtElement:
+    """
+    An element of an extension field. Immutable.
+    """
+    __slots__ = ('field', 'coefficients')
+
+    def __init__(self, field: ExtensionField, coefficients: Tuple[int, ...]):
+        """
+        :param field: the extension field
+        :param coefficients: k reduced coefficients, little endian. Use field(...) to construct from arbitrary values.
+        """
+        self.field = field
+        self.coefficients = coefficients
+
+    def _coefficientsOf(self, other: Union[int, 'ExtElement']) -> Tuple[int, ...]:
+        if isinstance(other, ExtElement):
+            if other.field is not self.field and other.field != self.field:
+                raise ArithmeticError("Cannot operate on elements of different fields.")
+            return other.coefficients
+        return (other,) + (0,) * (self.field.k - 1)
+
+    def __add__(self, other):
+        if isinstance(other, int):
+            c = list(self.coefficients)
+            c[0] = (c[0] + other) % self.field.p
+            return ExtElement(self.field, tuple(c))
+        if not isinstance(other, ExtElement):
+            return NotImplemented
+        p = self.field.p
+        pairs = zip(self.coefficients, self._coefficientsOf(other))
+        return ExtElement(self.field, tuple((a + b) % p for a, b in pairs))
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        p = self.field.p
+        return ExtElement(self.field, tuple(-a % p for a in self.coefficients))
+
+    def __sub__(self, other):
+        if not isinstance(other, (int, ExtElement)):
+            return NotImplemented
+        return self + (-other)
+
+    def __rsub__(self, other):
+        return (-self) + other
+
+    def __mul__(self, other):
+        p = self.field.p
+        if isinstance(other, int):
+            return ExtElement(self.field, tuple(a * other % p for a in self.coefficients))
+        if not isinstance(other, ExtElement):
+            return NotImplemented
+        k = self.field.k
+        b = self._coefficientsOf(other)
+        prod = [0] * (2 * k - 1)
+        for i, x in enumerate(self.coefficients):
+            if x:
+                for j, y in enumerate(b):
+                    prod[i + j] += x * y
+        # X^k = -(c_0 + c_1 X + ... + c_(k-1) X^(k-1))
+        modulus = self.field.modulus
+        for i in range(2 * k - 2, k - 1, -1):
+            t = prod[i] % p
+            if t:
+                for j, c in enumerate(modulus):
+                    prod[i - k + j] -= t * c
+        return ExtElement(self.field, tuple(x % p for x in prod[:k]))
+
+    __rmul__ = __mul__
+
+    def __pow__(self, e: int):
+        result = self.field(1)
+        base = self
+        while e > 0:
+            if e & 1:
+                result = result * base
+            base = base * base
+            e >>= 1
+        return result
+
+    def __mod__(self, p: int):
+        # elements are always reduced
+        return self
+
+    def __eq__(self, other):
+        if isinstance(other, int):
+            return self.coefficients == self._coefficientsOf(other % self.field.p)
+        if isinstance(other, ExtElement):
+            return self.field == other.field and self.coefficients == other.coefficients
+        return NotImplemented
+
+    def __hash__(self):
+        if not any(self.coefficients[1:]):
+            return hash(self.coefficients[0])  # consistent with the base field integer
+        return hash(self.coefficients)
+
+    def __repr__(self):
+        return f"ExtElement({list(self.coefficients)})"
@@ -0,0 +1,220 @@
+"""
+Arithmetic backends for bookkeeping tables.
+"""
+from typing import Any, List, Optional, Sequence, Tuple
+
+from bookkeeping import eqTable, fold, productRoundSums, sumOfProductsRoundSums
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional: only the vectorized backends need it
+    np = None
+
+Table = Any
+"""
+A bookkeeping table. Its type depends on the backend.
+"""
+
+
+class Field:  # abstract
+    """
+    Arithmetic backend of a prime field. Provers keep their bookkeeping tables in the backend's table type and use
+    these kernels to process whole tables at once.
+    """
+
+    def __init__(self, p: int):
+        self.p = p
+
+    def table(self, values: List[int]) -> Table:
+        """
+        :param values: field elements. The backend may take ownership of the list.
+        :return: the table holding values
+        """
+        raise NotImplementedError()
+
+    def to_list(self, table: Table) -> List[int]:
+        raise NotImplementedError()
+
+    def get(self, table: Table, index: int) -> int:
+        raise NotImplementedError()
+
+    def size(self, table: Table) -> int:
+        return len(table)
+
+    def sum(self, table: Table) -> int:
+        raise NotImplementedError()
+
+    def mul(self, a: Table, b: Table) -> Table:
+        """
+        :return: element-wise product of a and b
+        """
+        raise NotImplementedError()
+
+    def scale(self, table: Table, c: int) -> Table:
+        """
+        :return: table multiplied by the scalar c
+        """
+        raise NotImplementedError()
+
+    def fold(self, table: Table, r: int) -> Table:
+        """
+        Fix the first variable to r: A[b] = A[2b] + r * (A[2b+1] - A[2b]). The input table may be reused.
+        :return: the folded table, which has half of the size
+        """
+        raise NotImplementedError()
+
+    def round_sums(self, table: Table) -> Tuple[int, int]:
+        """
+        :return: sum of even entries, sum of odd entries
+        """
+        raise NotImplementedError()
+
+    def product_round_sums(self, tables: Sequence[Table], num_points: int,
+                           multiplicities: Optional[Sequence[int]] = None) -> List[int]:
+        """
+        :param multiplicities: the power of each table in the product. Defaults to 1 for all.
+        :return: [P(0), ..., P(num_points - 1)] where P(t) = sum over b of prod_j ((1-t) A_j[2b] + t A_j[2b+1])^e_j
+        """
+        raise NotImplementedError()
+
+    def _power(self, table: Table, e: int) -> Table:
+        """
+        :return: entrywise eth power of the table (e >= 1), by square and multiply
+        """
+        result = None
+        while True:
+            if e & 1:
+                result = table if result is None else self.mul(result, table)
+            e >>= 1
+            if e == 0:
+                return result
+            table = self.mul(table, table)
+
+    def sum_of_products_round_sums(self, tables: Sequence[Table], terms: Sequence[Tuple[int, List[int]]],
+                                   num_points: int) -> List[int]:
+        """
+        :param terms: (c_k, indices into tables) of each term
+        :return: [P(0), ..., P(num_points - 1)] of the sum over k of c_k * prod_(j in term k) A_j
+        """
+        result = [0] * num_points
+        for c, indices in terms:
+            for t, s in enumerate(self.product_round_sums([tables[i] for i in indices], num_points)):
+                result[t] += c * s
+        return [s % self.p for s in result]
+
+    def eq_table(self, point: List[int]) -> Table:
+        """
+        :return: the table of eq(point, b) = prod_i (point_i if b_i else 1 - point_i) over the boolean hypercube
+        """
+        raise NotImplementedError()
+
+
+class PrimeField(Field):
+    """
+    Reference backend. Tables are lists of python integers, so p can be of any size.
+    """
+
+    def table(self, values: List[int]) -> List[int]:
+        # the kernels reduce as they go, so the list is used as is
+        return values
+
+    def to_list(self, table: List[int]) -> List[int]:
+        return list(table)
+
+    def get(self, table: List[int], index: int) -> int:
+        return table[index]
+
+    def sum(self, table: List[int]) -> int:
+        return sum(table) % self.p
+
+    def mul(self, a: List[int], b: List[int]) -> List[int]:
+        p = self.p
+        return [x * y % p for x, y in zip(a, b)]
+
+    def scale(self, table: List[int], c: int) -> List[int]:
+        p = self.p
+        return [x * c % p for x in table]
+
+    def fold(self, table: List[int], r: int) -> List[int]:
+        fold(table, r, self.p)
+        return table
+
+    def round_sums(self, table: List[int]) -> Tuple[int, int]:
+        return sum(table[0::2]) % self.p, sum(table[1::2]) % self.p
+
+    def product_round_sums(self, tables: Sequence[List[int]], num_points: int,
+                           multiplicities: Optional[Sequence[int]] = None) -> List[int]:
+        return productRoundSums(tables, num_points, self.p, multiplicities)
+
+    def sum_of_products_round_sums(self, tables: Sequence[List[int]], terms: Sequence[Tuple[int, List[int]]],
+                                   num_points: int) -> List[int]:
+        return sumOfProductsRoundSums(tables, terms, num_points, self.p)
+
+    def eq_table(self, point: List[int]) -> List[int]:
+        return eqTable(point, self.p)
+
+
+class NumpyPrimeField(Field):
+    """
+    Vectorized backend for primes below 2^32. Tables are numpy uint64 arrays, so the product of two elements never
+    overflows. Table sums are exact as long as tables have less than 2^32 entries.
+    """
+
+    def __init__(self, p: int):
+        if np is None:
+            raise ImportError("NumpyPrimeField requires numpy.")
+        if p >= 1 << 32:
+            raise ValueError("NumpyPrimeField requires p < 2^32.")
+        super().__init__(p)
+        self._p = np.uint64(p)
+
+    def table(self, values: List[int]) -> 'np.ndarray':
+        p = self.p
+        return np.array([x % p for x in values], dtype=np.uint64)
+
+    def to_list(self, table: 'np.ndarray') -> List[int]:
+        return [int(x) for x in table]
+
+    def get(self, table: 'np.ndarray', index: int) -> int:
+        return int(table[index])
+
+    def sum(self, table: 'np.ndarray') -> int:
+        return int(table.sum(dtype=np.uint64)) % self.p
+
+    def mul(self, a: 'np.ndarray', b: 'np.ndarray') -> 'np.ndarray':
+        return a * b % self._p
+
+    def scale(self, table: 'np.ndarray', c: int) -> 'np.ndarray':
+        return table * np.uint64(c % self.p) % self._p
+
+    def fold(self, table: 'np.ndarray', r: int) -> 'np.ndarray':
+        p = self._p
+        a = table[0::2]
+        d = (table[1::2] + p - a) % p
+        return (a + d * np.uint64(r % self.p) % p) % p
+
+    def round_sums(self, table: 'np.ndarray') -> Tuple[int, int]:
+        return self.sum(table[0::2]), self.sum(table[1::2])
+
+    def product_round_sums(self, tables: Sequence['np.ndarray'], num_points: int,
+                           multiplicities: Optional[Sequence[int]] = None) -> List[int]:
+        p = self._p
+        products: List[Any] = [None] * num_points
+        for j, A in enumerate(tables):
+            e = 1 if multiplicities is None else multiplicities[j]
+            line = A[0::2]
+            d = (A[1::2] + p - line) % p
+            for t in range(num_points):
+                if t > 0:
+                    line = (line + d) % p
+                factor = line if e == 1 else self._power(line, e)
+                products[t] = factor if products[t] is None else products[t] * factor % p
+        return [self.sum(products[t]) for t in range(num_points)]
+
+    def eq_table(self, point: List[int]) -> 'np.ndarray':
+        p = self._p
+        G = np.ones(1, dtype=np.uint64)
+        for g in point:
+            hi = G * np.uint64(g % self.p) % p
+            G = np.concatenate(((G + p - hi) % p, hi))
+        return G
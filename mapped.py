@@ -0,0 +1,198 @@
+"""
+Bookkeeping tables backed by memory-mapped files, for instances whose tables do not fit in memory.
+
+Each table is a file of fixed-width little endian field elements. The kernels of MappedPrimeField go through the tables
+sequentially in blocks, so the working set is a few blocks regardless of the table size, and the file is only read and
+written in large sequential pieces.
+"""
+import mmap
+import os
+import tempfile
+import weakref
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from bookkeeping import productRoundSums, sumOfProductsRoundSums
+from field import Field
+from multilinear_extension import eqWeights
+
+DEFAULT_BLOCK_SIZE = 1 << 16
+
+
+def _close(mm: mmap.mmap, file, path: str) -> None:
+    mm.close()
+    file.close()
+    os.remove(path)
+
+
+class MappedTable:
+    """
+    A table of field elements in a memory-mapped file. Only the first `size` entries are valid: folding shrinks the
+    table in place. The file is deleted when the table is closed or garbage collected.
+    """
+
+    def __init__(self, file, path: str, size: int, width: int):
+        """
+        Use loadTable to create a table.
+        :param file: the open file, of size * width bytes
+        :param path: path of the file
+        :param size: number of elements
+        :param width: bytes per element
+        """
+        self.path = path
+        self.size = size
+        self.width = width
+        self._mm = mmap.mmap(file.fileno(), size * width)
+        self._finalizer = weakref.finalize(self, _close, self._mm, file, path)
+
+    def close(self) -> None:
+        """
+        Unmap and delete the file.
+        """
+        self._finalizer()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def read(self, start: int, stop: int) -> List[int]:
+        """
+        :return: elements [start, stop)
+        """
+        w = self.width
+        buf = self._mm[start * w:stop * w]
+        return [int.from_bytes(buf[i:i + w], 'little') for i in range(0, len(buf), w)]
+
+    def write(self, start: int, values: Sequence[int]) -> None:
+        """
+        Overwrite the elements from start on. The values should be reduced.
+        """
+        w = self.width
+        self._mm[start * w:(start + len(values)) * w] = b''.join(x.to_bytes(w, 'little') for x in values)
+
+    def blocks(self, block_size: int) -> Iterator[Tuple[int, List[int]]]:
+        """
+        :return: iterator of (start, elements [start, start + block_size)) over the valid entries
+        """
+        for start in range(0, self.size, block_size):
+            yield start, self.read(start, min(start + block_size, self.size))
+
+
+def loadTable(values: Iterable[int], p: int, directory: Optional[str] = None,
+              block_size: int = DEFAULT_BLOCK_SIZE) -> MappedTable:
+    """
+    Bulk loader: write the elements from an iterable (for example a generator) straight to a new mapped file, one block
+    at a time, so the table never needs to be in memory.
+    :param values: field elements in index order
+    :param p: field size
+    :param directory: where to create the file. Defaults to the system temporary directory.
+    :param block_size: number of elements written at once
+    :return: the table
+    """
+    width = (p.bit_length() + 7) // 8
+    fd, path = tempfile.mkstemp(suffix='.table', dir=directory)
+    file = os.fdopen(fd, 'w+b')
+    size = 0
+    it = iter(values)
+    while True:
+        block = list(islice(it, block_size))
+        if not block:
+            break
+        file.write(b''.join((x % p).to_bytes(width, 'little') for x in block))
+        size += len(block)
+    file.flush()
+    if size == 0:
+        file.close()
+        os.remove(path)
+        raise ValueError("Table is empty.")
+    return MappedTable(file, path, size, width)
+
+
+class MappedPrimeField(Field):
+    """
+    Backend whose tables are MappedTables. Fold works in place: block k of pairs is folded into the first half of the
+    file, which is always behind the next block to read.
+    """
+
+    def __init__(self, p: int, directory: Optional[str] = None, block_size: int = DEFAULT_BLOCK_SIZE):
+        """
+        :param p: field size
+        :param directory: where to create the table files. Defaults to the system temporary directory.
+        :param block_size: number of elements per block. Should be even.
+        """
+        super().__init__(p)
+        if block_size < 2 or block_size & 1:
+            raise ValueError("Block size should be a positive even number.")
+        self.directory = directory
+        self.block_size = block_size
+
+    def load(self, values: Iterable[int]) -> MappedTable:
+        """
+        Bulk loader of this backend. See loadTable.
+        """
+        return loadTable(values, self.p, self.directory, self.block_size)
+
+    def table(self, values: Iterable[int]) -> MappedTable:
+        return self.load(values)
+
+    def to_list(self, table: MappedTable) -> List[int]:
+        return table.read(0, table.size)
+
+    def get(self, table: MappedTable, index: int) -> int:
+        return table.read(index, index + 1)[0]
+
+    def size(self, table: MappedTable) -> int:
+        return table.size
+
+    def sum(self, table: MappedTable) -> int:
+        return sum(sum(block) for _, block in table.blocks(self.block_size)) % self.p
+
+    def _zipped(self, tables: Sequence[MappedTable]) -> Iterator[List[List[int]]]:
+        """
+        :return: iterator over the aligned blocks of tables of the same size
+        """
+        B = self.block_size
+        size = tables[0].size
+        for start in range(0, size, B):
+            stop = min(start + B, size)
+            yield [t.read(start, stop) for t in tables]
+
+    def mul(self, a: MappedTable, b: MappedTable) -> MappedTable:
+        p = self.p
+        return self.load(x * y % p for A, B in self._zipped([a, b]) for x, y in zip(A, B))
+
+    def scale(self, table: MappedTable, c: int) -> MappedTable:
+        p = self.p
+        return self.load(x * c % p for _, block in table.blocks(self.block_size) for x in block)
+
+    def fold(self, table: MappedTable, r: int) -> MappedTable:
+        p = self.p
+        for start, block in table.blocks(self.block_size):
+            table.write(start >> 1, [(a + r * (b - a)) % p for a, b in zip(block[0::2], block[1::2])])
+        table.size >>= 1
+        return table
+
+    def round_sums(self, table: MappedTable) -> Tuple[int, int]:
+        s0 = s1 = 0
+        for _, block in table.blocks(self.block_size):
+            s0 += sum(block[0::2])
+            s1 += sum(block[1::2])
+        return s0 % self.p, s1 % self.p
+
+    def product_round_sums(self, tables: Sequence[MappedTable], num_points: int,
+                           multiplicities: Optional[Sequence[int]] = None) -> List[int]:
+        result = [0] * num_points
+        for blocks in self._zipped(tables):
+            for t, s in enumerate(productRoundSums(blocks, num_points, self.p, multiplicities)):
+                result[t] += s
+        return [s % self.p for s in result]
+
+    def sum_of_products_round_sums(self, tables: Sequence[MappedTable], terms: Sequence[Tuple[int, List[int]]],
+                                   num_points: int) -> List[int]:
+        result = [0] * num_points
+        for blocks in self._zipped(tables):
+            for t, s in enumerate(sumOfProductsRoundSums(blocks, terms, num_points, self.p)):
+                result[t] += s
+        return [s % self.p for s in result]
+
+    def eq_table(self, point: List[int]) -> MappedTable:
+        return self.load(eqWeights(point, self.p))
@@ -1,36 +1,32 @@
-import math
-from typing import List, Dict
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
-from polynomial import MVLinear, makeMVLinearConstructor
+from field import Field, PrimeField, Table, np
+
+from polynomial import MVLinear, TrackedDict, digestOf, sparseTableBytes
 
 
 def extend(data: List[int], fieldSize: int) -> MVLinear:
     """
-    Convert an array to a polynomial where the argument is the binary form of index.
+    Convert an array to a polynomial where the argument is the binary form of index. Interpolation uses a Mobius
+    transform, which takes O(l * 2^l) time.
     :param data: Array of size 2^l. If the size of array is not power of 2, out-of-range part will be arbitrary.
     :param fieldSize: The size of finite field that the array value belongs.
     :return: The result MVLinear P(x1, x2, ..., xl) = Arr[0bxl...x1]
     """
-    l: int = math.ceil(math.log(len(data), 2))
-    p = fieldSize
-    gen = makeMVLinearConstructor(l, p)
-    x = [gen({1 << i: 1}) for i in range(l)]  # predefine x_1, ..., x_l
-
-    poly_terms = {i: 0 for i in range(2**l)}
-
-    for b in range(len(data)):
-        sub_poly = gen({b: data[b]})
-        xi0 = [x[i] for i in range(l) if b >> i & 1 == 0]
-        sub_poly *= _product1mx(xi0, 0, len(xi0)-1)
-        for t, v in sub_poly.terms.items():
-            poly_terms[t] += v
-
-    return gen(poly_terms)
+    l: int = (len(data) - 1).bit_length()
+    A: List[int] = list(data)
+    if len(A) < (1 << l):
+        A += [0] * ((1 << l) - len(A))
+    return MVLinear.from_evaluations(A, fieldSize)
 
 
 def extend_sparse(data: Dict[int, int], num_var: int, fieldSize: int) -> MVLinear:
     """
     Convert an sparse map to a polynomial where the argument is the binary form of index.
+    The Mobius transform is applied one variable at a time to the nonzero entries only. The coefficients of the result
+    lie in the upward closure of the nonzero indices, so the running time is O(l * size of that closure).
     :param data: sparse map if index<2^L. If the size of array is not power of 2, out-of-range part will be arbitrary.
     :param num_var: number of variables
     :param fieldSize: The size of finite field that the array value belongs.
@@ -38,39 +34,30 @@ def extend_sparse(data: Dict[int, int], num_var: int, fieldSize: int) -> MVLinea
     """
     l: int = num_var
     p = fieldSize
-    gen = makeMVLinearConstructor(l, p)
-    x = [gen({1 << i: 1}) for i in range(l)]  # predefine x_1, ..., x_l
-
-    poly_terms = {i: 0 for i in range(2**l)}
 
-    for b, vb in data.items():
-        sub_poly = gen({b: vb})
-        xi0 = [x[i] for i in range(l) if b >> i & 1 == 0]
-        sub_poly *= _product1mx(xi0, 0, len(xi0)-1)
-        for t, v in sub_poly.terms.items():
-            poly_terms[t] += v
+    coefficients: Dict[int, int] = {b: vb % p for b, vb in data.items() if vb % p != 0}
+    for i in range(l):
+        bit = 1 << i
+        # coefficient of t = t' + x_i: subtract the coefficient of t'
+        lower = [(k, v) for k, v in coefficients.items() if not k & bit]
+        for k, v in lower:
+            t = k | bit
+            c = (coefficients.get(t, 0) - v) % p
+            if c == 0:
+                coefficients.pop(t, None)
+            else:
+                coefficients[t] = c
 
-    return gen(poly_terms)
+    return MVLinear(l, coefficients, p)
 
-def _product1mx(xs: List[MVLinear], lo: int, hi: int):
-    """
-    Divide and conquer algorithm for calculating product of (1-xi)
-    """
-    if lo == hi:
-        return 1 - xs[lo]
-    if hi > lo:
-        L = _product1mx(xs, lo, lo + (hi - lo) // 2)
-        R = _product1mx(xs, lo + (hi - lo) // 2 + 1, hi)
-        return L * R
-    return 1
 
-
-def evaluate(data: List[int], arguments: List[int],  fieldSize: int) -> int:
+def evaluate(data: List[int], arguments: List[int],  fieldSize: int, field: Optional[Field] = None) -> int:
     """
     Directly evaluate a polynomial based on multilinear extension. The function takes linear time to the size of data.
     :param data: The bookkeeping table (where the multilinear extension is based on)
     :param arguments: Input argument
     :param fieldSize:
+    :param field: arithmetic backend to fold the table with. Defaults to python integers.
     :return:
     """
 
@@ -78,14 +65,14 @@ def evaluate(data: List[int], arguments: List[int],  fieldSize: int) -> int:
     p = fieldSize
     assert len(data) <= (1 << L), "Insufficient data"
 
-    A: List[int] = data.copy()
+    A: List[int] = list(data)
     if len(A) < (1 << L):
-        A += [0] * (1 << L - len(A))
-    for i in range(1, L + 1):
-        r = arguments[i-1]
-        for b in range(2**(L-i)):
-            A[b] = (A[b << 1] * (1 - r) + A[(b << 1) + 1] * r) % p
-    return A[0]
+        A += [0] * ((1 << L) - len(A))
+    field = field if field is not None else PrimeField(p)
+    T = field.table(A)
+    for r in arguments:
+        T = field.fold(T, r)
+    return field.get(T, 0) % p
 
 
 def evaluate_sparse(data: Dict[int, int], arguments: List[int], fieldSize: int) -> int:
@@ -114,4 +101,156 @@ def evaluate_sparse(data: Dict[int, int], arguments: List[int], fieldSize: int)
         dp1 = dict()
     if 0 not in dp0:
         return 0
-    return dp0[0]
\ No newline at end of file
+    return dp0[0]
+
+
+EQ_CACHE_SIZE = 4
+"""
+Number of tables kept by cachedEqTable inside an eqCacheScope. A table of L variables has 2^L entries.
+"""
+
+_eq_cache: 'Optional[OrderedDict[Tuple[type, int, Tuple[int, ...]], Table]]' = None
+
+
+@contextmanager
+def eqCacheScope() -> Iterator[None]:
+    """
+    Cache the tables of cachedEqTable while the block runs, e.g. for one proof, and drop them when it exits. Outside
+    of a scope, cachedEqTable expands each table again. Nested scopes share the cache of the outermost one.
+    """
+    global _eq_cache
+    if _eq_cache is not None:
+        yield
+        return
+    _eq_cache = OrderedDict()
+    try:
+        yield
+    finally:
+        _eq_cache = None
+
+
+def cachedEqTable(point: Sequence[int], fieldSize: int, field: Optional[Field] = None) -> Table:
+    """
+    Bookkeeping table of eq(point, b) over the boolean hypercube, where bit i of b pairs with point[i]. Inside an
+    eqCacheScope, the last EQ_CACHE_SIZE tables are cached, keyed by the point and the backend, so the same point (e.g.
+    g of a GKR layer, checked by both the prover and the verifier) is expanded once. Only tables that are plain values
+    are cached and handed out read-only: a tuple for python integers, or a numpy array that is not writeable. Backends
+    whose tables are handles to state of the field instance (e.g. ParallelPrimeField, MappedPrimeField) get a new
+    table on each call.
+    :param point: the point
+    :param fieldSize: field size
+    :param field: backend of the table, e.g. NumpyPrimeField. Defaults to a list of python integers.
+    :return: the table
+    """
+    field = field if field is not None else PrimeField(fieldSize)
+    key = (type(field), fieldSize, tuple(point))
+    if _eq_cache is not None:
+        table = _eq_cache.get(key)
+        if table is not None:
+            _eq_cache.move_to_end(key)
+            return table
+    table = field.eq_table(list(point))
+    if isinstance(table, list):
+        table = tuple(table)
+    elif np is not None and type(table) is np.ndarray:
+        table.setflags(write=False)
+    else:
+        return table
+    if _eq_cache is not None:
+        _eq_cache[key] = table
+        if len(_eq_cache) > EQ_CACHE_SIZE:
+            _eq_cache.popitem(last=False)
+    return table
+
+
+def combinedEqTable(points: Sequence[Sequence[int]], coefficients: Sequence[int], fieldSize: int) -> List[int]:
+    """
+    :return: the table of sum_i coefficients[i] * eq(points[i], b) over the boolean hypercube. A single point with
+    coefficient 1 gives a copy of its eq table.
+    """
+    p = fieldSize
+    G: List[int] = [0] * (1 << len(points[0]))
+    for c, point in zip(coefficients, points):
+        G = [(g + c * e) % p for g, e in zip(G, cachedEqTable(point, p))]
+    return G
+
+
+def eqWeights(r: Sequence[int], p: int) -> Iterator[int]:
+    """
+    Yield eq(r, a) = prod_k (r_k if bit k of a else 1 - r_k) for a = 0, 1, ..., 2^len(r) - 1, using O(len(r)) memory.
+    S[k] is the product of the factors of bits k and above. Going from a - 1 to a only changes the bits up to the lowest
+    set bit of a, so only those products are recomputed: amortized O(1) multiplications per weight.
+    """
+    i = len(r)
+    S = [1] * (i + 1)
+    for k in range(i - 1, -1, -1):
+        S[k] = S[k + 1] * (1 - r[k]) % p
+    yield S[0]
+    for a in range(1, 1 << i):
+        t = (a & -a).bit_length() - 1
+        S[t] = S[t + 1] * r[t] % p
+        for k in range(t - 1, -1, -1):
+            S[k] = S[k + 1] * (1 - r[k]) % p
+        yield S[0]
+
+
+class SparseMLE:
+    """
+    Multilinear extension of a sparse bookkeeping table: only the nonzero evaluations on the boolean hypercube are
+    stored. The coefficient form of a sparse table can be dense, so this is the statement of the sparse sum-check
+    prover instead of MVLinear.
+    """
+
+    def __init__(self, num_variables: int, evaluations: Dict[int, int], p: int):
+        """
+        :param num_variables: number of variables
+        :param evaluations: map from the binary form of the argument (little endian) to the evaluation
+        :param p: field size
+        """
+        if any(k >> num_variables for k in evaluations):
+            raise ValueError("Index of an evaluation exceeds the number of variables.")
+        self.num_variables = num_variables
+        self.p = p
+        self.evaluations: Dict[int, int] = TrackedDict((k, v % p) for k, v in evaluations.items() if v % p != 0)
+
+    def eval(self, at: List[int]) -> int:
+        return evaluate_sparse(self.evaluations, at[:self.num_variables], self.p)
+
+    def __call__(self, *args, **kwargs):
+        return self.eval(list(args))
+
+    def eval_bin(self, at: int) -> int:
+        return self.evaluations.get(at, 0)
+
+    def to_evaluations(self) -> List[int]:
+        A = [0] * (1 << self.num_variables)
+        for k, v in self.evaluations.items():
+            A[k] = v
+        return A
+
+    def toMVLinear(self) -> MVLinear:
+        return extend_sparse(self.evaluations, self.num_variables, self.p)
+
+    def digest(self) -> bytes:
+        """
+        Canonical digest of the statement: number of variables, field size and the nonzero evaluations sorted by
+        index. Cached until the evaluations are modified.
+        :return: the digest
+        """
+        if not isinstance(self.evaluations, TrackedDict):
+            self.evaluations = TrackedDict(self.evaluations)
+        cache = self.evaluations.digest_cache
+        if cache is not None and cache[0] == (self.num_variables, self.p):
+            return cache[1]
+        key_width = max(1, (self.num_variables + 7) // 8)
+        d = digestOf(b'SparseMLE', self.num_variables.to_bytes(4, 'little'),
+                     self.p.to_bytes((self.p.bit_length() + 7) // 8, 'little'),
+                     sparseTableBytes(self.evaluations, key_width, self.p))
+        self.evaluations.digest_cache = ((self.num_variables, self.p), d)
+        return d
+
+    def __copy__(self):
+        return SparseMLE(self.num_variables, dict(self.evaluations), self.p)
+
+    def __repr__(self):
+        return f"SparseMLE(num_variables={self.num_variables}, nonzeros={len(self.evaluations)}, p={self.p})"
@@ -0,0 +1,303 @@
+"""
+Multi-core backend for the bookkeeping tables.
+
+Each worker process owns a contiguous slice of every table for the whole proof, so only the challenges and the partial
+round sums cross process boundaries in each round. The slices are aligned to granules of size / serial_threshold
+entries, so folding a slice in place keeps it aligned, and the partition of a folded table is the partition of a fresh
+table of the same size. Once a table shrinks to serial_threshold entries, it is gathered into the main process and the
+remaining rounds run serially.
+"""
+import multiprocessing
+import os
+import weakref
+from itertools import count
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from bookkeeping import fold, productRoundSums, sumOfProductsRoundSums
+from field import Field, PrimeField
+
+DEFAULT_SERIAL_THRESHOLD = 1 << 12
+
+
+Tables = Dict[int, List[int]]
+
+
+def _put(tables: Tables, p: int, i: int, values: List[int]) -> None:
+    tables[i] = values
+
+
+def _get(tables: Tables, p: int, i: int) -> List[int]:
+    return tables[i]
+
+
+def _fold(tables: Tables, p: int, i: int, r: int) -> None:
+    fold(tables[i], r, p)
+
+
+def _mul(tables: Tables, p: int, out: int, a: int, b: int) -> None:
+    tables[out] = [x * y % p for x, y in zip(tables[a], tables[b])]
+
+
+def _scale(tables: Tables, p: int, out: int, a: int, c: int) -> None:
+    tables[out] = [x * c % p for x in tables[a]]
+
+
+def _sum(tables: Tables, p: int, i: int) -> int:
+    return sum(tables[i]) % p
+
+
+def _round_sums(tables: Tables, p: int, i: int) -> Tuple[int, int]:
+    A = tables[i]
+    return sum(A[0::2]) % p, sum(A[1::2]) % p
+
+
+def _product_round_sums(tables: Tables, p: int, ids: List[int], num_points: int,
+                        multiplicities: Optional[List[int]]) -> List[int]:
+    return productRoundSums([tables[i] for i in ids], num_points, p, multiplicities)
+
+
+def _sum_of_products_round_sums(tables: Tables, p: int, ids: List[int], terms: List[Tuple[int, List[int]]],
+                                num_points: int) -> List[int]:
+    return sumOfProductsRoundSums([tables[i] for i in ids], terms, num_points, p)
+
+
+_COMMANDS: Dict[str, Callable[..., Any]] = {
+    'put': _put,
+    'get': _get,
+    'fold': _fold,
+    'mul': _mul,
+    'scale': _scale,
+    'sum': _sum,
+    'round_sums': _round_sums,
+    'product_round_sums': _product_round_sums,
+    'sum_of_products_round_sums': _sum_of_products_round_sums,
+}
+"""
+Handler of each command of the workers: handler(tables of the worker, p, *args) returns the answer.
+"""
+
+
+def _worker(conn, p: int) -> None:
+    """
+    Serve commands from the main process. Each command is answered with exactly one message.
+    """
+    tables: Tables = {}
+    while True:
+        cmd, args, freed = conn.recv()
+        for i in freed:
+            tables.pop(i, None)
+        if cmd == 'stop':
+            conn.send(None)
+            return
+        try:
+            if cmd not in _COMMANDS:
+                raise ValueError(f"Unknown command {cmd}")
+            conn.send((True, _COMMANDS[cmd](tables, p, *args)))
+        except Exception as e:  # report to the main process instead of dying
+            conn.send((False, e))
+
+
+class ParallelTable:
+    """
+    Handle of a table of ParallelPrimeField. Either the workers hold the slices [bounds[w], bounds[w+1]), or the table
+    is small and local holds all entries.
+    """
+    __slots__ = ('id', 'size', 'bounds', 'local', '__weakref__')
+
+    def __init__(self, id: int, size: int, bounds: Optional[List[int]], local: Optional[List[int]]):
+        self.id = id
+        self.size = size
+        self.bounds = bounds
+        self.local = local
+
+    def __len__(self):
+        return self.size
+
+
+class ParallelPrimeField(Field):
+    """
+    Splits the hypercube index range of each table across worker processes. Each worker computes the partial round
+    sums of its slice and folds its slice in place. The results are the same as PrimeField.
+
+    Use it as a context manager, or call close() to stop the workers.
+    """
+
+    def __init__(self, p: int, num_workers: Optional[int] = None,
+                 serial_threshold: int = DEFAULT_SERIAL_THRESHOLD):
+        """
+        :param p: field size
+        :param num_workers: number of worker processes. Defaults to the number of CPUs.
+        :param serial_threshold: tables of at most this size are kept in the main process. A power of two that is at
+        least the number of workers.
+        """
+        super().__init__(p)
+        self.num_workers = num_workers if num_workers is not None else (os.cpu_count() or 1)
+        if serial_threshold & (serial_threshold - 1) or serial_threshold < self.num_workers:
+            raise ValueError("serial_threshold should be a power of two, and at least the number of workers.")
+        self.serial_threshold = serial_threshold
+        self._serial = PrimeField(p)
+        self._ids = count()
+        self._freed: List[int] = []
+        ctx = multiprocessing.get_context()
+        self._conns = []
+        self._processes = []
+        for _ in range(self.num_workers):
+            parent, child = ctx.Pipe()
+            process = ctx.Process(target=_worker, args=(child, p), daemon=True)
+            process.start()
+            child.close()
+            self._conns.append(parent)
+            self._processes.append(process)
+
+    def close(self) -> None:
+        """
+        Stop the worker processes.
+        """
+        if not self._processes:
+            return
+        self._broadcast('stop', [()] * self.num_workers)
+        for process in self._processes:
+            process.join()
+        self._conns = []
+        self._processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def _broadcast(self, cmd: str, args: Sequence[Any]) -> List[Any]:
+        """
+        Send a command to all workers (args[w] to worker w), then wait for all of them, so they run in parallel.
+        """
+        freed, self._freed = self._freed, []
+        for conn, a in zip(self._conns, args):
+            conn.send((cmd, a, freed))
+        results = []
+        for conn in self._conns:
+            reply = conn.recv()
+            if cmd == 'stop':
+                continue
+            ok, result = reply
+            if not ok:
+                raise result
+            results.append(result)
+        return results
+
+    def _bounds(self, size: int) -> List[int]:
+        T = self.serial_threshold
+        granule = size // T
+        return [(w * T // self.num_workers) * granule for w in range(self.num_workers + 1)]
+
+    def _new(self, size: int, bounds: Optional[List[int]], local: Optional[List[int]]) -> ParallelTable:
+        table = ParallelTable(next(self._ids), size, bounds, local)
+        if bounds is not None:
+            # the slices on the workers are freed with the next command once the handle is dropped
+            weakref.finalize(table, self._release, table.id)
+        return table
+
+    def _release(self, table_id: int) -> None:
+        # look up self._freed on release: _broadcast swaps in a new list for each command
+        self._freed.append(table_id)
+
+    def _distributed(self, size: int) -> bool:
+        return size > self.serial_threshold and size % self.serial_threshold == 0
+
+    def _gather(self, table: ParallelTable) -> List[int]:
+        if table.local is not None:
+            return table.local
+        result: List[int] = []
+        for part in self._broadcast('get', [(table.id,)] * self.num_workers):
+            result.extend(part)
+        return result
+
+    def _aligned(self, tables: Sequence[ParallelTable]) -> bool:
+        return all(t.bounds is not None and t.bounds == tables[0].bounds for t in tables)
+
+    def table(self, values: List[int]) -> ParallelTable:
+        N = len(values)
+        if not self._distributed(N):
+            return self._new(N, None, values)
+        bounds = self._bounds(N)
+        table = self._new(N, bounds, None)
+        self._broadcast('put', [(table.id, values[bounds[w]:bounds[w + 1]]) for w in range(self.num_workers)])
+        return table
+
+    def to_list(self, table: ParallelTable) -> List[int]:
+        return list(self._gather(table))
+
+    def get(self, table: ParallelTable, index: int) -> int:
+        if table.local is not None:
+            return table.local[index]
+        return self.to_list(table)[index]
+
+    def size(self, table: ParallelTable) -> int:
+        return table.size
+
+    def sum(self, table: ParallelTable) -> int:
+        if table.local is not None:
+            return self._serial.sum(table.local)
+        return sum(self._broadcast('sum', [(table.id,)] * self.num_workers)) % self.p
+
+    def mul(self, a: ParallelTable, b: ParallelTable) -> ParallelTable:
+        if not self._aligned([a, b]):
+            return self.table(self._serial.mul(self._gather(a), self._gather(b)))
+        out = self._new(a.size, a.bounds, None)
+        self._broadcast('mul', [(out.id, a.id, b.id)] * self.num_workers)
+        return out
+
+    def scale(self, table: ParallelTable, c: int) -> ParallelTable:
+        if table.local is not None:
+            return self._new(table.size, None, self._serial.scale(table.local, c))
+        out = self._new(table.size, table.bounds, None)
+        self._broadcast('scale', [(out.id, table.id, c % self.p)] * self.num_workers)
+        return out
+
+    def fold(self, table: ParallelTable, r: int) -> ParallelTable:
+        if table.local is not None:
+            fold(table.local, r, self.p)
+            table.size = len(table.local)
+            return table
+        self._broadcast('fold', [(table.id, r)] * self.num_workers)
+        size = table.size >> 1
+        if self._distributed(size):
+            table.bounds = [b >> 1 for b in table.bounds]
+            table.size = size
+            return table
+        # sequential tail
+        return self._new(size, None, self._gather(table))
+
+    def round_sums(self, table: ParallelTable) -> Tuple[int, int]:
+        if table.local is not None:
+            return self._serial.round_sums(table.local)
+        sums = self._broadcast('round_sums', [(table.id,)] * self.num_workers)
+        return sum(s[0] for s in sums) % self.p, sum(s[1] for s in sums) % self.p
+
+    def _combine(self, parts: List[List[int]]) -> List[int]:
+        return [sum(column) % self.p for column in zip(*parts)]
+
+    def product_round_sums(self, tables: Sequence[ParallelTable], num_points: int,
+                           multiplicities: Optional[Sequence[int]] = None) -> List[int]:
+        if not self._aligned(tables):
+            return self._serial.product_round_sums([self._gather(t) for t in tables], num_points, multiplicities)
+        ids = [t.id for t in tables]
+        return self._combine(self._broadcast('product_round_sums',
+                                             [(ids, num_points, multiplicities)] * self.num_workers))
+
+    def sum_of_products_round_sums(self, tables: Sequence[ParallelTable], terms: Sequence[Tuple[int, List[int]]],
+                                   num_points: int) -> List[int]:
+        if not self._aligned(tables):
+            return self._serial.sum_of_products_round_sums([self._gather(t) for t in tables], terms, num_points)
+        ids = [t.id for t in tables]
+        return self._combine(self._broadcast('sum_of_products_round_sums',
+                                             [(ids, terms, num_points)] * self.num_workers))
+
+    def eq_table(self, point: List[int]) -> ParallelTable:
+        return self.table(self._serial.eq_table(point))
@@ -1,9 +1,197 @@
-import copy
+import hashlib
 import random
-from typing import Dict, List, Union, Callable
+from types import MappingProxyType
+from typing import Dict, List, Union, Callable, Optional, Mapping
 from IPython.display import display, Latex
 
 from Crypto.Util.number import getPrime
+
+DIGEST_SIZE = 64
+
+
+class TrackedDict(dict):
+    """
+    A dict that forgets its cached digest and index whenever it is modified in place.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.digest_cache = None
+        self.index_cache = None
+
+    def __setitem__(self, key, value):
+        self.digest_cache = None
+        self.index_cache = None
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.digest_cache = None
+        self.index_cache = None
+        super().__delitem__(key)
+
+    def pop(self, *args):
+        self.digest_cache = None
+        self.index_cache = None
+        return super().pop(*args)
+
+    def popitem(self):
+        self.digest_cache = None
+        self.index_cache = None
+        return super().popitem()
+
+    def setdefault(self, *args):
+        self.digest_cache = None
+        self.index_cache = None
+        return super().setdefault(*args)
+
+    def update(self, *args, **kwargs):
+        self.digest_cache = None
+        self.index_cache = None
+        super().update(*args, **kwargs)
+
+    def clear(self):
+        self.digest_cache = None
+        self.index_cache = None
+        super().clear()
+
+    def __reduce__(self):
+        # the caches are rebuilt on demand, and may hold objects that cannot be pickled
+        return TrackedDict, (dict(self),)
+
+
+class TrackedList(list):
+    """
+    A list that forgets its cached digest and index whenever it is modified in place.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.digest_cache = None
+        self.index_cache = None
+
+    def __reduce__(self):
+        # the caches are rebuilt on demand, and may hold objects that cannot be pickled
+        return TrackedList, (list(self),)
+
+    def __setitem__(self, key, value):
+        self.digest_cache = None
+        self.index_cache = None
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.digest_cache = None
+        self.index_cache = None
+        super().__delitem__(key)
+
+    def __iadd__(self, other):
+        self.digest_cache = None
+        self.index_cache = None
+        return super().__iadd__(other)
+
+    def __imul__(self, other):
+        self.digest_cache = None
+        self.index_cache = None
+        return super().__imul__(other)
+
+    def append(self, x):
+        self.digest_cache = None
+        self.index_cache = None
+        super().append(x)
+
+    def extend(self, xs):
+        self.digest_cache = None
+        self.index_cache = None
+        super().extend(xs)
+
+    def insert(self, i, x):
+        self.digest_cache = None
+        self.index_cache = None
+        super().insert(i, x)
+
+    def pop(self, *args):
+        self.digest_cache = None
+        self.index_cache = None
+        return super().pop(*args)
+
+    def remove(self, x):
+        self.digest_cache = None
+        self.index_cache = None
+        super().remove(x)
+
+    def reverse(self):
+        self.digest_cache = None
+        self.index_cache = None
+        super().reverse()
+
+    def sort(self, *args, **kwargs):
+        self.digest_cache = None
+        self.index_cache = None
+        super().sort(*args, **kwargs)
+
+    def clear(self):
+        self.digest_cache = None
+        self.index_cache = None
+        super().clear()
+
+
+def sparseTableBytes(table: Mapping[int, int], key_width: int, p: int) -> bytes:
+    """
+    Canonical encoding of a sparse table: nonzero entries sorted by key, with fixed-width keys and values.
+    """
+    width = (p.bit_length() + 7) // 8
+    return b''.join(k.to_bytes(key_width, 'little') + (table[k] % p).to_bytes(width, 'little')
+                    for k in sorted(table) if table[k] % p != 0)
+
+
+def denseTableBytes(table: List[int], p: int) -> bytes:
+    """
+    Canonical encoding of a dense table: every entry with fixed width.
+    """
+    width = (p.bit_length() + 7) // 8
+    return b''.join((v % p).to_bytes(width, 'little') for v in table)
+
+
+def digestOf(*parts: bytes) -> bytes:
+    h = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    for part in parts:
+        h.update(len(part).to_bytes(8, 'little'))
+        h.update(part)
+    return h.digest()
+
+
+def subsetSumTransform(A: List[int], inverse: bool = False) -> None:
+    """
+    In-place zeta transform over subsets: A[m] becomes the sum of A[s] over all s that are subsets of m. With inverse,
+    compute the Mobius transform instead: A[m] becomes the alternating sum. Takes O(n * 2^n) additions where
+    len(A) = 2^n.
+    The transform is not reduced: results are bounded by 2^n times the largest input in absolute value, so the
+    caller reduces once at the end.
+    :param A: an array of size power of 2
+    :param inverse: False for zeta transform, True for Mobius transform
+    """
+    N = len(A)
+    step = 1
+    while step < N:
+        period = step << 1
+        if step <= N // period:
+            # few long strided slices: one slice for each offset inside the block
+            for o in range(step):
+                if inverse:
+                    A[step + o::period] = [a - b for a, b in zip(A[step + o::period], A[o::period])]
+                else:
+                    A[step + o::period] = [a + b for a, b in zip(A[step + o::period], A[o::period])]
+        else:
+            # few long blocks: one contiguous slice for each block
+            for start in range(0, N, period):
+                if inverse:
+                    A[start + step:start + period] = [a - b for a, b in zip(A[start + step:start + period],
+                                                                            A[start:start + step])]
+                else:
+                    A[start + step:start + period] = [a + b for a, b in zip(A[start + step:start + period],
+                                                                            A[start:start + step])]
+        step = period
+
+
 class MVLinear:
     """
     A Sparse Representation of a multi-linear polynomial.
@@ -18,17 +206,15 @@ class MVLinear:
         """
 
         self.num_variables = num_variables
-        self.terms: Dict[int, int] = dict()
         self.p = p
-        for k,v in term.items():
+        terms: Dict[int, int] = dict()
+        for k, v in term.items():
             if k >> self.num_variables > 0:
                 raise ValueError("Term is out of range.")
             if v % p == 0:
                 continue
-            if k in self.terms:
-                self.terms[k] = (self.terms[k] + term[k]) % self.p
-            else:
-                self.terms[k] = term[k] % self.p
+            terms[k] = v % p
+        self.terms: Dict[int, int] = TrackedDict(terms)
 
     def __repr__(self):
         limit = 8
@@ -55,10 +241,27 @@ class MVLinear:
 
     def __copy__(self) -> 'MVLinear':
         t = self.terms.copy()
-        return MVLinear(self.num_variables, t, self.p)
+        ans = MVLinear(self.num_variables, t, self.p)
+        if isinstance(self.terms, TrackedDict):
+            ans.terms.digest_cache = self.terms.digest_cache
+        return ans
 
     __deepcopy__ = __copy__
 
+    def _size_bound(self) -> int:
+        """
+        :return: an upper bound of the number of nonzero terms, in constant time
+        """
+        return len(self.terms)
+
+    def _dense_sum(self, other: 'MVLinear') -> bool:
+        """
+        :return: whether the sum with other may fill DENSE_FILL_RATIO of its monomials, so that adding the coefficient
+        arrays is worth it. Otherwise, the terms are merged sparsely.
+        """
+        n = max(self.num_variables, other.num_variables)
+        return self._size_bound() + other._size_bound() >= DENSE_FILL_RATIO * (1 << n)
+
     def _assert_same_type(self, other: 'MVLinear'):
         if not isinstance(other, MVLinear):
             raise TypeError("MVLinear can only be added with MVLinear")
@@ -69,19 +272,19 @@ class MVLinear:
         if type(other) is int:
             other = MVLinear(self.num_variables, {0b0: other}, self.p)
         self._assert_same_type(other)
+        if isinstance(other, DenseMVLinear) and self._dense_sum(other):
+            return other + self
 
-        ans: MVLinear = copy.copy(self)
-        ans.num_variables = max(self.num_variables, other.num_variables)
-
+        terms: Dict[int, int] = dict(self.terms)
         for k in other.terms:
-            if k in self.terms:
-                ans.terms[k] = (ans.terms[k] + other.terms[k]) % self.p
-                if ans.terms[k] == 0:
-                    ans.terms.pop(k)
+            if k in terms:
+                terms[k] = (terms[k] + other.terms[k]) % self.p
+                if terms[k] == 0:
+                    terms.pop(k)
             else:
-                ans.terms[k] = other.terms[k] % self.p
+                terms[k] = other.terms[k] % self.p
 
-        return ans
+        return fromTerms(max(self.num_variables, other.num_variables), terms, self.p)
 
     __radd__ = __add__
 
@@ -89,19 +292,19 @@ class MVLinear:
         if type(other) is int:
             other = MVLinear(self.num_variables, {0b0: other}, self.p)
         self._assert_same_type(other)
+        if isinstance(other, DenseMVLinear) and self._dense_sum(other):
+            return DenseMVLinear.fromMVLinear(self) - other
 
-        ans: MVLinear = copy.copy(self)
-        ans.num_variables = max(self.num_variables, other.num_variables)
-
+        terms: Dict[int, int] = dict(self.terms)
         for k in other.terms:
-            if k in self.terms:
-                ans.terms[k] = (ans.terms[k] - other.terms[k]) % self.p
-                if ans.terms[k] == 0:
-                    ans.terms.pop(k)
+            if k in terms:
+                terms[k] = (terms[k] - other.terms[k]) % self.p
+                if terms[k] == 0:
+                    terms.pop(k)
             else:
-                ans.terms[k] = (- other.terms[k]) % self.p
+                terms[k] = (- other.terms[k]) % self.p
 
-        return ans
+        return fromTerms(max(self.num_variables, other.num_variables), terms, self.p)
 
     def __neg__(self):
         return 0 - self
@@ -116,25 +319,27 @@ class MVLinear:
             other = MVLinear(self.num_variables, {0b0: other}, self.p)
         self._assert_same_type(other)
 
-        terms: Dict[int, int] = dict()
-        # naive n^2 poly multiplication where n is number of terms
-        for sk in self.terms:  # the term of self
-            for ok in other.terms:  # the term of others
-                if sk & ok > 0:
-                    raise ArithmeticError("The product is no longer multi-linear function.")
-                nk = sk + ok  # the result term
-                if nk in terms:
-                    terms[nk] = (terms[nk] + self.terms[sk] * other.terms[ok]) % self.p
-                else:
-                    terms[nk] = (self.terms[sk] * other.terms[ok]) % self.p
-                if terms[nk] == 0:
-                    terms.pop(nk)
+        # The product is multilinear iff no variable appears in both operands, i.e. every pair of terms has disjoint
+        # support. Then each pair gives a distinct monomial sk | ok, and there is no need to merge terms.
+        if self._support() & other._support():
+            raise ArithmeticError("The product is no longer multi-linear function.")
+        p = self.p
+        terms: Dict[int, int] = {sk | ok: sv * ov % p
+                                 for sk, sv in self.terms.items() for ok, ov in other.terms.items()}
 
-        ans = MVLinear(max(self.num_variables, other.num_variables), terms, self.p)
-        return ans
+        return fromTerms(max(self.num_variables, other.num_variables), terms, self.p)
 
     __rmul__ = __mul__  # commutative
 
+    def _support(self) -> int:
+        """
+        :return: the set of variables used by the polynomial, in binary form
+        """
+        support = 0
+        for k in self.terms:
+            support |= k
+        return support
+
     def eval(self, at: List[int]) -> int:
         s = 0
         for term in self.terms:
@@ -151,6 +356,41 @@ class MVLinear:
 
         return s
 
+    def to_evaluations(self, num_variables: Optional[int] = None) -> List[int]:
+        """
+        Evaluate the polynomial on every point of the boolean hypercube, using a subset-sum (zeta) transform over
+        the coefficients. Takes O(n * 2^n) time.
+        :param num_variables: size of the hypercube. Defaults to self.num_variables.
+        :return: A bookkeeping table where the index is the binary form of argument of polynomial and value is the
+        evaluated value
+        """
+        n = self.num_variables if num_variables is None else num_variables
+        if n < self.num_variables and any(k >> n for k in self.terms):
+            raise ValueError("num_variables is smaller than the number of variables used by the polynomial.")
+        A: List[int] = [0] * (1 << n)
+        for k, v in self.terms.items():
+            A[k] = v
+        subsetSumTransform(A)
+        p = self.p
+        return [x % p for x in A]
+
+    @staticmethod
+    def from_evaluations(evaluations: List[int], p: int) -> 'MVLinear':
+        """
+        Interpolate the multilinear polynomial from its evaluations on the boolean hypercube, using a Mobius transform.
+        Takes O(n * 2^n) time.
+        :param evaluations: bookkeeping table of size 2^n. Index is the binary form of the argument.
+        :param p: field size
+        :return: the polynomial
+        """
+        N = len(evaluations)
+        n = N.bit_length() - 1
+        if N == 0 or N != 1 << n:
+            raise ValueError("Size of the bookkeeping table should be a power of 2.")
+        A = list(evaluations)
+        subsetSumTransform(A, inverse=True)
+        return fromCoefficients(n, A, p)
+
     def eval_bin(self, at: int) -> int:
         """
         Evaluate the polynomial where the arguments are in {0,1}. The ith argument is the ith bit of the polynomial.
@@ -202,6 +442,28 @@ class MVLinear:
         else:
             return 0
 
+    def digest(self) -> bytes:
+        """
+        Canonical digest of the polynomial: number of variables, field size and the nonzero terms sorted by monomial
+        with fixed-width coefficients. Unlike pickle, it does not depend on dict insertion order. The digest is
+        computed once and cached until the polynomial is modified.
+        :return: the digest
+        """
+        if not isinstance(self.terms, TrackedDict):
+            self.terms = TrackedDict(self.terms)
+        cache = self.terms.digest_cache
+        if cache is not None and cache[0] == (self.num_variables, self.p):
+            return cache[1]
+        d = self._digest_of(self.terms)
+        self.terms.digest_cache = ((self.num_variables, self.p), d)
+        return d
+
+    def _digest_of(self, terms: Mapping[int, int]) -> bytes:
+        key_width = max(1, (self.num_variables + 7) // 8)
+        return digestOf(b'MVLinear', self.num_variables.to_bytes(4, 'little'),
+                        self.p.to_bytes((self.p.bit_length() + 7) // 8, 'little'),
+                        sparseTableBytes(terms, key_width, self.p))
+
     def eval_part(self, args: List[int]) -> 'MVLinear':
         """
         Evaluate part of the arguments of the multilinear polynomial.
@@ -221,7 +483,7 @@ class MVLinear:
             if t_shifted not in new_terms:
                 new_terms[t_shifted] = 0
             new_terms[t_shifted] = (new_terms[t_shifted] + v) % self.p
-        return MVLinear(self.num_variables - len(args), new_terms, self.p)
+        return fromTerms(self.num_variables - len(args), new_terms, self.p)
 
     def collapse_left(self, n: int) -> 'MVLinear':
         """
@@ -252,6 +514,189 @@ class MVLinear:
             new_terms[t & anti_mask] = v
         return MVLinear(self.num_variables - n, new_terms, self.p)
 
+
+DENSE_FILL_RATIO = 0.5
+"""
+Polynomials produced by arithmetic use DenseMVLinear when at least this fraction of the 2^n monomials is nonzero
+"""
+SPARSE_FILL_RATIO = 0.25
+"""
+and fall back to the sparse MVLinear when less than this fraction is nonzero.
+"""
+
+
+class DenseMVLinear(MVLinear):
+    """
+    A Dense Representation of a multi-linear polynomial. The coefficients are stored in a flat array of size 2^n
+    indexed by the binary form of the monomial. It has the same interface as MVLinear. self.terms is a read-only
+    view of the nonzero coefficients.
+    """
+
+    def __init__(self, num_variables: int, coefficients: List[int], p: int):
+        """
+        :param num_variables: total number of variables
+        :param coefficients: array of size 2^num_variables. coefficients[0b1011] is the coefficient of x0x1x3.
+        :param p: the size of finite field
+        """
+        if len(coefficients) != 1 << num_variables:
+            raise ValueError("Size of coefficients should be 2^num_variables.")
+        self.num_variables = num_variables
+        self.p = p
+        self.coefficients: List[int] = TrackedList(x % p for x in coefficients)
+
+    @staticmethod
+    def fromMVLinear(poly: MVLinear) -> 'DenseMVLinear':
+        if isinstance(poly, DenseMVLinear):
+            return poly
+        coefficients: List[int] = [0] * (1 << poly.num_variables)
+        for k, v in poly.terms.items():
+            coefficients[k] = v
+        return DenseMVLinear(poly.num_variables, coefficients, poly.p)
+
+    @property
+    def terms(self) -> Mapping[int, int]:
+        """
+        Read-only view of the nonzero coefficients. It is built once and cached until the coefficients are modified.
+        """
+        if not isinstance(self.coefficients, TrackedList):
+            self.coefficients = TrackedList(self.coefficients)
+        if self.coefficients.index_cache is None:
+            self.coefficients.index_cache = MappingProxyType({k: v for k, v in enumerate(self.coefficients) if v != 0})
+        return self.coefficients.index_cache
+
+    def _size_bound(self) -> int:
+        return len(self.coefficients)
+
+    def toSparse(self) -> MVLinear:
+        return MVLinear(self.num_variables, dict(self.terms), self.p)
+
+    def __copy__(self) -> 'DenseMVLinear':
+        ans = DenseMVLinear(self.num_variables, self.coefficients, self.p)
+        if isinstance(self.coefficients, TrackedList):
+            ans.coefficients.digest_cache = self.coefficients.digest_cache
+        return ans
+
+    __deepcopy__ = __copy__
+
+    def _padded(self, num_variables: int) -> List[int]:
+        """
+        :return: a copy of the coefficient array for a polynomial of num_variables variables
+        """
+        return list(self.coefficients) + [0] * ((1 << num_variables) - len(self.coefficients))
+
+    def __add__(self, other: Union['MVLinear', int]) -> 'MVLinear':
+        if type(other) is int:
+            other = MVLinear(self.num_variables, {0b0: other}, self.p)
+        self._assert_same_type(other)
+        if not self._dense_sum(other):
+            return MVLinear.__add__(self, other)
+
+        n = max(self.num_variables, other.num_variables)
+        A = self._padded(n)
+        if isinstance(other, DenseMVLinear):
+            A = [a + b for a, b in zip(A, other.coefficients)] + A[len(other.coefficients):]
+        else:
+            for k, v in other.terms.items():
+                A[k] += v
+        return fromCoefficients(n, A, self.p)
+
+    __radd__ = __add__
+
+    def __sub__(self, other: Union['MVLinear', int]) -> 'MVLinear':
+        if type(other) is int:
+            other = MVLinear(self.num_variables, {0b0: other}, self.p)
+        self._assert_same_type(other)
+        if not self._dense_sum(other):
+            return MVLinear.__sub__(self, other)
+
+        n = max(self.num_variables, other.num_variables)
+        A = self._padded(n)
+        if isinstance(other, DenseMVLinear):
+            A = [a - b for a, b in zip(A, other.coefficients)] + A[len(other.coefficients):]
+        else:
+            for k, v in other.terms.items():
+                A[k] -= v
+        return fromCoefficients(n, A, self.p)
+
+    def _support(self) -> int:
+        support = 0
+        for k, v in enumerate(self.coefficients):
+            if v != 0:
+                support |= k
+        return support
+
+    def eval(self, at: List[int]) -> int:
+        p = self.p
+        A = self.coefficients
+        # fix one variable at a time: the coefficients with and without x_i are adjacent
+        for i in range(self.num_variables):
+            x = at[i] % p
+            A = [(a + b * x) % p for a, b in zip(A[0::2], A[1::2])]
+        return A[0] % p
+
+    def eval_part(self, args: List[int]) -> 'MVLinear':
+        s = len(args)
+        if s > self.num_variables:
+            raise ValueError("len(args) > self.num_variables")
+        p = self.p
+        A = self.coefficients
+        for i in range(s):
+            x = args[i] % p
+            A = [(a + b * x) % p for a, b in zip(A[0::2], A[1::2])]
+        return fromCoefficients(self.num_variables - s, A, p)
+
+    def to_evaluations(self, num_variables: Optional[int] = None) -> List[int]:
+        n = self.num_variables if num_variables is None else num_variables
+        if n < self.num_variables:
+            return MVLinear.to_evaluations(self, n)
+        A = self._padded(n)
+        subsetSumTransform(A)
+        p = self.p
+        return [x % p for x in A]
+
+    def __getitem__(self, item):
+        if 0 <= item < len(self.coefficients):
+            return self.coefficients[item]
+        return 0
+
+    def digest(self) -> bytes:
+        if not isinstance(self.coefficients, TrackedList):
+            self.coefficients = TrackedList(self.coefficients)
+        cache = self.coefficients.digest_cache
+        if cache is not None and cache[0] == (self.num_variables, self.p):
+            return cache[1]
+        d = self._digest_of(self.terms)
+        self.coefficients.digest_cache = ((self.num_variables, self.p), d)
+        return d
+
+
+def fromTerms(num_variables: int, terms: Dict[int, int], p: int) -> MVLinear:
+    """
+    Make a multilinear polynomial from its terms, choosing the dense representation if the terms fill at least
+    DENSE_FILL_RATIO of the monomials.
+    """
+    if len(terms) >= DENSE_FILL_RATIO * (1 << num_variables):
+        coefficients: List[int] = [0] * (1 << num_variables)
+        for k, v in terms.items():
+            if k >> num_variables > 0:
+                raise ValueError("Term is out of range.")
+            coefficients[k] = v
+        return DenseMVLinear(num_variables, coefficients, p)
+    return MVLinear(num_variables, terms, p)
+
+
+def fromCoefficients(num_variables: int, coefficients: List[int], p: int) -> MVLinear:
+    """
+    Make a multilinear polynomial from its dense coefficient array, choosing the sparse representation if less than
+    SPARSE_FILL_RATIO of the coefficients are nonzero.
+    """
+    coefficients = [x % p for x in coefficients]
+    num_nonzero = len(coefficients) - coefficients.count(0)
+    if num_nonzero < SPARSE_FILL_RATIO * len(coefficients):
+        return MVLinear(num_variables, {k: v for k, v in enumerate(coefficients) if v != 0}, p)
+    return DenseMVLinear(num_variables, coefficients, p)
+
+
 def makeMVLinearConstructor(num_variables: int, p: int) -> Callable[[Dict[int, int]], MVLinear]:
     """
     Return a function that outputs MVLinear
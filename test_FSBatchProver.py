@@ -0,0 +1,33 @@
+import random
+from unittest import TestCase
+
+from FSBatchProver import generateTheoremAndProof
+from FSBatchVerifier import BatchProof, BatchTheorem, verifyProof
+from PMF import PMF
+from polynomial import randomMVLinear, randomPrime
+
+
+class Test(TestCase):
+    def testCompleteness(self):
+        for _ in range(5):
+            P = randomPrime(224)
+            n = random.randint(2, 6)
+            polys = [PMF([randomMVLinear(n, prime=P) for _ in range(random.randint(1, 4))]) for _ in range(6)]
+            polys.append(randomMVLinear(n, prime=P))
+            theorem, proof, v = generateTheoremAndProof(polys)
+            self.assertTrue(v.convinced)
+            self.assertEqual(len(proof.prover_message), n)
+            self.assertTrue(verifyProof(theorem, proof))
+            for poly, (point, e) in zip(theorem.polys, v.sub_claims()):
+                self.assertEqual(poly.eval(point), e)
+
+    def testSoundness(self):
+        P = randomPrime(224)
+        polys = [PMF([randomMVLinear(5, prime=P) for _ in range(3)]) for _ in range(4)]
+        theorem, proof, _ = generateTheoremAndProof(polys)
+        sums = theorem.asserted_sums.copy()
+        sums[2] += 1
+        self.assertFalse(verifyProof(BatchTheorem(theorem.polys, sums), proof))
+        finals = proof.final_evaluations.copy()
+        finals[1] += 1
+        self.assertFalse(verifyProof(theorem, BatchProof(proof.prover_message, finals)))
@@ -0,0 +1,68 @@
+import random
+from unittest import TestCase
+
+from circuit import ADD, MULT, LayeredCircuit
+from FSLayeredGKR import Proof, Theorem, generateTheoremAndProof, verifyProof
+from polynomial import randomPrime
+
+
+def randomCircuit(sizes, p: int) -> LayeredCircuit:
+    """
+    :param sizes: number of gates of each layer, from the output layer to the inputs
+    """
+    layers = [[(random.choice((ADD, MULT)), random.randrange(sizes[i + 1]), random.randrange(sizes[i + 1]))
+               for _ in range(sizes[i])] for i in range(len(sizes) - 1)]
+    return LayeredCircuit(layers, sizes[-1], p)
+
+
+class TestLayeredCircuit(TestCase):
+    def test_evaluate(self):
+        p = randomPrime(64)
+        # (x0 + x1) * (x1 * x2), x2 + x2
+        circuit = LayeredCircuit([[(MULT, 0, 1), (ADD, 2, 2)], [(ADD, 0, 1), (MULT, 1, 2), (ADD, 2, 2)]], 3, p)
+        values = circuit.evaluate([3, 5, 7])
+        self.assertEqual(circuit.Ls, [2, 2, 2])
+        self.assertEqual(values[0], [(3 + 5) * (5 * 7), 28, 0, 0])
+        self.assertEqual(values[2], [3, 5, 7, 0])
+
+    def test_layer_sizes(self):
+        p = randomPrime(64)
+        circuit = randomCircuit([1, 1, 40, 3, 1000], p)
+        self.assertEqual(circuit.Ls, [2, 2, 6, 2, 10])
+        self.assertEqual([len(V) for V in circuit.evaluate(list(range(1000)))], [4, 4, 64, 4, 1024])
+
+
+class TestFSLayeredGKR(TestCase):
+    def test_completeness(self):
+        p = randomPrime(256)
+        for sizes in ([4, 4], [3, 8, 5], [16, 16, 16, 16], [1, 2, 4, 8, 16], [20, 10, 40], [1, 1, 40, 3, 1000]):
+            circuit = randomCircuit(sizes, p)
+            inputs = [random.randint(0, p - 1) for _ in range(sizes[-1])]
+            thm, pf = generateTheoremAndProof(circuit, inputs)
+            self.assertEqual(thm.outputs, circuit.evaluate(inputs)[0][:sizes[0]])
+            self.assertTrue(verifyProof(thm, pf))
+
+    def test_soundness(self):
+        p = randomPrime(256)
+        sizes = [8, 16, 8]
+        circuit = randomCircuit(sizes, p)
+        inputs = [random.randint(0, p - 1) for _ in range(sizes[-1])]
+        thm, pf = generateTheoremAndProof(circuit, inputs)
+
+        wrong_outputs = thm.outputs.copy()
+        wrong_outputs[random.randrange(len(wrong_outputs))] += 1
+        self.assertFalse(verifyProof(Theorem(circuit, inputs, wrong_outputs), pf))
+
+        wrong_inputs = inputs.copy()
+        wrong_inputs[0] += 1
+        self.assertFalse(verifyProof(Theorem(circuit, wrong_inputs, thm.outputs), pf))
+
+        for layer in range(circuit.depth):
+            evaluations = pf.evaluations.copy()
+            Vu, Vv = evaluations[layer]
+            evaluations[layer] = (Vu, Vv + 1)
+            self.assertFalse(verifyProof(thm, Proof(pf.phase1Msgs, pf.phase2Msgs, evaluations)))
+
+        phase2Msgs = [[msg.copy() for msg in msgs] for msgs in pf.phase2Msgs]
+        phase2Msgs[-1][-1][2] += 1
+        self.assertFalse(verifyProof(thm, Proof(pf.phase1Msgs, phase2Msgs, pf.evaluations)))
@@ -3,9 +3,9 @@ from typing import Dict, Tuple, List
 from unittest import TestCase
 
 from GKR import GKR
-from multilinear_extension import extend_sparse, evaluate
+from multilinear_extension import cachedEqTable, eqCacheScope, extend_sparse, evaluate, evaluate_sparse
 from GKRProver import binaryToList, initialize_PhaseOne, initialize_PhaseTwo, sumOfGKR, talkToVerifierPhase1, \
-    talk_to_verifier_phase2, GKRProver
+    talk_to_verifier_phase2, GKRProver, precompute
 from polynomial import randomPrime, randomMVLinear, MVLinear
 from GKRVerifier import GKRVerifier, GKRVerifierState
 
@@ -36,6 +36,7 @@ class Test(TestCase):
         g = [random.randint(0, p-1) for _ in range(L)]
         # get bookkeeping table for f3
         A_f3, _ = calculateBookKeepingTable(f3)
+        self.assertEqual(f3.to_evaluations(), A_f3)
         # get poly form for f1 (only for test checking)
         A_f1 = [0] * (1 << (3 * L))
         for k, v in D_f1.items():
@@ -94,6 +95,67 @@ class Test(TestCase):
         print(f"initialize_PhaseTwo, talk_to_verifier_phase2 looks good. ")
         print(f"Completeness test PASS!")
 
+    def test_wiring_index(self):
+        L = 4
+        p = randomPrime(64)
+        gkr = randomGKR(L, p)
+        g, u, v = ([random.randint(0, p-1) for _ in range(L)] for _ in range(3))
+        A_hg, G = initialize_PhaseOne(gkr.f1, L, p, gkr.f3, g)
+        A_f1 = initialize_PhaseTwo(gkr.f1, G, u, p)
+        expected = evaluate_sparse(gkr.f1, g + u + v, p)
+        for sort_by in (None, 'z', 'x', 'y'):
+            index = gkr.wiring(sort_by)
+            self.assertIs(index, gkr.wiring(sort_by))
+            self.assertEqual(initialize_PhaseOne(index, L, p, gkr.f3, g), (A_hg, G))
+            self.assertEqual(initialize_PhaseTwo(index, G, u, p), A_f1)
+            self.assertEqual(index.evaluate(g, u, v, p), expected)
+            if sort_by is not None:
+                self.assertEqual(getattr(index, sort_by), sorted(getattr(index, sort_by)))
+
+        triples = [(g, u, v), (g, v, u), (u, g, v), (g, u, v)]
+        self.assertEqual(gkr.wiring().evaluateMany(triples, p),
+                         [evaluate_sparse(gkr.f1, a + b + c, p) for a, b, c in triples])
+
+        # modifying f1 invalidates the index
+        index = gkr.wiring()
+        gkr.f1[0] = (gkr.f1.get(0, 0) + 1) % p
+        self.assertIsNot(gkr.wiring(), index)
+        self.assertEqual(gkr.wiring().evaluate(g, u, v, p), evaluate_sparse(gkr.f1, g + u + v, p))
+
+    def test_precompute_copy(self):
+        p = randomPrime(64)
+        g = [random.randint(0, p - 1) for _ in range(4)]
+        with eqCacheScope():
+            G = precompute(g, p)
+            G[0] = (G[0] + 1) % p
+            self.assertNotEqual(precompute(g, p)[0], G[0])
+            self.assertEqual(list(cachedEqTable(g, p)), precompute(g, p))
+
+    def test_multiple_claims(self):
+        L = 6
+        p = randomPrime(256)
+        gkr = randomGKR(L, p)
+        pv = GKRProver(gkr)
+        gs = [[random.randint(0, p-1) for _ in range(L)] for _ in range(3)]
+        claims = [(g, pv.initializeAndGetSum(g)[2]) for g in gs]
+
+        alphas = [random.randint(0, p-1) for _ in gs]
+        A_hg, _ = initialize_PhaseOne(gkr.f1, L, p, gkr.f3, gs, alphas)
+        tables = [initialize_PhaseOne(gkr.f1, L, p, gkr.f3, g)[0] for g in gs]
+        expected = [sum(a * A[x] for a, A in zip(alphas, tables)) % p for x in range(1 << L)]
+        self.assertEqual(A_hg, expected)
+
+        v = GKRVerifier.forClaims(gkr, claims)
+        A_hg, G, s = pv.initializeAndGetCombinedSum(gs, v.alphas)
+        self.assertEqual(s, v.asserted_sum)
+        pv.proveToVerifier(A_hg, G, s, v)
+        self.assertEqual(v.state, GKRVerifierState.ACCEPT)
+
+        # one wrong claim changes the combined sum
+        claims[1] = (claims[1][0], claims[1][1] + 1)
+        v = GKRVerifier.forClaims(gkr, claims)
+        self.assertNotEqual(pv.initializeAndGetCombinedSum(gs, v.alphas)[2], v.asserted_sum)
+
     def test_protocol_comprehensive(self):
         NUM_TESTS = 10
         Ls = list(range(10,13))
@@ -1,8 +1,10 @@
 import random
+from multiprocessing import Pool
 from unittest import TestCase
 from IPPMFProver import InteractivePMFProver, InteractivePMFVerifier
+from IPPMFVerifier import TrueRandomGen
 from PMF import PMF
-from polynomial import randomMVLinear, randomPrime
+from polynomial import fromCoefficients, randomMVLinear, randomPrime
 
 
 class TestInteractivePMFProver(TestCase):
@@ -17,4 +19,36 @@ class TestInteractivePMFProver(TestCase):
 
             self.assertTrue(v.convinced)
 
+    def testRepeatedMultiplicands(self):
+        P = randomPrime(221)
+        f, g = randomMVLinear(7, prime=P), randomMVLinear(7, prime=P)
+        p = PMF([f, g, f, f])
+        pv = InteractivePMFProver(p)
+        As, s = pv.calculateAllBookKeepingTables()
+        self.assertIs(As[0], As[2])
+        self.assertIs(As[0], As[3])
+        seed = random.randint(0, 0xFFFFFFFF)
+        v = InteractivePMFVerifier(p, s, randomGen=TrueRandomGen(seed, P))
+        msgs = pv.attemptProve(As, v)
+        self.assertTrue(v.convinced)
+        # same messages as with one table per multiplicand
+        As = [pv.calculateSingleTable(i) for i in range(4)]
+        v = InteractivePMFVerifier(p, s, randomGen=TrueRandomGen(seed, P))
+        self.assertEqual(pv.attemptProve(As, v), msgs)
 
+    def testPool(self):
+        P = randomPrime(221)
+        f = randomMVLinear(7, prime=P)
+        dense = fromCoefficients(7, [random.randint(0, P - 1) for _ in range(1 << 7)], P)
+        p = PMF([f] + [randomMVLinear(7, prime=P) for _ in range(4)] + [dense, f])
+        p.digest()  # the multiplicands are pickled with their cached digests and terms
+        pv = InteractivePMFProver(p)
+        As, s = pv.calculateAllBookKeepingTables()
+        with Pool(2) as pool:
+            pooled, s2 = pv.calculateAllBookKeepingTables(pool)
+        self.assertEqual(s, s2)
+        self.assertEqual(pooled, As)
+        self.assertIs(pooled[0], pooled[6])
+        v = InteractivePMFVerifier(p, s2)
+        pv.attemptProve(pooled, v)
+        self.assertTrue(v.convinced)
@@ -0,0 +1,26 @@
+import random
+from unittest import TestCase
+
+from IPPMFVerifier import interpolate, modInverse
+from polynomial import randomPrime
+
+
+def lagrange(points, r, p):
+    result = 0
+    for i in range(len(points)):
+        term = points[i] % p
+        for j in range(len(points)):
+            if j != i:
+                term = (term * ((r - j) % p) * modInverse((i - j) % p, p)) % p
+        result = (result + term) % p
+    return result
+
+
+class Test(TestCase):
+    def test_interpolate(self):
+        for _ in range(20):
+            p = randomPrime(128)
+            n = random.randint(1, 12)
+            points = [random.randint(0, p - 1) for _ in range(n)]
+            for r in [random.randint(0, p - 1), random.randint(0, n - 1), p + 1, -3]:
+                self.assertEqual(interpolate(points, r, p), lagrange(points, r, p))
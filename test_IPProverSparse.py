@@ -0,0 +1,67 @@
+import random
+from unittest import TestCase
+
+from FSProver import generateTheoremAndProof
+from FSVerifier import verifyProof
+from IPProverLinear import InteractiveLinearProver
+from IPProverSparse import InteractiveSparseProver, SparseTable
+from IPVerifier import InteractiveVerifier
+from multilinear_extension import SparseMLE
+from polynomial import randomPrime
+
+
+def randomSparseMLE(num_variables: int, num_nonzeros: int, p: int) -> SparseMLE:
+    return SparseMLE(num_variables, {random.randint(0, (1 << num_variables) - 1): random.randint(1, p - 1)
+                                     for _ in range(num_nonzeros)}, p)
+
+
+class TestSparseTable(TestCase):
+    def testFold(self):
+        P = randomPrime(41)
+        for _ in range(20):
+            n = random.randint(1, 8)
+            d = {random.randint(0, (1 << n) - 1): random.randint(0, P - 1) for _ in range(random.randint(0, 10))}
+            dense = [d.get(b, 0) for b in range(1 << n)]
+            A = SparseTable.fromDict(d, P)
+            for _ in range(n):
+                self.assertEqual(A.round_sums(), (sum(dense[0::2]) % P, sum(dense[1::2]) % P))
+                r = random.randint(0, P - 1)
+                dense = [(a + r * (b - a)) % P for a, b in zip(dense[0::2], dense[1::2])]
+                A.fold(r)
+                self.assertEqual([A[b] for b in range(len(dense))], dense)
+                self.assertTrue(all(A.values))
+
+
+class TestInteractiveSparseProver(TestCase):
+    def testFunctionality(self):
+        P = randomPrime(41)
+        poly = randomSparseMLE(6, 5, P)
+        pv = InteractiveSparseProver(poly)
+        A, s = pv.calculateTable()
+        self.assertEqual(s, sum(poly.to_evaluations()) % P)
+        v = InteractiveVerifier(random.randint(0, 0xFFFFFFFF), poly, s)
+        pv.attemptProve(A, v, showDialog=True)
+        self.assertTrue(v.convinced, "Verifier not convinced. ")
+
+    def testSameMessagesAsDense(self):
+        P = randomPrime(41)
+        for _ in range(10):
+            poly = randomSparseMLE(8, 20, P)
+            mvl = poly.toMVLinear()
+            seed = random.randint(0, 0xFFFFFFFF)
+            sparse_prover, dense_prover = InteractiveSparseProver(poly), InteractiveLinearProver(mvl)
+            A, s = sparse_prover.calculateTable()
+            B, t = dense_prover.calculateTable()
+            self.assertEqual(s, t)
+            sparse = InteractiveVerifier(seed, poly, s)
+            dense = InteractiveVerifier(seed, mvl, t)
+            sparse_prover.attemptProve(A, sparse)
+            dense_prover.attemptProve(B, dense)
+            self.assertTrue(sparse.convinced and dense.convinced)
+            self.assertEqual(sparse.points, dense.points)
+
+    def testCompleteness(self):
+        for _ in range(20):
+            poly = randomSparseMLE(12, 30, randomPrime(64))
+            theorem, proof = generateTheoremAndProof(poly)
+            self.assertTrue(verifyProof(theorem, proof))
@@ -0,0 +1,35 @@
+import random
+from unittest import TestCase
+
+from IPPMFProver import InteractivePMFProver
+from IPPMFVerifier import InteractivePMFVerifier, TrueRandomGen
+from IPStreamingProver import StreamingPMFProver
+from IPVerifier import InteractiveVerifier
+from PMF import PMF
+from polynomial import randomMVLinear, randomPrime
+
+
+class TestStreamingPMFProver(TestCase):
+    def testSameMessages(self):
+        P = randomPrime(221)
+        n = 6
+        poly = PMF([randomMVLinear(n, prime=P) for _ in range(3)])
+        pv = InteractivePMFProver(poly)
+        As, s = pv.calculateAllBookKeepingTables()
+        seed = random.randint(0, 0xFFFFFFFF)
+        v = InteractivePMFVerifier(poly, s, randomGen=TrueRandomGen(seed, P))
+        expected = pv.attemptProve(As, v)
+        for budget in (1, 1 << 3, 1 << n):
+            sp = StreamingPMFProver.fromPMF(poly, budget=budget, chunk_size=5)
+            self.assertEqual(sp.calculateSum(), s)
+            v = InteractivePMFVerifier(poly, s, randomGen=TrueRandomGen(seed, P))
+            self.assertEqual(sp.attemptProve(v), expected)
+            self.assertTrue(v.convinced)
+
+    def testLinear(self):
+        P = randomPrime(64)
+        poly = randomMVLinear(7, prime=P)
+        sp = StreamingPMFProver.fromPMF(poly, budget=4)
+        v = InteractiveVerifier(random.randint(0, 0xFFFFFFFF), poly, sp.calculateSum())
+        sp.attemptProve(v)
+        self.assertTrue(v.convinced)
@@ -0,0 +1,56 @@
+import random
+from multiprocessing import Pool
+from unittest import TestCase
+
+from FSPMFProver import generateTheoremAndProof
+from FSPMFVerifier import verifyProof
+from IPPMFVerifier import InteractivePMFVerifier
+from IPSumOfPMFProver import InteractiveSumOfPMFProver
+from PMF import PMF, SumOfPMF
+from polynomial import randomMVLinear, randomPrime
+
+
+def randomSumOfPMF(num_variables: int, num_polys: int, num_terms: int, p: int) -> SumOfPMF:
+    polys = [randomMVLinear(num_variables, prime=p) for _ in range(num_polys)]
+    return SumOfPMF([(random.randint(0, p - 1), random.choices(polys, k=random.randint(1, 4)))
+                     for _ in range(num_terms)])
+
+
+class TestInteractiveSumOfPMFProver(TestCase):
+    def testCompleteness(self):
+        for _ in range(20):
+            P = randomPrime(224)
+            poly = randomSumOfPMF(6, 4, 5, P)
+            self.assertLessEqual(len(poly.multiplicands), 4)
+            pv = InteractiveSumOfPMFProver(poly)
+            As, s = pv.calculateAllBookKeepingTables()
+            expected = sum(c * PMF([poly.multiplicands[i] for i in indices]).eval(list(at)) for c, indices in poly.terms
+                           for at in [[(b >> i) & 1 for i in range(6)] for b in range(1 << 6)]) % P
+            self.assertEqual(s, expected)
+            v = InteractivePMFVerifier(poly, s)
+            pv.attemptProve(As, v)
+            self.assertTrue(v.convinced)
+
+    def testPool(self):
+        P = randomPrime(224)
+        poly = randomSumOfPMF(6, 4, 5, P)
+        pv = InteractiveSumOfPMFProver(poly)
+        with Pool(2) as pool:
+            self.assertEqual(pv.calculateAllBookKeepingTables(pool), pv.calculateAllBookKeepingTables())
+
+    def testFS(self):
+        P = randomPrime(256)
+        poly = randomSumOfPMF(7, 5, 6, P)
+        theorem, proof, v = generateTheoremAndProof(poly)
+        self.assertTrue(v.convinced)
+        self.assertTrue(verifyProof(theorem, proof))
+        proof.prover_messge[-1] = [x + 1 for x in proof.prover_messge[-1]]
+        self.assertFalse(verifyProof(theorem, proof))
+
+    def testDigest(self):
+        P = randomPrime(64)
+        f, g, h = (randomMVLinear(4, prime=P) for _ in range(3))
+        a = SumOfPMF([(2, [f, g]), (3, PMF([h]))])
+        b = SumOfPMF([(3, [h]), (2, [g, f])])
+        self.assertEqual(a.digest(), b.digest())
+        self.assertNotEqual(a.digest(), SumOfPMF([(2, [f, g]), (4, [h])]).digest())
@@ -0,0 +1,84 @@
+import random
+from unittest import TestCase
+
+import bookkeeping
+from bookkeeping import BookkeepingTable, eqTable, productRoundSums, sumOfProductsRoundSums
+from multilinear_extension import evaluate
+from polynomial import randomPrime
+
+
+class Test(TestCase):
+    def test_fold(self):
+        p = randomPrime(64)
+        L = 8
+        A = [random.randint(0, p - 1) for _ in range(1 << L)]
+        args = [random.randint(0, p - 1) for _ in range(L)]
+        expected = evaluate(A, args, p)
+        table = BookkeepingTable(A.copy(), p)
+        for i in range(L):
+            p0, p1 = table.round_sums()
+            self.assertEqual(p0, sum(table.A[0::2]) % p)
+            self.assertEqual(p1, sum(table.A[1::2]) % p)
+            table.fold(args[i])
+            self.assertEqual(len(table), 1 << (L - i - 1))
+        self.assertEqual(table[0], expected)
+
+    def test_eq_table(self):
+        p = randomPrime(64)
+        for L in range(6):
+            point = [random.randint(0, p - 1) for _ in range(L)]
+            expected = []
+            for b in range(1 << L):
+                w = 1
+                for i in range(L):
+                    w = w * (point[i] if b >> i & 1 else 1 - point[i]) % p
+                expected.append(w)
+            self.assertEqual(eqTable(point, p), expected)
+
+    def test_product_round_sums(self):
+        p = randomPrime(64)
+        L = 5
+        tables = [[random.randint(0, p - 1) for _ in range(1 << L)] for _ in range(4)]
+        sums = productRoundSums(tables, 5, p)
+        for t in range(5):
+            expected = 0
+            for b in range(1 << (L - 1)):
+                product = 1
+                for A in tables:
+                    product = product * ((1 - t) * A[2 * b] + t * A[2 * b + 1]) % p
+                expected = (expected + product) % p
+            self.assertEqual(sums[t], expected)
+
+    def test_product_round_sums_multiplicities(self):
+        p = randomPrime(64)
+        L = 5
+        tables = [[random.randint(0, p - 1) for _ in range(1 << L)] for _ in range(2)]
+        self.assertEqual(productRoundSums(tables, 6, p, [3, 2]),
+                         productRoundSums([tables[0]] * 3 + [tables[1]] * 2, 6, p))
+
+    def test_sum_of_products_round_sums(self):
+        p = randomPrime(64)
+        L = 5
+        tables = [[random.randint(0, p - 1) for _ in range(1 << L)] for _ in range(4)]
+        terms = [(3, [0, 1]), (p - 1, [1, 2, 3]), (5, [2]), (7, [0, 0, 3])]
+        sums = sumOfProductsRoundSums(tables, terms, 4, p)
+        expected = [0] * 4
+        for c, indices in terms:
+            for t, s in enumerate(productRoundSums([tables[i] for i in indices], 4, p)):
+                expected[t] = (expected[t] + c * s) % p
+        self.assertEqual(sums, expected)
+
+    def test_round_sums_chunks(self):
+        p = randomPrime(64)
+        L = 6
+        tables = [[random.randint(0, p - 1) for _ in range(1 << L)] for _ in range(3)]
+        terms = [(3, [0, 1]), (p - 1, [1, 2]), (5, [2])]
+        expected = productRoundSums(tables, 4, p, [1, 2, 1]), sumOfProductsRoundSums(tables, terms, 3, p)
+        chunk = bookkeeping.ROUND_CHUNK
+        try:
+            for size in (1, 5, 32):
+                bookkeeping.ROUND_CHUNK = size
+                self.assertEqual((productRoundSums(tables, 4, p, [1, 2, 1]),
+                                  sumOfProductsRoundSums(tables, terms, 3, p)), expected)
+        finally:
+            bookkeeping.ROUND_CHUNK = chunk
@@ -0,0 +1,73 @@
+import random
+from unittest import TestCase
+
+from extension import ExtensionField
+from field import NumpyPrimeField, np
+from FSPMFProver import generateTheoremAndProof
+from FSPMFVerifier import PMF, PseudoRandomGen, verifyProof
+from IPPMFProver import InteractivePMFProver
+from IPPMFVerifier import InteractivePMFVerifier, SoundnessErrorException, interpolate
+from polynomial import randomMVLinear, randomPrime
+
+
+class Test(TestCase):
+    def test_arithmetic(self):
+        for k in (1, 2, 3, 4):
+            p = randomPrime(32)
+            F = ExtensionField(p, k)
+            x, y, z = (F([random.randint(0, p - 1) for _ in range(k)]) for _ in range(3))
+            self.assertEqual((x * y) * z, x * (y * z))
+            self.assertEqual(x * (y + z), x * y + x * z)
+            self.assertEqual(x - y + y, x)
+            self.assertEqual(3 - x + x, 3)
+            self.assertEqual(x * 5 % p, 5 * x)
+            self.assertEqual(x ** (F.size() - 1), 1)  # multiplicative group has order p^k - 1
+            self.assertEqual(F(7) * F(9), 63 % p)
+        p = randomPrime(32)
+        with self.assertRaises(ValueError):
+            ExtensionField(p, 2, [-1, 0])  # X^2 - 1 = (X - 1)(X + 1)
+
+    def test_interpolate(self):
+        p = randomPrime(64)
+        F = ExtensionField(p, 2)
+        points = [F([random.randint(0, p - 1), random.randint(0, p - 1)]) for _ in range(4)]
+        for r in range(4):
+            self.assertEqual(interpolate(points, F(r), p), points[r])
+        r = F([random.randint(0, p - 1), random.randint(0, p - 1)])
+        # P is cubic, so its 4th finite difference vanishes
+        values = [interpolate(points, r + i, p) for i in range(5)]
+        self.assertEqual(values[4] - 4 * values[3] + 6 * values[2] - 4 * values[1] + values[0], 0)
+
+    def test_sumcheck(self):
+        p = randomPrime(64)
+        F = ExtensionField(p, 4)
+        poly = PMF([randomMVLinear(7, prime=p) for _ in range(5)])
+        with self.assertRaises(SoundnessErrorException):
+            generateTheoremAndProof(poly)
+        theorem, proof, v = generateTheoremAndProof(poly, extension=F)
+        self.assertTrue(v.convinced)
+        self.assertLessEqual(v.requiredFieldLengthBit(2e-64), 64)
+        self.assertTrue(verifyProof(theorem, proof, extension=F))
+        proof.prover_messge[-1] = [x + 1 for x in proof.prover_messge[-1]]
+        self.assertFalse(verifyProof(theorem, proof, extension=F))
+
+    def test_sumcheck_repeated_multiplicand(self):
+        p = randomPrime(64)
+        F = ExtensionField(p, 4)
+        f, g = randomMVLinear(6, prime=p), randomMVLinear(6, prime=p)
+        theorem, proof, v = generateTheoremAndProof(PMF([f, f, g]), extension=F)
+        self.assertTrue(v.convinced)
+        self.assertTrue(verifyProof(theorem, proof, extension=F))
+
+    def test_sumcheck_vectorized_first_round(self):
+        if np is None:
+            self.skipTest("numpy is not installed")
+        p = randomPrime(32)
+        F = ExtensionField(p, 8)  # a 256-bit field, for the soundness of the default verifier
+        poly = PMF([randomMVLinear(6, prime=p) for _ in range(3)])
+        pv = InteractivePMFProver(poly, NumpyPrimeField(p))
+        As, s = pv.calculateAllBookKeepingTables()
+        gen = PseudoRandomGen(poly, F)
+        v = InteractivePMFVerifier(poly, s, randomGen=gen, extension=F)
+        pv.attemptProve(As, v, gen)
+        self.assertTrue(v.convinced)
@@ -0,0 +1,63 @@
+import random
+from unittest import TestCase, skipIf
+
+from field import PrimeField, NumpyPrimeField, np
+from FSPMFVerifier import PseudoRandomGen
+from GKRProver import GKRProver
+from GKRVerifier import GKRVerifier, GKRVerifierState
+from IPPMFProver import InteractivePMFProver
+from IPPMFVerifier import InteractivePMFVerifier
+from multilinear_extension import evaluate
+from PMF import PMF
+from polynomial import randomMVLinear, randomPrime
+from test_GKRProver import randomGKR
+
+
+@skipIf(np is None, "numpy is not installed")
+class TestNumpyPrimeField(TestCase):
+    def test_kernels(self):
+        p = randomPrime(32)
+        ref = PrimeField(p)
+        fast = NumpyPrimeField(p)
+        L = 6
+        tables = [[random.randint(0, p - 1) for _ in range(1 << L)] for _ in range(3)]
+        r = random.randint(0, p - 1)
+        point = [random.randint(0, p - 1) for _ in range(L)]
+        self.assertEqual(fast.product_round_sums([fast.table(A) for A in tables], 4),
+                         ref.product_round_sums(tables, 4))
+        self.assertEqual(fast.product_round_sums([fast.table(A) for A in tables], 7, [1, 3, 2]),
+                         ref.product_round_sums(tables, 7, [1, 3, 2]))
+        terms = [(3, [0, 1]), (p - 2, [2]), (5, [0, 1, 2])]
+        self.assertEqual(fast.sum_of_products_round_sums([fast.table(A) for A in tables], terms, 4),
+                         ref.sum_of_products_round_sums(tables, terms, 4))
+        self.assertEqual(fast.round_sums(fast.table(tables[0])), ref.round_sums(tables[0]))
+        self.assertEqual(fast.to_list(fast.mul(fast.table(tables[0]), fast.table(tables[1]))),
+                         ref.mul(tables[0], tables[1]))
+        self.assertEqual(fast.to_list(fast.eq_table(point)), ref.eq_table(point))
+        self.assertEqual(fast.to_list(fast.fold(fast.table(tables[2]), r)), ref.fold(tables[2].copy(), r))
+        self.assertEqual(evaluate(tables[0], point, p, fast), evaluate(tables[0], point, p))
+
+    def test_provers(self):
+        # a small prime with a loose soundness requirement, only to test completeness
+        p = randomPrime(31)
+        poly = PMF([randomMVLinear(6, prime=p) for _ in range(3)])
+        pv = InteractivePMFProver(poly, NumpyPrimeField(p))
+        As, s = pv.calculateAllBookKeepingTables()
+        gen = PseudoRandomGen(poly)
+        v = InteractivePMFVerifier(poly, s, maxAllowedSoundnessError=1, randomGen=gen)
+        msgs = pv.attemptProve(As, v, gen)
+        self.assertTrue(v.convinced)
+        ref = InteractivePMFProver(poly)
+        As, _ = ref.calculateAllBookKeepingTables()
+        gen = PseudoRandomGen(poly)
+        v = InteractivePMFVerifier(poly, s, maxAllowedSoundnessError=1, randomGen=gen)
+        self.assertEqual(msgs, ref.attemptProve(As, v, gen))
+
+        L = 5
+        gkr = randomGKR(L, p)
+        g = [random.randint(0, p - 1) for _ in range(L)]
+        pv = GKRProver(gkr, NumpyPrimeField(p))
+        A_hg, G, s = pv.initializeAndGetSum(g)
+        v = GKRVerifier(gkr, g, s, maxAllowedSoundnessError=1)
+        pv.proveToVerifier(A_hg, G, s, v)
+        self.assertEqual(v.state, GKRVerifierState.ACCEPT)
@@ -0,0 +1,78 @@
+import os
+import random
+from unittest import TestCase
+
+from field import PrimeField
+from GKRProver import GKRProver
+from GKRVerifier import GKRVerifier, GKRVerifierState
+from IPPMFProver import InteractivePMFProver
+from IPPMFVerifier import InteractivePMFVerifier
+from IPProverLinear import InteractiveLinearProver
+from IPVerifier import InteractiveVerifier
+from mapped import MappedPrimeField, loadTable
+from PMF import PMF
+from polynomial import randomMVLinear, randomPrime
+from test_GKRProver import randomGKR
+
+
+class TestMappedPrimeField(TestCase):
+    def test_kernels(self):
+        p = randomPrime(128)
+        ref = PrimeField(p)
+        mapped = MappedPrimeField(p, block_size=4)
+        L = 6
+        tables = [[random.randint(0, p - 1) for _ in range(1 << L)] for _ in range(3)]
+        point = [random.randint(0, p - 1) for _ in range(L)]
+        self.assertEqual(mapped.to_list(mapped.table(iter(tables[0]))), tables[0])
+        self.assertEqual(mapped.product_round_sums([mapped.table(A) for A in tables], 5, [1, 2, 1]),
+                         ref.product_round_sums(tables, 5, [1, 2, 1]))
+        terms = [(3, [0, 1]), (p - 2, [2]), (5, [0, 1, 2])]
+        self.assertEqual(mapped.sum_of_products_round_sums([mapped.table(A) for A in tables], terms, 4),
+                         ref.sum_of_products_round_sums(tables, terms, 4))
+        self.assertEqual(mapped.to_list(mapped.mul(mapped.table(tables[0]), mapped.table(tables[1]))),
+                         ref.mul(tables[0], tables[1]))
+        self.assertEqual(mapped.to_list(mapped.scale(mapped.table(tables[0]), 7)), ref.scale(tables[0], 7))
+        self.assertEqual(mapped.to_list(mapped.eq_table(point)), ref.eq_table(point))
+        A = mapped.table(tables[2])
+        B = tables[2].copy()
+        for r in point:
+            self.assertEqual(mapped.round_sums(A), ref.round_sums(B))
+            self.assertEqual(mapped.sum(A), ref.sum(B))
+            A = mapped.fold(A, r)
+            B = ref.fold(B, r)
+            self.assertEqual(mapped.to_list(A), B)
+
+    def test_load_and_close(self):
+        p = randomPrime(64)
+        table = loadTable((x * x for x in range(1000)), p, block_size=64)
+        self.assertEqual(len(table), 1000)
+        self.assertEqual(table.read(998, 1000), [998 * 998 % p, 999 * 999 % p])
+        self.assertTrue(os.path.exists(table.path))
+        table.close()
+        self.assertFalse(os.path.exists(table.path))
+
+    def test_provers(self):
+        p = randomPrime(256)
+        mapped = MappedPrimeField(p, block_size=8)
+        poly = randomMVLinear(7, prime=p)
+        pv = InteractiveLinearProver(poly, mapped)
+        A, s = pv.calculateTable()
+        v = InteractiveVerifier(random.randint(0, 0xFFFFFFFF), poly, s)
+        pv.attemptProve(A, v)
+        self.assertTrue(v.convinced)
+
+        poly = PMF([randomMVLinear(7, prime=p) for _ in range(3)])
+        pv = InteractivePMFProver(poly, mapped)
+        As, s = pv.calculateAllBookKeepingTables()
+        v = InteractivePMFVerifier(poly, s)
+        pv.attemptProve(As, v)
+        self.assertTrue(v.convinced)
+
+        L = 5
+        gkr = randomGKR(L, p)
+        g = [random.randint(0, p - 1) for _ in range(L)]
+        pv = GKRProver(gkr, mapped)
+        A_hg, G, s = pv.initializeAndGetSum(g)
+        v = GKRVerifier(gkr, g, s)
+        pv.proveToVerifier(A_hg, G, s, v)
+        self.assertEqual(v.state, GKRVerifierState.ACCEPT)
@@ -1,5 +1,8 @@
 from unittest import TestCase
-from multilinear_extension import extend, extend_sparse, evaluate, evaluate_sparse
+from field import NumpyPrimeField, PrimeField, np
+from parallel import ParallelPrimeField
+from multilinear_extension import extend, extend_sparse, evaluate, evaluate_sparse, cachedEqTable, eqCacheScope, \
+    eqWeights
 import random
 from polynomial import randomPrime
 
@@ -44,3 +47,44 @@ class Test(TestCase):
             poly = extend_sparse(data, L, p)
             args = [random.randint(0, p - 1) for _ in range(L)]
             self.assertEqual(poly.eval(args), evaluate_sparse(data, args, p))
+
+    def test_eq_table(self):
+        p = randomPrime(64)
+        r = [random.randint(0, p - 1) for _ in range(5)]
+        expected = PrimeField(p).eq_table(r)
+        self.assertEqual(list(eqWeights(r, p)), expected)
+        with eqCacheScope():
+            table = cachedEqTable(r, p)
+            self.assertEqual(list(table), expected)
+            self.assertIs(cachedEqTable(r, p), table)
+            self.assertIs(cachedEqTable(r, p, PrimeField(p)), table)
+            with self.assertRaises(TypeError):
+                table[0] = 1
+        self.assertIsNot(cachedEqTable(r, p), table)
+
+    def test_eq_table_backends(self):
+        p = randomPrime(32)
+        r = [random.randint(0, p - 1) for _ in range(6)]
+        expected = PrimeField(p).eq_table(r)
+        with eqCacheScope():
+            # the tables of ParallelPrimeField live in the pool of the instance, and fold in place
+            for _ in range(2):
+                with ParallelPrimeField(p, num_workers=2, serial_threshold=8) as par:
+                    table = cachedEqTable(r, p, par)
+                    self.assertEqual(par.sum(table), sum(expected) % p)
+                    self.assertEqual(par.to_list(par.fold(table, 3)), PrimeField(p).fold(expected.copy(), 3))
+            if np is not None:
+                field = NumpyPrimeField(p)
+                table = cachedEqTable(r, p, field)
+                self.assertEqual(field.to_list(table), expected)
+                self.assertIs(cachedEqTable(r, p, NumpyPrimeField(p)), table)
+                with self.assertRaises(ValueError):
+                    table[0] = 1
+
+    def test_extend_not_power_of_two(self):
+        p = randomPrime(64)
+        arr = [random.randint(0, p-1) for _ in range(37)]
+        poly = extend(arr, p)
+        self.assertEqual(poly.num_variables, 6)
+        for i in range(1 << 6):
+            self.assertEqual(arr[i] if i < len(arr) else 0, poly.eval_bin(i))
@@ -0,0 +1,77 @@
+import gc
+import random
+from unittest import TestCase
+
+from field import PrimeField
+from FSPMFVerifier import PseudoRandomGen
+from GKRProver import GKRProver
+from GKRVerifier import GKRVerifier, GKRVerifierState
+from IPPMFProver import InteractivePMFProver
+from IPPMFVerifier import InteractivePMFVerifier
+from parallel import ParallelPrimeField
+from PMF import PMF
+from polynomial import randomMVLinear, randomPrime
+from test_GKRProver import randomGKR
+
+
+class TestParallelPrimeField(TestCase):
+    def test_kernels(self):
+        p = randomPrime(128)
+        ref = PrimeField(p)
+        with ParallelPrimeField(p, num_workers=3, serial_threshold=8) as par:
+            L = 7
+            tables = [[random.randint(0, p - 1) for _ in range(1 << L)] for _ in range(3)]
+            point = [random.randint(0, p - 1) for _ in range(L)]
+            self.assertEqual(par.to_list(par.table(tables[0].copy())), tables[0])
+            self.assertEqual(par.product_round_sums([par.table(A.copy()) for A in tables], 5, [1, 2, 1]),
+                             ref.product_round_sums(tables, 5, [1, 2, 1]))
+            terms = [(3, [0, 1]), (p - 2, [2]), (5, [0, 1, 2])]
+            self.assertEqual(par.sum_of_products_round_sums([par.table(A.copy()) for A in tables], terms, 4),
+                             ref.sum_of_products_round_sums(tables, terms, 4))
+            self.assertEqual(par.to_list(par.mul(par.table(tables[0].copy()), par.table(tables[1].copy()))),
+                             ref.mul(tables[0], tables[1]))
+            self.assertEqual(par.to_list(par.eq_table(point)), ref.eq_table(point))
+            # fold all the way through the sequential tail
+            A = par.table(tables[2].copy())
+            B = tables[2].copy()
+            for r in point:
+                self.assertEqual(par.round_sums(A), ref.round_sums(B))
+                self.assertEqual(par.sum(A), ref.sum(B))
+                A = par.fold(A, r)
+                B = ref.fold(B, r)
+                self.assertEqual(par.to_list(A), B)
+
+    def test_free(self):
+        p = randomPrime(64)
+        with ParallelPrimeField(p, num_workers=2, serial_threshold=4) as par:
+            A = par.table([random.randint(0, p - 1) for _ in range(32)])
+            table_id = A.id
+            par.sum(par.table([1] * 32))  # a broadcast between creating and dropping the table
+            del A
+            gc.collect()
+            par.sum(par.table([1] * 32))  # sends the freed ids to the workers
+            with self.assertRaises(KeyError):
+                par._broadcast('get', [(table_id,)] * par.num_workers)
+
+    def test_provers(self):
+        p = randomPrime(256)
+        poly = PMF([randomMVLinear(8, prime=p) for _ in range(3)])
+        with ParallelPrimeField(p, num_workers=2, serial_threshold=16) as par:
+            msgs = []
+            for field in (par, None):
+                pv = InteractivePMFProver(poly, field)
+                As, s = pv.calculateAllBookKeepingTables()
+                gen = PseudoRandomGen(poly)
+                v = InteractivePMFVerifier(poly, s, randomGen=gen)
+                msgs.append(pv.attemptProve(As, v, gen))
+                self.assertTrue(v.convinced)
+            self.assertEqual(msgs[0], msgs[1])
+
+            L = 6
+            gkr = randomGKR(L, p)
+            g = [random.randint(0, p - 1) for _ in range(L)]
+            pv = GKRProver(gkr, par)
+            A_hg, G, s = pv.initializeAndGetSum(g)
+            v = GKRVerifier(gkr, g, s)
+            pv.proveToVerifier(A_hg, G, s, v)
+            self.assertEqual(v.state, GKRVerifierState.ACCEPT)
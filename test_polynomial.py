@@ -0,0 +1,122 @@
+import pickle
+import random
+from copy import copy
+from unittest import TestCase
+
+from GKR import GKR
+from PMF import PMF
+from polynomial import MVLinear, DenseMVLinear, randomMVLinear, randomPrime
+
+
+class Test(TestCase):
+    def test_digest_canonical(self):
+        p = randomPrime(64)
+        terms = {random.randint(0, (1 << 8) - 1): random.randint(1, p - 1) for _ in range(50)}
+        reordered = dict(reversed(list(terms.items())))
+        a = MVLinear(8, terms, p)
+        b = MVLinear(8, reordered, p)
+        self.assertEqual(a.digest(), b.digest())
+        self.assertEqual(a.digest(), copy(a).digest())
+        self.assertNotEqual(a.digest(), MVLinear(9, terms, p).digest())
+        self.assertEqual(PMF([a, b + 1]).digest(), PMF([b + 1, a]).digest())
+
+    def test_digest_invalidated_on_mutation(self):
+        p = randomPrime(64)
+        poly = randomMVLinear(5, prime=p)
+        d = poly.digest()
+        poly.terms[0] = (poly[0] + 1) % p
+        self.assertNotEqual(d, poly.digest())
+        dense = DenseMVLinear.fromMVLinear(poly)
+        self.assertEqual(poly.digest(), dense.digest())
+        dense.coefficients[1] = (dense[1] + 1) % p
+        self.assertNotEqual(poly.digest(), dense.digest())
+        d = poly.digest()
+        poly.p = randomPrime(64)
+        self.assertNotEqual(d, poly.digest())
+
+        L = 3
+        gkr = GKR({1: 2, 7: 3}, [random.randint(0, p - 1) for _ in range(1 << L)], [0] * (1 << L), p, L)
+        d = gkr.digest()
+        self.assertEqual(d, copy(gkr).digest())
+        gkr.f3[2] = 1
+        self.assertNotEqual(d, gkr.digest())
+
+    def test_evaluations_round_trip(self):
+        for n in range(0, 9):
+            p = randomPrime(64)
+            poly = randomMVLinear(n, prime=p)
+            A = poly.to_evaluations()
+            self.assertEqual(len(A), 1 << n)
+            for b in range(1 << n):
+                self.assertEqual(A[b], poly.eval_bin(b))
+            self.assertEqual(MVLinear.from_evaluations(A, p), poly)
+            # padded hypercube: the extra variables are unused
+            A2 = poly.to_evaluations(n + 2)
+            self.assertEqual(A2, A * 4)
+
+    def test_mul(self):
+        p = randomPrime(64)
+        for n in range(2, 9):
+            h = n // 2
+            f = MVLinear(n, {random.randint(0, (1 << h) - 1): random.randint(1, p - 1) for _ in range(1 << h)}, p)
+            g = MVLinear(n, {random.randint(0, (1 << (n - h)) - 1) << h: random.randint(1, p - 1)
+                             for _ in range(1 << (n - h))}, p)
+            fg = f * g
+            for _ in range(10):
+                at = [random.randint(0, p - 1) for _ in range(n)]
+                self.assertEqual(fg.eval(at), f.eval(at) * g.eval(at) % p)
+            self.assertEqual(f * 3 + f * 4, f * 7)
+            x = MVLinear(n, {1: 1}, p)
+            with self.assertRaises(ArithmeticError):
+                _ = (f + x) * (g + x)
+
+    def test_dense(self):
+        p = randomPrime(64)
+        for n in range(0, 8):
+            sparse = randomMVLinear(n, prime=p)
+            poly = DenseMVLinear.fromMVLinear(sparse)
+            other = MVLinear(n, {random.randint(0, (1 << n) - 1): random.randint(0, p - 1) for _ in range(3)}, p)
+            at = [random.randint(0, p - 1) for _ in range(n)]
+            self.assertEqual(poly.eval(at), sparse.eval(at))
+            self.assertEqual((poly + other).eval(at), (sparse + other).eval(at))
+            self.assertEqual((poly - other).eval(at), (sparse - other).eval(at))
+            self.assertEqual((other - poly).eval(at), (other - sparse).eval(at))
+            self.assertEqual((poly * 5).eval(at), 5 * sparse.eval(at) % p)
+            self.assertEqual(poly.eval_part(at[:n // 2]), sparse.eval_part(at[:n // 2]))
+            self.assertEqual(poly.to_evaluations(), sparse.to_evaluations())
+            self.assertTrue(poly == sparse)
+            # cancelling out falls back to the sparse form
+            if n >= 3:
+                self.assertNotIsInstance(poly - sparse + other, DenseMVLinear)
+
+    def test_dense_with_large_sparse(self):
+        p = randomPrime(64)
+        big = MVLinear(40, {1 << 39: 5}, p)
+        small = DenseMVLinear.fromMVLinear(MVLinear(2, {0: 1, 1: 2, 2: 3, 3: 4}, p))
+        for result, terms in ((big + small, {1 << 39: 5, 0: 1, 1: 2, 2: 3, 3: 4}),
+                              (small + big, {1 << 39: 5, 0: 1, 1: 2, 2: 3, 3: 4}),
+                              (big - small, {1 << 39: 5, 0: p - 1, 1: p - 2, 2: p - 3, 3: p - 4}),
+                              (small - big, {1 << 39: p - 5, 0: 1, 1: 2, 2: 3, 3: 4})):
+            self.assertNotIsInstance(result, DenseMVLinear)
+            self.assertEqual(result.num_variables, 40)
+            self.assertEqual(dict(result.terms), terms)
+
+    def test_dense_terms_cached(self):
+        p = randomPrime(64)
+        poly = DenseMVLinear.fromMVLinear(randomMVLinear(5, prime=p))
+        terms = poly.terms
+        self.assertIs(poly.terms, terms)
+        poly.coefficients[0] = (poly[0] + 1) % p
+        self.assertIsNot(poly.terms, terms)
+        self.assertEqual(dict(poly.terms), {k: v for k, v in enumerate(poly.coefficients) if v != 0})
+
+    def test_pickle_after_caching(self):
+        p = randomPrime(64)
+        poly = DenseMVLinear.fromMVLinear(randomMVLinear(5, prime=p))
+        sparse = randomMVLinear(5, prime=p)
+        for f in (poly, sparse):
+            d = f.digest()
+            _ = f.terms
+            g = pickle.loads(pickle.dumps(f))
+            self.assertEqual(g, f)
+            self.assertEqual(g.digest(), d)
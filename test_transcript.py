@@ -0,0 +1,38 @@
+import random
+from unittest import TestCase
+
+from FSPMFVerifier import PseudoRandomGen, randomElement
+from PMF import PMF
+from polynomial import randomMVLinear, randomPrime
+from transcript import Transcript
+
+
+class Test(TestCase):
+    def test_squeeze_in_range(self):
+        for bits in [8, 61, 256, 600]:
+            p = randomPrime(bits)
+            t = Transcript(b'statement', p)
+            for _ in range(20):
+                t.absorb_message([random.randint(0, p - 1) for _ in range(3)])
+                r = t.squeeze()
+                self.assertTrue(0 <= r < p)
+
+    def test_deterministic(self):
+        p = randomPrime(128)
+        msgs = [[random.randint(0, p - 1) for _ in range(3)] for _ in range(10)]
+        t1 = Transcript(b'statement', p)
+        t2 = Transcript(b'statement', p)
+        for msg in msgs:
+            t1.absorb_message(msg)
+            t2.absorb_message(msg)
+            self.assertEqual(t1.squeeze(), t2.squeeze())
+        # consecutive squeezes differ
+        self.assertNotEqual(t1.squeeze(), t1.squeeze())
+
+    def test_incremental_matches_replay(self):
+        p = randomPrime(128)
+        poly = PMF([randomMVLinear(4, prime=p) for _ in range(3)])
+        gen = PseudoRandomGen(poly)
+        for _ in range(5):
+            gen.message.append([random.randint(0, p - 1) for _ in range(4)])
+            self.assertEqual(gen.getRandomElement(), randomElement(poly, gen.message))
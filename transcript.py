@@ -0,0 +1,81 @@
+"""
+Fiat-Shamir transcript with a running hash state.
+"""
+import hashlib
+from typing import Iterable
+
+HASH_BLOCK_SIZE = 64  # digest size of blake2b in bytes
+
+
+class Transcript:
+    """
+    A Fiat-Shamir transcript. The statement is absorbed once, each prover message is absorbed as it arrives, and
+    challenges are squeezed from a fork of the running hash state, so hashing work is linear to the proof length.
+    """
+
+    def __init__(self, statement: bytes, p: int):
+        """
+        :param statement: binary encoding of the statement (the polynomial, PMF or GKR function to be proved)
+        :param p: field size. Challenges are sampled uniformly from [0, p).
+        """
+        self.p = p
+        self.byte_length = (p.bit_length() + 7) // 8
+        self._mask = (1 << p.bit_length()) - 1
+        self._state = hashlib.blake2b(digest_size=HASH_BLOCK_SIZE)
+        self._state.update(statement)
+
+    def absorb(self, data: bytes) -> None:
+        """
+        Absorb raw bytes into the running state.
+        """
+        self._state.update(data)
+
+    def absorb_element(self, x: int) -> None:
+        """
+        Absorb a single field element. Elements of an extension field are absorbed coefficient by coefficient.
+        """
+        if not isinstance(x, int):
+            self._state.update(b'E')
+            for c in x.coefficients:
+                self.absorb_element(c)
+            return
+        self._state.update(b'N')
+        self._state.update((x % self.p).to_bytes(self.byte_length, 'little'))
+
+    def absorb_message(self, msg: Iterable[int]) -> None:
+        """
+        Absorb one prover message, i.e. the evaluations of the univariate polynomial of one round.
+        """
+        for point in msg:
+            self.absorb_element(point)
+        self._state.update(b'X')
+
+    def squeeze(self) -> int:
+        """
+        Sample a challenge from a fork of the running state. The running state itself only records that a challenge
+        is drawn, so that two consecutive squeezes give different challenges.
+        :return: a pseudorandom element in [0, p)
+        """
+        fork = self._state.copy()
+        self._state.update(b'C')
+
+        result = self._expand(fork)
+        while result >= self.p:
+            fork.update(b'\xFF')  # rejection sampling
+            result = self._expand(fork)
+        return result
+
+    def _expand(self, fork: 'hashlib.blake2b') -> int:
+        """
+        Read p.bit_length() pseudorandom bits from the fork. Uses more than one digest if p is larger than 512 bits.
+        """
+        if self.byte_length <= HASH_BLOCK_SIZE:
+            return int.from_bytes(fork.digest(), 'little') & self._mask
+        out = b''
+        counter = 0
+        while len(out) < self.byte_length:
+            block = fork.copy()
+            block.update(counter.to_bytes(4, 'little'))
+            out += block.digest()
+            counter += 1
+        return int.from_bytes(out, 'little') & self._mask